@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Benchmark parsers, analyzers and testdrive on synthetic data.
+
+Run from the root of this repo:
+
+    env PYTHONPATH=postprocess/src python3 benchmarks/bench.py --samples 1e4 1e5
+
+Each measurement is printed as a line of JSON.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from os.path import abspath, dirname, join as joinpath
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import yaml
+
+from vse_sync_pp.common import print_loj
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.analyzers import ts2phc, ppsdpll, pmc
+from vse_sync_pp.analyzers.analyzer import Config
+from vse_sync_pp.sequence import build_sources, build_heads, build_head, insert_head
+from vse_sync_pp.synth import FORMATS, generate, merge
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+# analyzers benchmarked, with parameters permissive enough to test all data
+ANALYZERS = (
+    ts2phc.TimeErrorAnalyzer,
+    ts2phc.TimeDeviationAnalyzer,
+    ts2phc.MaxTimeIntervalErrorAnalyzer,
+    ppsdpll.TimeErrorAnalyzer,
+    pmc.ClockStateAnalyzer,
+)
+CONFIG = Config(None, 'G.8272/PRTC-A', {
+    'transient-period/s': 0,
+    'min-test-duration/s': 1,
+    'time-error-limit/%': 100,
+    'time-deviation-limit/%': 100,
+    'maximum-time-interval-error-limit/%': 100,
+})
+
+# sources sequenced: a log file and multiplexed content, as in collected.log,
+# each containing the same number of samples from each parser
+LOGGED = 'ts2phc/time-error'
+MUXED = ('gnss/time-error', 'dpll/time-error', 'phc/gm-settings')
+
+# tests run by testdrive on a synthetic ts2phc log, relative to tests/
+TESTS = (
+    'sync/G.8272/time-error-in-locked-mode/DPLL-to-PHC/PRTC-A/testimpl.py',
+    'sync/G.8272/wander-TDEV-in-locked-mode/DPLL-to-PHC/PRTC-A/testimpl.py',
+    'sync/G.8272/wander-MTIE-in-locked-mode/DPLL-to-PHC/PRTC-A/testimpl.py',
+)
+
+
+class Data():
+    """Synthetic data files in directory `dirname`, generated on demand"""
+    def __init__(self, dirname_, seed):
+        self.dirname = dirname_
+        self._seed = seed
+
+    def filename(self, id_, count):
+        """Return the name of a file containing `count` lines for parser `id_`"""
+        filename = joinpath(self.dirname, f'{id_.replace("/", "_")}-{count}.log')
+        if not os.path.exists(filename):
+            with open(filename, 'w', encoding='utf-8') as fid:
+                fid.writelines(generate(id_, count, seed=self._seed))
+        return filename
+
+    def muxed(self, ids, count):
+        """Return the name of a file containing multiplexed content
+
+        The content has `count` samples for each parser id in `ids`.
+        """
+        filename = joinpath(self.dirname, f'muxed-{count}.log')
+        if not os.path.exists(filename):
+            with open(filename, 'w', encoding='utf-8') as fid:
+                fid.writelines(merge(*(
+                    {'id_': id_, 'count': count, 'seed': (self._seed, idx), 'muxed': True}
+                    for (idx, id_) in enumerate(ids)
+                )))
+        return filename
+
+
+def measure(func, memory):
+    """Call `func` and return a dict of resources used
+
+    If `memory`, then call `func` a second time while tracing memory
+    allocations, to measure its peak memory use without slowing the first call.
+    """
+    start = perf_counter()
+    func()
+    item = {'seconds': round(perf_counter() - start, 6)}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            (_, item['peak_memory']) = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return item
+
+
+def result(stage, name, count, unit, resources):
+    """Return a dict for measurement of `stage` for `name` processing `count` items"""
+    seconds = resources['seconds']
+    return {
+        'stage': stage,
+        'name': name,
+        'samples': count,
+        'rate': round(count / seconds) if seconds else None,
+        'unit': unit,
+        **resources,
+    }
+
+
+def bench_parse(data, count, memory):
+    """Generator yielding results for parsing log messages by each parser"""
+    for id_ in FORMATS:
+        filename = data.filename(id_, count)
+
+        def parse(id_=id_, filename=filename):
+            parser = PARSERS[id_]()
+            with open(filename, encoding='utf-8') as fid:
+                for _ in parser.parse(fid):
+                    pass
+        yield result('parse', id_, count, 'lines/s', measure(parse, memory))
+
+
+def bench_sequence(data, count, memory):
+    """Generator yielding a result for sequencing log messages from several sources"""
+    sources = joinpath(data.dirname, f'sources-{count}.yaml')
+    with open(sources, 'w', encoding='utf-8') as fid:
+        yaml.safe_dump_all((
+            {'source': data.filename(LOGGED, count), 'contains': LOGGED},
+            {'source': data.muxed(MUXED, count), 'contains': 'muxed'},
+        ), fid)
+
+    def sequence():
+        heads = build_heads(tuple(build_sources(PARSERS, sources)))
+        while heads:
+            first = heads.pop(0)
+            heads = insert_head(heads, build_head(first.source))
+    total = count * (1 + len(MUXED))
+    yield result('sequence', ','.join((LOGGED, *MUXED)), total, 'lines/s', measure(sequence, memory))
+
+
+def bench_analyze(data, count, memory):
+    """Generator yielding results for analyzing parsed samples by each analyzer"""
+    for cls in ANALYZERS:
+        with open(data.filename(cls.parser, count), encoding='utf-8') as fid:
+            rows = list(PARSERS[cls.parser]().parse(fid))
+
+        def analyze(cls=cls, rows=rows):
+            analyzer = cls(CONFIG)
+            analyzer.collect(*rows)
+            return (analyzer.result, analyzer.analysis)
+        yield result('analyze', cls.id_, count, 'samples/s', measure(analyze, memory))
+
+
+def bench_testdrive(data, count, _):
+    """Generator yielding results for running tests with testdrive
+
+    Resources are those recorded by testdrive for each test implementation
+    run in a new process: peak memory is its maximum resident set size.
+    """
+    filename = data.filename('ts2phc/time-error', count)
+    tests = joinpath(data.dirname, f'tests-{count}.json')
+    with open(tests, 'w', encoding='utf-8') as fid:
+        for test in TESTS:
+            fid.write(json.dumps([test, filename, 'ens7f1']) + '\n')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        (joinpath(ROOT, 'testdrive', 'src'), joinpath(ROOT, 'postprocess', 'src')),
+    ))
+    proc = subprocess.run(
+        (sys.executable, '-m', 'testdrive.run', '--basedir', joinpath(ROOT, 'tests'), 'file:///', tests),
+        env=env, stdout=subprocess.PIPE, check=True,
+    )
+    for (test, line) in zip(TESTS, proc.stdout.decode().splitlines()):
+        resources = json.loads(line)['resources']
+        yield result('testdrive', dirname(test), count, 'samples/s', {
+            'seconds': resources['wall_time'],
+            'max_rss': resources['max_rss'] * 1024,
+        })
+
+
+STAGES = {
+    'parse': bench_parse,
+    'sequence': bench_sequence,
+    'analyze': bench_analyze,
+    'testdrive': bench_testdrive,
+}
+
+
+def main():
+    """Benchmark parsers, analyzers and testdrive on synthetic data.
+
+    For each number of samples, generate deterministic synthetic log messages
+    and measure the rate at which each stage processes them and, optionally,
+    its peak memory use. Print each measurement as a line of JSON.
+    """
+    aparser = ArgumentParser(description=main.__doc__)
+    aparser.add_argument(
+        '--samples', type=float, nargs='+', default=(1e4, 1e5),
+        help="numbers of samples to benchmark (default: 1e4 1e5)",
+    )
+    aparser.add_argument(
+        '--stage', choices=STAGES, nargs='+', default=tuple(STAGES),
+        help="stages to benchmark (default: all)",
+    )
+    aparser.add_argument(
+        '--seed', type=int, default=0,
+        help="seed for generating synthetic data",
+    )
+    aparser.add_argument(
+        '--no-memory', dest='memory', action='store_false',
+        help="do not measure peak memory use",
+    )
+    aparser.add_argument(
+        '--datadir',
+        help="directory to keep synthetic data in (default: a temporary directory)",
+    )
+    args = aparser.parse_args()
+    with TemporaryDirectory() as tmpdir:
+        data = Data(args.datadir or tmpdir, args.seed)
+        for count in args.samples:
+            for stage in args.stage:
+                for item in STAGES[stage](data, int(count), args.memory):
+                    # Python exits with error code 1 on EPIPE
+                    if not print_loj(item):
+                        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -375,7 +375,10 @@ EOF
         fi
     done
 
-    env PYTHONPATH=$TDPATH:$PPPATH python3 -m testdrive.run --basedir="$ANALYSERPATH/tests" --imagedir="$PLOTDIR" "$BASEURL_TEST_IDS" $ARTEFACTDIR/testdrive_config.json
+    # fork tests and plotters from worker processes which have already imported the analysis and plotting modules
+    env PYTHONPATH=$TDPATH:$PPPATH MPLBACKEND=Agg python3 -m testdrive.run --basedir="$ANALYSERPATH/tests" --imagedir="$PLOTDIR" \
+        --inprocess --fork --preload=vse_sync_pp.preload --preload=vse_sync_pp.plot --preload=matplotlib.pyplot \
+        "$BASEURL_TEST_IDS" $ARTEFACTDIR/testdrive_config.json
 
     popd >/dev/null 2>&1
 }
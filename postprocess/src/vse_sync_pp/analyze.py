@@ -10,7 +10,17 @@ from .common import (
     print_loj,
 )
 
+from . import (
+    parallel,
+    profiling,
+)
+from .follow import (
+    Follow,
+    Rolling,
+    summary,
+)
 from .parsers import PARSERS
+from .source import muxed
 from .analyzers import (
     ANALYZERS,
     Config,
@@ -22,16 +32,59 @@ def main():
 
     Analyze data parsed from the log messages in input. Print the test result
     and data analysis as JSON.
+
+    Optionally follow input as it grows and print interim results while data
+    is collected, so that a failing test can be stopped early.
     """
     aparser = ArgumentParser(description=main.__doc__)
-    aparser.add_argument(
+    group = aparser.add_mutually_exclusive_group()
+    group.add_argument(
         '--canonical', action='store_true',
         help="input contains canonical data",
     )
+    group.add_argument(
+        '--muxed', action='store_true',
+        help="input contains multiplexed content from collectors",
+    )
     aparser.add_argument(
         '--config',
         help="YAML file specifying test requirements and parameters",
     )
+    aparser.add_argument(
+        '--profile', action='store_true',
+        help=f"include a profile of parsing and analysis stages in output"
+             f" (also enabled by setting environment variable {profiling.ENVIRON})",
+    )
+    aparser.add_argument(
+        '-j', '--processes', type=int,
+        help=f"number of processes computing wander metrics of long series, or 0 for one per CPU"
+             f" (default: environment variable {parallel.ENVIRON}, or 1)",
+    )
+    aparser.add_argument(
+        '--brief', action='store_true',
+        help="omit from the analysis expensive metrics not computed for the test result",
+    )
+    aparser.add_argument(
+        '--follow', action='store_true',
+        help="keep reading input as it grows, until interrupted or idle",
+    )
+    aparser.add_argument(
+        '--idle', type=float,
+        help="with --follow, stop after no input is appended for this many seconds",
+    )
+    aparser.add_argument(
+        '--interim', type=float, metavar='SECONDS',
+        help="print an interim result for each interval of this many seconds of data",
+    )
+    aparser.add_argument(
+        '--window', type=float, metavar='SECONDS',
+        help="analyze only the last this many seconds of data for interim results"
+             " (default: all data after the transient period)",
+    )
+    aparser.add_argument(
+        '--fail-fast', action='store_true',
+        help="stop reading input when an interim result is a failure more data cannot reverse",
+    )
     aparser.add_argument(
         'input',
         help="input file, or '-' to read from stdin",
@@ -41,22 +94,48 @@ def main():
         help="analyzer to run over input",
     )
     args = aparser.parse_args()
+    if args.idle is not None and not args.follow:
+        aparser.error('--idle requires --follow')
+    if (args.window is not None or args.fail_fast) and args.interim is None:
+        aparser.error('--window and --fail-fast require --interim')
+    if args.profile:
+        profiling.enable()
+    if args.processes is not None:
+        parallel.configure(args.processes or None)
     config = Config.from_yaml(args.config) if args.config else Config()
-    analyzer = ANALYZERS[args.analyzer](config)
-    parser = PARSERS[analyzer.parser]()
+    cls = ANALYZERS[args.analyzer]
+    parser = PARSERS[cls.parser]()
+    if args.interim is None:
+        (rolling, analyzer) = (None, cls(config))
+    else:
+        rolling = Rolling(cls, config, args.interim, args.window, args.brief)
+        analyzer = rolling.analyzer
     with open_input(args.input) as fid:
-        method = parser.canonical if args.canonical else parser.parse
-        for parsed in method(fid):
-            analyzer.collect(parsed)
-    dct = {
-        'result': analyzer.result,
-        'timestamp': analyzer.timestamp,
-        'duration': analyzer.duration,
-        'reason': analyzer.reason,
-        'analysis': analyzer.analysis,
-    }
+        if args.follow:
+            fid = Follow(fid, idle=args.idle)
+        if args.muxed:
+            rows = (parsed for (_, parsed) in muxed(fid, {parser.id_: parser}))
+        elif args.canonical:
+            rows = parser.canonical(fid)
+        else:
+            rows = parser.parse(fid)
+        try:
+            for parsed in rows:
+                if rolling is None:
+                    analyzer.collect(parsed)
+                    continue
+                interim = rolling.collect(parsed)
+                # Python exits with error code 1 on EPIPE
+                if interim is not None and not print_loj(interim):
+                    sys.exit(1)
+                if args.fail_fast and rolling.failed:
+                    break
+        except KeyboardInterrupt:
+            # when following input, interrupting stops reading input
+            if not args.follow:
+                raise
     # Python exits with error code 1 on EPIPE
-    if not print_loj(dct):
+    if not print_loj(profiling.attach(summary(analyzer, args.brief))):
         sys.exit(1)
 
 
@@ -2,34 +2,31 @@
 
 """Analyzers"""
 
-from .analyzer import Config # noqa
+from ..common import Registry
 
-from . import (
-    gnss,
-    ppsdpll,
-    ts2phc,
-    phc2sys,
-    pmc,
-    ptp4l,
-)
+ANALYZERS = Registry(__name__, {
+    'gnss/time-error': 'gnss.TimeErrorAnalyzer',
+    'ppsdpll/time-error': 'ppsdpll.TimeErrorAnalyzer',
+    'ts2phc/time-error': 'ts2phc.TimeErrorAnalyzer',
+    'phc2sys/time-error': 'phc2sys.TimeErrorAnalyzer',
+    'phc/gm-settings': 'pmc.ClockStateAnalyzer',
+    'ptp4l/time-error': 'ptp4l.TimeErrorAnalyzer',
+    'gnss/time-deviation': 'gnss.TimeDeviationAnalyzer',
+    'ppsdpll/time-deviation': 'ppsdpll.TimeDeviationAnalyzer',
+    'ts2phc/time-deviation': 'ts2phc.TimeDeviationAnalyzer',
+    'phc2sys/time-deviation': 'phc2sys.TimeDeviationAnalyzer',
+    'ptp4l/time-deviation': 'ptp4l.TimeDeviationAnalyzer',
+    'gnss/mtie': 'gnss.MaxTimeIntervalErrorAnalyzer',
+    'ppsdpll/mtie': 'ppsdpll.MaxTimeIntervalErrorAnalyzer',
+    'ts2phc/mtie': 'ts2phc.MaxTimeIntervalErrorAnalyzer',
+    'phc2sys/mtie': 'phc2sys.MaxTimeIntervalErrorAnalyzer',
+    'ptp4l/mtie': 'ptp4l.MaxTimeIntervalErrorAnalyzer',
+})
 
-ANALYZERS = {
-    cls.id_: cls for cls in (
-        gnss.TimeErrorAnalyzer,
-        ppsdpll.TimeErrorAnalyzer,
-        ts2phc.TimeErrorAnalyzer,
-        phc2sys.TimeErrorAnalyzer,
-        pmc.ClockStateAnalyzer,
-        ptp4l.TimeErrorAnalyzer,
-        gnss.TimeDeviationAnalyzer,
-        ppsdpll.TimeDeviationAnalyzer,
-        ts2phc.TimeDeviationAnalyzer,
-        phc2sys.TimeDeviationAnalyzer,
-        ptp4l.TimeDeviationAnalyzer,
-        gnss.MaxTimeIntervalErrorAnalyzer,
-        ppsdpll.MaxTimeIntervalErrorAnalyzer,
-        ts2phc.MaxTimeIntervalErrorAnalyzer,
-        phc2sys.MaxTimeIntervalErrorAnalyzer,
-        ptp4l.MaxTimeIntervalErrorAnalyzer,
-    )
-}
+
+def __getattr__(name):
+    """Import :class:`Config` from :mod:`.analyzer` when first accessed"""
+    if name == 'Config':
+        from .analyzer import Config  # pylint: disable=import-outside-toplevel
+        return Config
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -2,16 +2,36 @@
 
 """Common analyzer functionality"""
 
-import yaml
-from pandas import DataFrame
 from datetime import (datetime, timezone)
 
-import allantools
 import numpy as np
 
-from scipy import signal as scipy_signal
-
+from .. import (
+    columns,
+    decimation,
+    lowpass,
+    profiling,
+)
 from ..requirements import REQUIREMENTS
+from ..sketch import QuantileSketch
+from ..wander import (
+    Wander,
+    TimeDeviation,
+    MaxTimeIntervalError,
+)
+
+# percentiles reported in analyses
+PERCENTILES = (50, 99, 99.9)
+
+# default observation window intervals for wander metrics, in seconds, unless
+# specified by parameter 'taus/s': from 1 to 10k taus...
+TAUS = np.concatenate((
+    np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 20, 30, 40, 50, 60, 70, 80, 90,
+              100, 200, 300, 400, 500, 600, 700, 800, 900, 1000, 2000, 3000,
+              4000, 5000, 6000, 7000, 8000, 9000, 10000]),
+    # ...then to 100k in 5k increments
+    np.arange(15000, 100000, 5000),
+))
 
 
 class Config():
@@ -57,9 +77,21 @@ class Config():
             reason = f'unknown parameter {key}'
             raise KeyError(self._reason(reason)) from exc
 
+    def updated(self, parameters):
+        """Return a copy of this configuration with pairs from `parameters`
+
+        Pairs from `parameters` replace this configuration's parameters at the
+        same keys. If this configuration has no parameters, then the copy has
+        no parameters.
+        """
+        if self._parameters is None:
+            return self
+        return type(self)(self._filename, self._requirements, {**self._parameters, **parameters})
+
     @classmethod
     def from_yaml(cls, filename, encoding='utf-8'):
         """Build configuration from YAML file at `filename`"""
+        import yaml  # pylint: disable=import-outside-toplevel
         with open(filename, encoding=encoding) as fid:
             dct = dict(yaml.safe_load(fid.read()))
         return cls(filename, dct.get('requirements'), dct.get('parameters'))
@@ -70,54 +102,195 @@ class CollectionIsClosed(Exception):
     # empty
 
 
+class Running():
+    """The running state of an analysis of data collected a chunk at a time
+
+    Analyzers analyzing online (see :meth:`Analyzer.estimate`) update this
+    state with each chunk of rows, instead of analyzing all rows again. The
+    memory used is bounded, whatever the number of rows.
+    """
+    def __init__(self):
+        # the number of rows, and the first and last rows
+        self.count = 0
+        self.first = None
+        self.last = None
+        # True if any row is in a state not locked
+        self.unlocked = False
+        # distinct intervals between timestamps, rounded to seconds
+        self.intervals = set()
+        # moments and quantiles of time error
+        self.terror = QuantileSketch()
+        # an online estimate of a wander metric, if any
+        self.wander = None
+
+    def __len__(self):
+        return self.count
+
+    def update(self, data, locked):
+        """Update this state with :class:`Table` `data`, in which `locked` are the locked states"""
+        if len(data) == 0:
+            return
+        timestamps = np.asarray(data.timestamp, dtype=float)
+        if self.last is not None:
+            timestamps = np.concatenate(([float(self.last.timestamp)], timestamps))
+        # more than one interval is a failure: more need not be kept
+        if len(self.intervals) < 2:
+            self.intervals.update(np.unique(np.round(np.diff(timestamps))).tolist())
+        self.unlocked = self.unlocked or unlocked(data, locked)
+        self.terror.update(data.terror)
+        if self.first is None:
+            self.first = data.first
+        self.last = data.last
+        self.count += len(data)
+
+
 class Analyzer():
-    """A base class providing common analyzer functionality"""
+    """A base class providing common analyzer functionality
+
+    Collected rows are held in typed column buffers (see
+    :mod:`vse_sync_pp.columns`). Methods :meth:`prepare`, :meth:`test` and
+    :meth:`sections` receive collected data as a :class:`Table` of arrays:
+    derived classes needing a pandas DataFrame call :meth:`Table.frame`.
+
+    The analysis is made of sections, each computed only when first requested.
+    Derived classes may override class attribute `expensive`, specifying a
+    frozenset of the names of sections expensive to compute: these are
+    omitted from a :meth:`brief` analysis unless needed for the test result.
+
+    Derived classes analyzing data online override class attribute `online`
+    to True, and implement :meth:`_update` (see :meth:`estimate`).
+    """
+    expensive = frozenset()
+    online = False
+
     def __init__(self, config):
         self._config = config
-        self._rows = []
+        self._columns = columns.Columns()
         self._data = None
         self._result = None
         self._reason = None
-        self._timestamp = None
-        self._duration = None
-        self._analysis = None
+        # section name -> function returning the section, once data collection is closed
+        self._sections = None
+        # section name -> section computed
+        self._explained = {}
+        # the running state analyzed, if analyzing online
+        self._running = None
 
     def collect(self, *rows):
         """Collect data from `rows`"""
-        if self._rows is None:
+        if self._columns is None:
+            raise CollectionIsClosed()
+        self._columns.extend(rows)
+
+    def collected(self):
+        """Return a :class:`Table` of the rows collected so far, without closing data collection
+
+        The arrays of the table are views of the column buffers, not copies:
+        they must not be modified.
+        """
+        if self._columns is None:
             raise CollectionIsClosed()
-        self._rows += rows
+        return self._columns.table()
 
-    def prepare(self, rows):
-        """Return (columns, records) from collected data `rows`
+    def estimate(self, running=None):
+        """Analyze online: return :class:`Running` state updated with the data collected
 
-        `columns` is a sequence of column names
-        `records` is a sequence of rows prepared for test analysis
+        If `running` is None, then return a new state updated with all data
+        collected. Otherwise `running` must have been returned by this method
+        for an analyzer of the same class and configuration: update `running`
+        with the data collected by this analyzer, following the data `running`
+        was updated with, and return `running`. Only the first chunk of data
+        has a transient period.
 
-        If `records` is an empty sequence, then `columns` is also empty.
+        This analyzer's test result and analysis are then of all the data
+        `running` was updated with. Raise :class:`NotImplementedError` if this
+        analyzer does not analyze online.
         """
-        return (rows[0]._fields, rows) if rows else ((), ())
+        if running is None:
+            running = Running()
+            self.close()
+        elif self._data is None:
+            self._data = self._columns.table()
+            self._columns = None
+        self._update(running, self._data)
+        self._running = running
+        return running
+
+    def _update(self, running, data):
+        """Update :class:`Running` state `running` with the data in :class:`Table` `data`"""
+        raise NotImplementedError
+
+    def prepare(self, data):
+        """Return a :class:`Table` of collected `data` prepared for test analysis
+
+        `data` is a :class:`Table` of all collected data.
+        """
+        return data
+
+    def load(self, data):
+        """Collect all data from :class:`Table` `data` and close data collection
+
+        The arrays of `data` are shared, not copied: they must not be modified.
+        Raise :class:`ValueError` if rows have already been collected.
+        """
+        if self._columns is None:
+            raise CollectionIsClosed()
+        if len(self._columns):
+            raise ValueError('cannot load data after collecting rows')
+        self._close(data)
 
     def close(self):
         """Close data collection"""
         if self._data is None:
-            (columns, records) = self.prepare(self._rows)
-            self._data = DataFrame.from_records(records, columns=columns)
-            self._rows = None
+            with profiling.stage('columns', len(self._columns)):
+                data = self._columns.table()
+            self._close(data)
+
+    def _close(self, data):
+        """Prepare :class:`Table` `data` of all collected data and close data collection"""
+        with profiling.stage('prepare', len(data)):
+            self._data = self.prepare(data)
+        self._columns = None
 
     def _test(self):
         """Close data collection and test collected data"""
         if self._result is None:
             self.close()
-            (self._result, self._reason) = self.test(self._data)
+            with profiling.stage('test', len(self._data)):
+                (self._result, self._reason) = self.test(self._data)
 
-    def _explain(self):
-        """Close data collection and explain collected data"""
-        if self._analysis is None:
+    def _lazy(self):
+        """Close data collection and return the dict of sections of the analysis of collected data"""
+        if self._sections is None:
             self.close()
-            self._analysis = self.explain(self._data)
-            self._timestamp = self._analysis.pop('timestamp', None)
-            self._duration = self._analysis.pop('duration', None)
+            self._sections = self.sections(self._data)
+        return self._sections
+
+    def _section(self, name):
+        """Return section `name` of the analysis of collected data, or None if there is no such section"""
+        sections = self._lazy()
+        if name not in sections:
+            return None
+        if name not in self._explained:
+            with profiling.stage('explain', len(self._data)):
+                self._explained[name] = sections[name]()
+        return self._explained[name]
+
+    def _explain(self, names):
+        """Return a dict of sections `names` of the analysis of collected data
+
+        Sections 'timestamp' and 'duration' are omitted, as are sections this
+        analyzer does not have.
+        """
+        sections = self._lazy()
+        return {
+            name: self._section(name) for name in names
+            if name in sections and name not in ('timestamp', 'duration')
+        }
+
+    def _needed(self, name):
+        """Return True if section `name` is cheap or is computed for the test result"""
+        return name not in self.expensive
 
     def _timestamp_from_dec(self, dec):
         """Return an absolute timestamp or decimal timestamp from `dec`.
@@ -145,9 +318,20 @@ class Analyzer():
         return dec
 
     @staticmethod
-    def _check_missing_samples(data, result, reason):
+    def _optional(config, name, default):
+        """Return the value of parameter `name` in `config`, or `default`"""
+        try:
+            return config.parameter(name)
+        except KeyError:
+            return default
+
+    def _check_missing_samples(self, data, result, reason):
         if reason is None:
-            if len(data.timestamp.diff().astype(float).round(0).tail(-1).unique()) > 1:
+            if self._running is not None:
+                intervals = self._running.intervals
+            else:
+                intervals = np.unique(np.round(np.diff(data.timestamp)))
+            if len(intervals) > 1:
                 return (False, "missing test samples")
         return result, reason
 
@@ -166,42 +350,82 @@ class Analyzer():
     @property
     def timestamp(self):
         """The ISO 8601 date-time timestamp, when the test started"""
-        self._explain()
-        return self._timestamp
+        return self._section('timestamp')
 
     @property
     def duration(self):
         """The test duration in seconds"""
-        self._explain()
-        return self._duration
+        return self._section('duration')
 
     @property
     def analysis(self):
         """A structured analysis of the collected data"""
-        self._explain()
-        return self._analysis
+        return self._explain(self._lazy())
+
+    def brief(self, names=None):
+        """Return a structured analysis of the collected data, of sections `names`
+
+        If `names` is None, then return the sections of :attr:`analysis` other
+        than expensive sections not computed for :attr:`result`: when the test
+        fails before computing a metric, the metric is not computed to explain
+        the failure.
+        """
+        if names is None:
+            self._test()
+            names = [name for name in self._lazy() if self._needed(name)]
+        return self._explain(names)
+
+    def _period(self, data):
+        """Return a dict of functions returning the timestamp and duration of `data`"""
+        return {
+            'timestamp': lambda: self._timestamp_from_dec(data.first.timestamp),
+            'duration': lambda: data.last.timestamp - data.first.timestamp,
+        }
 
     @staticmethod
-    def _statistics(data, units, ndigits=3):
-        """Return a dict of statistics for `data`, rounded to `ndigits`"""
+    def _statistics(data, units, ndigits=3, ddof=0):
+        """Return a dict of statistics for `data`, rounded to `ndigits`
+
+        `data` is an array or a :class:`QuantileSketch`. Standard deviation
+        and variance have `ddof` delta degrees of freedom.
+        """
         def _round(val):
             """Return `val` as native Python type or Decimal, rounded to `ndigits`"""
             try:
                 return round(val.item(), ndigits)
             except AttributeError:
                 return round(val, ndigits)
-        min_ = data.min()
-        max_ = data.max()
+        if isinstance(data, QuantileSketch):
+            (min_, max_, mean) = (data.min, data.max, data.mean)
+            variance = data.variance(ddof)
+            stddev = np.sqrt(variance)
+        else:
+            (min_, max_, mean) = (data.min(), data.max(), data.mean())
+            (stddev, variance) = (data.std(ddof=ddof), data.var(ddof=ddof))
         return {
             'units': units,
             'min': _round(min_),
             'max': _round(max_),
             'range': _round(max_ - min_),
-            'mean': _round(data.mean()),
-            'stddev': _round(data.std()),
-            'variance': _round(data.var()),
+            'mean': _round(mean),
+            'stddev': _round(stddev),
+            'variance': _round(variance),
         }
 
+    @staticmethod
+    def _percentiles(data, ndigits=3):
+        """Return a dict of percentiles of `data`, rounded to `ndigits`
+
+        `data` is an array, or a :class:`QuantileSketch` of the values.
+        Percentiles of an array are exact; those of a sketch are estimated
+        with the same interpolation, method 'lower' of :func:`numpy.percentile`.
+        """
+        if isinstance(data, QuantileSketch):
+            values = data.quantile(np.array(PERCENTILES) / 100)
+        else:
+            values = np.percentile(data, PERCENTILES, method='lower')
+        return {f'p{pct:g}': round(float(val), ndigits) for (pct, val) in zip(PERCENTILES, values)}
+
     def test(self, data):
         """This analyzer's test of the collected `data`.
 
@@ -215,10 +439,20 @@ class Analyzer():
         """
         raise NotImplementedError
 
-    def explain(self, data):
-        """Return a structured analysis of the collected `data`"""
+    def sections(self, data):
+        """Return a dict of the sections of a structured analysis of the collected `data`
+
+        Map the name of each section to a function of no arguments returning
+        the section. Sections 'timestamp' and 'duration' are the timestamp and
+        duration of the test (see :meth:`_period`). Return an empty dict if
+        there is no analysis.
+        """
         raise NotImplementedError
 
+    def explain(self, data):
+        """Return a structured analysis of the collected `data`, computing all sections"""
+        return {name: section() for (name, section) in self.sections(data).items()}
+
 
 class TimeErrorAnalyzerBase(Analyzer):
     """Analyze time error.
@@ -227,6 +461,7 @@ class TimeErrorAnalyzerBase(Analyzer):
     frozenset of values representing locked states.
     """
     locked = frozenset()
+    online = True
 
     def __init__(self, config):
         super().__init__(config)
@@ -241,44 +476,63 @@ class TimeErrorAnalyzerBase(Analyzer):
         # minimum test duration for a valid test
         self._duration_min = config.parameter('min-test-duration/s')
 
-    def prepare(self, rows):
-        idx = 0
-        try:
-            tstart = rows[0].timestamp + self._transient
-        except IndexError:
-            pass
-        else:
-            while idx < len(rows):
-                if tstart <= rows[idx].timestamp:
-                    break
-                idx += 1
-        return super().prepare(rows[idx:])
+    def prepare(self, data):
+        return super().prepare(skip_transient(data, self._transient))
+
+    def _update(self, running, data):
+        running.update(data, self.locked)
 
     def test(self, data):
+        running = self._running
+        if running is not None:
+            data = running
         if len(data) == 0:
             return ("error", "no data")
-        if frozenset(data.state.unique()).difference(self.locked): # pylint: disable=no-member
+        if running.unlocked if running is not None else unlocked(data, self.locked):
             return (False, "loss of lock")
-        terr_min = data.terror.min()
-        terr_max = data.terror.max()
+        if running is not None:
+            (terr_min, terr_max) = (running.terror.min, running.terror.max)
+        else:
+            (terr_min, terr_max) = (data.terror.min(), data.terror.max())
         if self._unacceptable <= max(abs(terr_min), abs(terr_max)):
             return (False, "unacceptable time error")
-        if data.iloc[-1].timestamp - data.iloc[0].timestamp < self._duration_min:
+        if data.last.timestamp - data.first.timestamp < self._duration_min:
             return (False, "short test duration")
         if len(data) - 1 < self._duration_min:
             return (False, "short test samples")
         return (True, None)
 
-    def explain(self, data):
+    def sections(self, data):
+        if self._running is not None:
+            data = self._running
         if len(data) == 0:
             return {}
         return {
-            'timestamp': self._timestamp_from_dec(data.iloc[0].timestamp),
-            'duration': data.iloc[-1].timestamp - data.iloc[0].timestamp,
-            'terror': self._statistics(data.terror, 'ns'),
+            **self._period(data),
+            'terror': lambda: {
+                **self._statistics(data.terror, 'ns', ddof=1),
+                'percentiles': self._percentiles(data.terror),
+            },
         }
 
 
+def unlocked(data, locked):
+    """Return True if the state in any row of :class:`Table` `data` is not in `locked`
+
+    States are compared as integer codes (see :meth:`Table.codes`).
+    """
+    (codes, values) = data.codes('state')
+    return not np.isin(codes, [code for (code, value) in enumerate(values) if value in locked]).all()
+
+
+def skip_transient(data, transient):
+    """Return :class:`Table` `data` from the first row after `transient` seconds"""
+    if len(data) == 0:
+        return data
+    after = data.timestamp[0] + float(transient) <= data.timestamp
+    return data[int(np.argmax(after)) if after.any() else len(data):]
+
+
 def calculate_limit(accuracy, limit_percentage, tau):
     """Calculate upper limit based on tau
 
@@ -301,31 +555,27 @@ def out_of_range(taus, samples, accuracy, limit):
     `accuracy` contains the list of upper bound limit functions
     `limit` is the percentage to apply the upper limit
 
-    Return `True` if any value in `samples` is out of range
+    Return `True` if any value in `samples` is out of range. Samples for taus
+    outside the range of `accuracy` are not checked.
     """
     for tau, sample in zip(taus, samples):
         mask = calculate_limit(accuracy, limit, tau)
-        if mask <= sample:
+        # taus outside the range of `accuracy` are not limited
+        if mask is not None and mask <= sample:
             return True
     return False
 
 
-def calculate_filter(input_signal, transient, sample_rate):
+def calculate_filter(input_signal, transient, sample_rate, cutoff=lowpass.CUTOFF, order=lowpass.ORDER):
     """Calculate digital low-pass filter from `input_signal`
 
-    scipy_signal.butter input arguments:
-        order of the filter: 1
-        critical Frequency in half cycles per sample:
-        (for digital filters is normalized from 0 to 1 where 1 is Nyquist frequency)
-          cutoff Frequency: 0.1Hz
-          sample_rate in samples per second
-        btype is band type or type of filter
-        analog=False since it is always a digital filter
-    scipy_signal.butter return arguments:
-        `numerator` coefficient vector and `denominator coefficient vector of the butterworth digital filter
-        """
-    numerator, denominator = scipy_signal.butter(1, 0.1 / (sample_rate / 2), btype="low", analog=False, output="ba")
-    lpf_signal = scipy_signal.filtfilt(numerator, denominator, input_signal.terror)
+    The Butterworth filter of `order` with `cutoff` frequency in Hz, for
+    samples at `sample_rate` per second, is applied forwards and backwards to
+    the time error of `input_signal` in chunks (see :mod:`vse_sync_pp.lowpass`).
+    Return an array of filtered samples after the first `transient` samples.
+    """
+    sos = lowpass.design(sample_rate, cutoff, order)
+    lpf_signal = lowpass.filtfilt(sos, np.asarray(input_signal.terror))
     lpf_signal = lpf_signal[transient:len(lpf_signal)]
     return lpf_signal
 
@@ -335,8 +585,13 @@ class TimeIntervalErrorAnalyzerBase(Analyzer):
 
     Derived classes calculate specific Time Interval Error metric focused on measuring
     the change of Time Error.
+
+    Derived classes may override class attribute `estimator`, specifying a
+    class estimating their metric online (see :mod:`vse_sync_pp.wander`), and
+    class attribute `online` to True to analyze data online with it.
     """
     locked = frozenset()
+    estimator = None
 
     def __init__(self, config):
         super().__init__(config)
@@ -344,69 +599,99 @@ class TimeIntervalErrorAnalyzerBase(Analyzer):
         self._transient = config.parameter('transient-period/s')
         # minimum test duration for a valid test
         self._duration_min = config.parameter('min-test-duration/s')
-        # limit initial tau observation windows from 1 to 10k taus
-        taus_below_10k = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 20, 30, 40, 50, 60, 70, 80, 90,
-                                  100, 200, 300, 400, 500, 600, 700, 800, 900, 1000, 2000, 3000,
-                                  4000, 5000, 6000, 7000, 8000, 9000, 10000])
-        # observation window upper limit to 100k samples in 5k increments
-        taus_above_10k = np.arange(15000, 100000, 5000)
         # `taus_list` contains range limit of obervation window intervals for which to compute the statistic
-        self._taus_list = np.concatenate((taus_below_10k, taus_above_10k))
+        try:
+            self._taus_list = np.array(config.parameter('taus/s'), dtype=float)
+        except KeyError:
+            self._taus_list = TAUS
+        # low-pass filter applied to time error before computing the statistic
+        self._cutoff = self._optional(config, 'filter-cutoff/Hz', lowpass.CUTOFF)
+        self._order = self._optional(config, 'filter-order', lowpass.ORDER)
         self._rate = None
         self._lpf_signal = None
 
-    def prepare(self, rows):
-        idx = 0
-        try:
-            tstart = rows[0].timestamp + self._transient
-        except IndexError:
-            pass
-        else:
-            while idx < len(rows):
-                if tstart <= rows[idx].timestamp:
-                    break
-                idx += 1
-        return super().prepare(rows[idx:])
+    def prepare(self, data):
+        return super().prepare(skip_transient(data, self._transient))
 
     @staticmethod
     def calculate_rate(data):
         # calculate sample rate using 100 samples
-        cumdelta = 0
-
-        for i in range(1, 100 if len(data) > 100 else len(data)):
-            cumdelta = cumdelta + data.iloc[i].timestamp - data.iloc[i - 1].timestamp
+        cumdelta = data[min(len(data), 100) - 1].timestamp - data.first.timestamp
         return round((1 / (cumdelta / 100)))
 
     def _test_common(self, data):
+        running = self._running
+        if running is not None:
+            data = running
         if len(data) == 0:
             return ("error", "no data")
-        if frozenset(data.state.unique()).difference(self.locked):
+        if running.unlocked if running is not None else unlocked(data, self.locked):
             return (False, "loss of lock")
-        if data.iloc[-1].timestamp - data.iloc[0].timestamp < self._duration_min:
+        if data.last.timestamp - data.first.timestamp < self._duration_min:
             return (False, "short test duration")
         if len(data) - 1 < self._duration_min:
             return (False, "short test samples")
         return None
 
-    def _explain_common(self, data):
+    def _sections_common(self, data, name):
+        """Return the sections of the analysis of `data`, with statistics of the metric at `name`"""
+        if self._running is not None:
+            data = self._running
         if len(data) == 0:
             return {}
-        if self._rate is None:
-            self._rate = self.calculate_rate(self._data)
-        if self._lpf_signal is None:
-            self._lpf_signal = calculate_filter(data, self._transient, self._rate)
-        return None
+        return {
+            **self._period(data),
+            name: self._explain_samples,
+        }
+
+    def _explain_samples(self):
+        """Return statistics of the metric, computing it if not yet computed"""
+        self._generate_taus()
+        return self._statistics(self._samples, 'ns')
+
+    def _needed(self, name):
+        # the metric is computed for the test result if data passes common checks
+        return super()._needed(name) or self._test_common(self._data) is None
+
+    def _update(self, running, data):
+        """Update `running` with `data`, and its online estimate of this analyzer's metric
+
+        As for computing the metric, samples in the transient period are
+        ignored. The estimate is used for this analyzer's test and analysis, if
+        there is an estimate for any tau.
+        """
+        if len(data) == 0:
+            return
+        # the first samples not yet ignored
+        skip = max(self._transient - len(running), 0)
+        running.update(data, self.locked)
+        if running.wander is None:
+            self._rate = self.calculate_rate(data)
+            running.wander = Wander(self.estimator, self._taus_list, self._rate, self._cutoff, self._order)
+        running.wander.update(data.terror[skip:])
+        (taus, samples) = running.wander.result()
+        if len(taus):
+            (self._taus, self._samples) = (taus, samples)
 
     def toplot(self):
         self.close()
         self._generate_taus()
         yield from zip(self._taus, self._samples)
 
+    def toarrays(self):
+        """Return a 2-tuple of float arrays (taus, samples) to plot"""
+        self.close()
+        self._generate_taus()
+        return (np.asarray(self._taus, dtype=float), np.asarray(self._samples, dtype=float))
+
     def _generate_taus(self):
         if self._rate is None:
             self._rate = self.calculate_rate(self._data)
         if self._lpf_signal is None:
-            self._lpf_signal = calculate_filter(self._data, self._transient, self._rate)
+            with profiling.stage('filter', len(self._data)):
+                self._lpf_signal = calculate_filter(
+                    self._data, self._transient, self._rate, self._cutoff, self._order,
+                )
         return None
 
 
@@ -416,6 +701,10 @@ class TimeDeviationAnalyzerBase(TimeIntervalErrorAnalyzerBase):
     Derived classes must override class attribute `locked`, specifying a
     frozenset of values representing locked states.
     """
+    estimator = TimeDeviation
+    online = True
+    expensive = frozenset(('tdev',))
+
     def __init__(self, config):
         super().__init__(config)
         # required system time deviation output
@@ -429,9 +718,10 @@ class TimeDeviationAnalyzerBase(TimeIntervalErrorAnalyzerBase):
         self._samples = None
 
     def _generate_taus(self):
-        super()._generate_taus()
         if self._samples is None:
-            self._taus, self._samples, errors, ns = allantools.tdev(self._lpf_signal, rate=self._rate, data_type="phase", taus=self._taus_list) # noqa
+            super()._generate_taus()
+            with profiling.stage('tdev', len(self._lpf_signal)):
+                (self._taus, self._samples) = decimation.tdev(self._lpf_signal, self._rate, self._taus_list)
 
     def test(self, data):
         result = self._test_common(data)
@@ -442,16 +732,8 @@ class TimeDeviationAnalyzerBase(TimeIntervalErrorAnalyzerBase):
             return (True, None)
         return result
 
-    def explain(self, data):
-        analysis = self._explain_common(data)
-        if analysis is None:
-            self._generate_taus()
-            return {
-                'timestamp': self._timestamp_from_dec(data.iloc[0].timestamp),
-                'duration': data.iloc[-1].timestamp - data.iloc[0].timestamp,
-                'tdev': self._statistics(self._samples, 'ns'),
-            }
-        return analysis
+    def sections(self, data):
+        return self._sections_common(data, 'tdev')
 
 
 class MaxTimeIntervalErrorAnalyzerBase(TimeIntervalErrorAnalyzerBase):
@@ -460,6 +742,10 @@ class MaxTimeIntervalErrorAnalyzerBase(TimeIntervalErrorAnalyzerBase):
     Derived classes must override class attribute `locked`, specifying a
     frozenset of values representing locked states.
     """
+    estimator = MaxTimeIntervalError
+    online = True
+    expensive = frozenset(('mtie',))
+
     def __init__(self, config):
         super().__init__(config)
         # required system maximum time interval error output in ns
@@ -473,9 +759,10 @@ class MaxTimeIntervalErrorAnalyzerBase(TimeIntervalErrorAnalyzerBase):
         self._samples = None
 
     def _generate_taus(self):
-        super()._generate_taus()
         if self._samples is None:
-            self._taus, self._samples, errors, ns = allantools.mtie(self._lpf_signal, rate=self._rate, data_type="phase", taus=self._taus_list) # noqa
+            super()._generate_taus()
+            with profiling.stage('mtie', len(self._lpf_signal)):
+                (self._taus, self._samples) = decimation.mtie(self._lpf_signal, self._rate, self._taus_list)
 
     def test(self, data):
         result = self._test_common(data)
@@ -486,13 +773,5 @@ class MaxTimeIntervalErrorAnalyzerBase(TimeIntervalErrorAnalyzerBase):
             return (True, None)
         return result
 
-    def explain(self, data):
-        analysis = self._explain_common(data)
-        if analysis is None:
-            self._generate_taus()
-            return {
-                'timestamp': self._timestamp_from_dec(data.iloc[0].timestamp),
-                'duration': data.iloc[-1].timestamp - data.iloc[0].timestamp,
-                'mtie': self._statistics(self._samples, 'ns'),
-            }
-        return analysis
+    def sections(self, data):
+        return self._sections_common(data, 'mtie')
@@ -5,6 +5,8 @@
 from .analyzer import Analyzer
 import copy
 
+import numpy as np
+
 STATE_FREERUN = 248
 STATE_LOCKED = 6
 STATE_HOLDOVER_IN_SPEC = 7
@@ -47,6 +49,17 @@ STATE_TRANSITION = {
                                   STATE_HOLDOVER_OUT_OF_SPEC3],
 }
 
+# the order of states in rows and columns of transition matrices
+STATES = tuple(STATE_NAMES)
+STATE_INDEX = {state: idx for (idx, state) in enumerate(STATES)}
+
+# STATE_LOOKUP[state] is the index of `state` in STATES
+STATE_LOOKUP = np.zeros(max(STATES) + 1, dtype=int)
+STATE_LOOKUP[list(STATES)] = np.arange(len(STATES))
+
+# ALLOWED_TRANSITIONS[i, j] is True if transition from STATES[i] to STATES[j] is legal
+ALLOWED_TRANSITIONS = np.array([[new in STATE_TRANSITION[current] for new in STATES] for current in STATES])
+
 BASE_CLOCK_CLASS_COUNT = {
     "count": 0,
     "transitions": {
@@ -90,6 +103,20 @@ def is_illegal_offset_scaled_log_variance(state, offset_scaled_log_variance):
     return offset_scaled_log_variance.upper() != OFFSET_SCALED_LOG_VARIANCE_FOR_CLOCK_CLASS[state].upper()
 
 
+def is_illegal_column(data, name, is_illegal, index):
+    """Return True if a value of field `name` is illegal in any row of `data` after the first
+
+    `is_illegal` is a function of (state, value) returning True if value is
+    illegal in state. `index` is an array of indices into :data:`STATES` of
+    the state of each row after the first. Each distinct value is checked
+    once, then rows are checked by their value's integer code.
+    """
+    (codes, values) = data.codes(name)
+    # illegal[i, code] is True if the value of `code` is illegal in state STATES[i]
+    illegal = np.array([[is_illegal(state, value) for value in values] for state in STATES])
+    return bool(illegal[index, codes[1:len(index) + 1]].any())
+
+
 def get_named_clock_class_result(clock_class_count):
     named_clock_class_count = {STATE_NAMES[k]: v for (k, v) in clock_class_count.items()}
     for clock_class in clock_class_count.values():
@@ -116,58 +143,43 @@ class ClockStateAnalyzer(Analyzer):
             STATE_HOLDOVER_OUT_OF_SPEC2: copy.deepcopy(BASE_CLOCK_CLASS_COUNT),
             STATE_HOLDOVER_OUT_OF_SPEC3: copy.deepcopy(BASE_CLOCK_CLASS_COUNT),
         }
-
-    def prepare(self, rows):
-        idx = 0
-        try:
-            tstart = rows[0].timestamp
-        except IndexError:
-            pass
-        else:
-            while idx < len(rows):
-                if tstart <= rows[idx].timestamp:
-                    break
-                idx += 1
-        return super().prepare(rows[idx:])
+        self._transitions = np.zeros((len(STATES), len(STATES)), dtype=int)
 
     def test(self, data):
         if len(data) == 0:
             return ("error", "no data")
 
-        if data.iloc[-1].timestamp - data.iloc[0].timestamp < self._duration_min:
+        if data.last.timestamp - data.first.timestamp < self._duration_min:
             return (False, "short test duration")
         if len(data) - 1 < self._duration_min:
             return (False, "short test samples")
 
-        state = None
-        illegal_transition = False
-        illegal_clock_accuracy = False
-        illegal_offset_scaled_log_variance = False
-        for index, row in data.iterrows():
-            clock_class = row['clock_class']
-            clock_accuracy = row['clockAccuracy']
-            offset_scaled_log_variance = row['offsetScaledLogVariance']
-
-            if (state is None) and (clock_class in STATE_TRANSITION):
-                state = clock_class
-            else:
-                if clock_class != state:
-                    self.transition_count += 1
-
-                if clock_class not in STATE_TRANSITION:
-                    return (False, f"wrong clock class {clock_class}")
-
-                if is_illegal_transition(state, clock_class):
-                    illegal_transition = True
-
-                self.clock_class_count[state]["transitions"][clock_class] += 1
-                state = clock_class
-                self.clock_class_count[clock_class]["count"] += 1
-
-                if is_illegal_clock_accuracy(state, clock_accuracy):
-                    illegal_clock_accuracy = True
-                if is_illegal_offset_scaled_log_variance(state, offset_scaled_log_variance):
-                    illegal_offset_scaled_log_variance = True
+        classes = data.clock_class
+        invalid = np.flatnonzero(~np.isin(classes, STATES))
+        stop = invalid[0] if len(invalid) else len(classes)
+        if stop == 0:
+            self.transition_count += 1
+            return (False, f"wrong clock class {data.first.clock_class}")
+        # each row after the first is a transition from the state before
+        index = STATE_LOOKUP[classes[:stop].astype(int)]
+        (current, new) = (index[:-1], index[1:])
+        self.transition_count += int(np.count_nonzero(current != new))
+        transitions = np.zeros_like(self._transitions)
+        np.add.at(transitions, (current, new), 1)
+        self._transitions += transitions
+        for (idx, state) in enumerate(STATES):
+            for (jdx, clock_class) in enumerate(STATES):
+                self.clock_class_count[state]["transitions"][clock_class] += int(transitions[idx, jdx])
+            self.clock_class_count[state]["count"] += int(transitions[:, idx].sum())
+        if stop < len(classes):
+            if classes[stop] != classes[stop - 1]:
+                self.transition_count += 1
+            return (False, f"wrong clock class {data[stop].clock_class}")
+        illegal_transition = not ALLOWED_TRANSITIONS[current, new].all()
+        illegal_clock_accuracy = is_illegal_column(data, 'clockAccuracy', is_illegal_clock_accuracy, new)
+        illegal_offset_scaled_log_variance = is_illegal_column(
+            data, 'offsetScaledLogVariance', is_illegal_offset_scaled_log_variance, new,
+        )
         if illegal_transition:
             return (False, "illegal state transition")
         if illegal_clock_accuracy:
@@ -176,13 +188,22 @@ class ClockStateAnalyzer(Analyzer):
             return (False, "illegal offset scaled log variance")
         return (True, None)
 
-    def explain(self, data):
+    @property
+    def transitions(self):
+        """The transition matrix: a 2D int array counting transitions between states
+
+        Element [i, j] counts transitions from state :data:`STATES` [i] to
+        state :data:`STATES` [j], including transitions from a state to itself.
+        """
+        self._test()
+        return self._transitions
+
+    def sections(self, data):
         if len(data) == 0:
             return {}
 
         return {
-            'timestamp': self._timestamp_from_dec(data.iloc[0].timestamp),
-            'duration': data.iloc[-1].timestamp - data.iloc[0].timestamp,
-            'clock_class_count': get_named_clock_class_result(self.clock_class_count),
-            'total_transitions': self.transition_count,
+            **self._period(data),
+            'clock_class_count': lambda: get_named_clock_class_result(self.clock_class_count),
+            'total_transitions': lambda: self.transition_count,
         }
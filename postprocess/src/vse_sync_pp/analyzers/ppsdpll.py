@@ -22,11 +22,6 @@ class TimeErrorAnalyzer(TimeErrorAnalyzerBase):
     # 4 = DPLL_HOLDOVER
     locked = frozenset({2, 3})
 
-    def prepare(self, rows):
-        return super().prepare([
-            r._replace(terror=float(r.terror)) for r in rows
-        ])
-
 
 class TimeDeviationAnalyzer(TimeDeviationAnalyzerBase):
     """Analyze DPLL time deviation"""
@@ -35,11 +30,6 @@ class TimeDeviationAnalyzer(TimeDeviationAnalyzerBase):
     # see 'state' values in `TimeErrorAnalyzer` comments
     locked = frozenset({2, 3})
 
-    def prepare(self, rows):
-        return super().prepare([
-            r._replace(terror=float(r.terror)) for r in rows
-        ])
-
 
 class MaxTimeIntervalErrorAnalyzer(MaxTimeIntervalErrorAnalyzerBase):
     """Analyze DPLL max time interval error"""
@@ -47,8 +37,3 @@ class MaxTimeIntervalErrorAnalyzer(MaxTimeIntervalErrorAnalyzerBase):
     parser = 'dpll/time-error'
     # see 'state' values in `TimeErrorAnalyzer` comments
     locked = frozenset({2, 3})
-
-    def prepare(self, rows):
-        return super().prepare([
-            r._replace(terror=float(r.terror)) for r in rows
-        ])
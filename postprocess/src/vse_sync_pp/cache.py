@@ -0,0 +1,116 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Share parsed datasets between processes in an on-disk cache
+
+Test implementations run in parallel each parse their input: when several
+analyze the same file, each parses it again. If environment variable
+VSE_SYNC_PP_CACHE is set to a directory, then parsed datasets are shared
+through that directory instead. The first process to parse a file saves the
+:class:`Table` parsed (see :meth:`Table.save`); processes wanting the same
+table meanwhile wait for it, then memory-map the table saved rather than
+parsing the file.
+
+Tables are content-addressed: each is identified by a hash of the content of
+the file parsed, of the parser id and of the arguments to parsing. A table is
+saved to a temporary directory, then renamed, so a table in the cache is
+complete. An advisory lock on a file beside each table serializes processes
+saving it. Tables of columns holding Python objects are not cached.
+
+Tables are not removed from the cache: remove the directory, or files in it,
+when no process is using it.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from . import profiling
+
+ENVIRON = 'VSE_SYNC_PP_CACHE'
+
+# the version of the format of tables cached, part of the key of each table
+FORMAT = 1
+
+# the number of bytes of a file hashed at a time
+BLOCK = 1 << 20
+
+
+def directory():
+    """Return the directory of the cache, or None if there is no cache"""
+    return os.environ.get(ENVIRON) or None
+
+
+def fingerprint(filename):
+    """Return a hex digest of the content of file `filename`"""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as fid:
+        for block in iter(lambda: fid.read(BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def key(filename, parser, **kwargs):
+    """Return the key of the table parsed from `filename` by parser of id `parser`
+
+    `kwargs` are the arguments to parsing, encoded as JSON.
+    """
+    content = json.dumps({
+        'format': FORMAT,
+        'input': fingerprint(filename),
+        'parser': parser,
+        'arguments': kwargs,
+    }, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class Cache():
+    """A cache of tables in directory `path`"""
+    def __init__(self, path):
+        self._path = path
+
+    def _load(self, dirname, type_):
+        """Return the table of rows of `type_` saved in `dirname`, or None if none is saved"""
+        from .columns import load  # pylint: disable=import-outside-toplevel
+        try:
+            return load(dirname, type_)
+        except FileNotFoundError:
+            return None
+
+    def _save(self, dirname, table):
+        """Save `table` in `dirname`, if it can be saved"""
+        tmpdir = tempfile.mkdtemp(prefix=os.path.basename(dirname) + '.', dir=self._path)
+        try:
+            table.save(tmpdir)
+            os.rename(tmpdir, dirname)
+        except ValueError:
+            # columns of Python objects
+            shutil.rmtree(tmpdir)
+        except BaseException:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+
+    def get(self, name, type_, build):
+        """Return the table of rows of namedtuple type `type_` cached at key `name`
+
+        If no table is cached at `name`, then call `build` to build the table
+        and save it at `name`. Concurrent calls for `name`, in this or any
+        other process, build the table once: the others wait for it to be
+        saved, then load it.
+        """
+        dirname = os.path.join(self._path, name)
+        table = self._load(dirname, type_)
+        if table is not None:
+            return table
+        os.makedirs(self._path, mode=0o700, exist_ok=True)
+        with open(dirname + '.lock', 'ab') as lock:
+            with profiling.stage('lock'):
+                # released when the lock file is closed
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            table = self._load(dirname, type_)
+            if table is None:
+                table = build()
+                self._save(dirname, table)
+        return table
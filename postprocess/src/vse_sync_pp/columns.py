@@ -0,0 +1,351 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Collect rows of data in typed, growable column buffers
+
+:class:`Columns` collects namedtuple rows, converting them a chunk at a time
+into one :class:`Buffer` per field. The type of each column is that of the
+field's value in the first row: integer and float fields are held in int64 and
+float64 arrays, :class:`Decimal` fields in float64 arrays, other fields in
+object arrays. A :class:`Table` presents the columns collected as arrays
+without copying them.
+
+Fields with few distinct string values, such as servo state and interface
+names, are parsed as :class:`Category` values interned in a
+:class:`Vocabulary`. Columns of categories are held as small-int codes into the
+vocabulary, so that comparing them is comparing integers.
+
+Values in rows of a :class:`Table` are restored to the type of the field.
+Decimal values are restored from the shortest representation of their float
+value: exactly, for values of up to 15 significant digits.
+
+A :class:`Table` saved to a directory by :meth:`Table.save` is loaded by
+:func:`load`, memory-mapping its columns rather than reading them.
+"""
+
+import json
+import os
+from decimal import Decimal
+from itertools import islice
+
+import numpy as np
+
+from .vocabulary import (  # noqa
+    Category,
+    Vocabulary,
+)
+
+# the number of rows converted to columns at a time
+CHUNK = 4096
+
+# the type of codes of categories in columns: columns of a vocabulary with more
+# values are held in object arrays
+CODE = np.int16
+
+# the name of the file describing a saved table, written after its columns
+META = 'table.json'
+
+
+class Buffer():
+    """A growable array of values of `dtype`"""
+    def __init__(self, dtype=float, capacity=1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dtype(self):
+        """The type of values in this buffer"""
+        return self._data.dtype
+
+    def _reserve(self, size):
+        """Grow this buffer, if necessary, to hold `size` values"""
+        if len(self._data) < size:
+            self._data = np.resize(self._data, max(size, 2 * len(self._data)))
+
+    def append(self, value):
+        """Append `value` to this buffer"""
+        self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        """Append array-like `values` to this buffer
+
+        Raise :class:`TypeError`, :class:`ValueError` or :class:`OverflowError`
+        if `values` cannot be converted to the type of this buffer.
+        """
+        if self.dtype == object:
+            values = np.fromiter(values, dtype=object, count=len(values))
+        else:
+            values = np.asarray(values, dtype=self.dtype)
+        size = self._size + len(values)
+        self._reserve(size)
+        self._data[self._size:size] = values
+        self._size = size
+
+    @property
+    def values(self):
+        """An array of the values in this buffer"""
+        return self._data[:self._size]
+
+
+def _decimal(value):
+    """Return a :class:`Decimal` restored from float `value`"""
+    return Decimal(repr(float(value)))
+
+
+def _identity(value):
+    """Return `value`"""
+    return value
+
+
+def _kind(value):
+    """Return (dtype, restore) for a column of values of the type of `value`
+
+    `restore` converts an element of an array of `dtype` to the type of `value`.
+    """
+    if isinstance(value, Decimal):
+        return (float, _decimal)
+    if isinstance(value, bool):
+        return (bool, bool)
+    if isinstance(value, int):
+        return (np.int64, int)
+    if isinstance(value, float):
+        return (float, float)
+    return (object, _identity)
+
+
+# name of a kind of column saved -> function restoring its values
+KINDS = {
+    'decimal': _decimal,
+    'bool': bool,
+    'int': int,
+    'float': float,
+}
+
+
+class Table():
+    """Rows of namedtuple type `type_`, as a mapping of field names to arrays
+
+    `arrays` maps each field name to an array of equal length. `restore` maps
+    each field name to a function converting an element of its array to a
+    value in a row. `categories` maps the name of each field of categories to
+    a tuple of the values of its codes. Columns are accessed as attributes of
+    a table, for example `table.timestamp`: a column of categories as an array
+    of its values.
+    """
+    def __init__(self, type_=None, arrays=None, restore=None, categories=None):
+        self._type = type_
+        self._arrays = arrays or {}
+        self._restore = restore or {}
+        self._categories = categories or {}
+        self._frame = None
+
+    def __len__(self):
+        for array in self._arrays.values():
+            return len(array)
+        return 0
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            array = self._arrays[name]
+        except KeyError as exc:
+            raise AttributeError(name) from exc
+        if name in self._categories:
+            return np.array(self._categories[name] or (None,), dtype=object)[array]
+        return array
+
+    def __getitem__(self, key):
+        """Return the row at integer `key`, or a table of the rows in slice `key`"""
+        if isinstance(key, slice):
+            arrays = {name: array[key] for (name, array) in self._arrays.items()}
+            return type(self)(self._type, arrays, self._restore, self._categories)
+        return self._type(*(self._restore[name](array[key]) for (name, array) in self._arrays.items()))
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    @property
+    def fields(self):
+        """A tuple of the field names of rows in this table"""
+        return tuple(self._arrays)
+
+    def codes(self, name):
+        """Return a 2-tuple (codes, values) for the column of field `name`
+
+        `codes` is an integer array indexing `values`, a tuple of the distinct
+        values in the column. Codes of a column of categories are those held.
+        """
+        if name in self._categories:
+            return (self._arrays[name], self._categories[name])
+        (values, codes) = np.unique(self._arrays[name], return_inverse=True)
+        return (codes, tuple(self._restore[name](value) for value in values))
+
+    @property
+    def first(self):
+        """The first row in this table"""
+        return self[0]
+
+    @property
+    def last(self):
+        """The last row in this table"""
+        return self[-1]
+
+    def frame(self):
+        """Return a pandas DataFrame of this table, constructed on first call"""
+        if self._frame is None:
+            from pandas import (  # pylint: disable=import-outside-toplevel
+                Categorical,
+                DataFrame,
+            )
+            arrays = dict(self._arrays)
+            for (name, values) in self._categories.items():
+                arrays[name] = Categorical.from_codes(arrays[name], categories=list(values))
+            self._frame = DataFrame(arrays, columns=self.fields)
+        return self._frame
+
+    def save(self, dirname):
+        """Save this table to files in existing directory `dirname`
+
+        Each column is saved to a NumPy ``.npy`` file, then the table is
+        described in file :data:`META`. Raise :class:`ValueError` if a column
+        holds Python objects, before saving any column.
+        """
+        kinds = {}
+        for (name, array) in self._arrays.items():
+            if name in self._categories and array.dtype != object:
+                continue
+            for (kind, restore) in KINDS.items():
+                if self._restore[name] is restore and array.dtype != object:
+                    kinds[name] = kind
+                    break
+            else:
+                raise ValueError(f'cannot save column {name} of Python objects')
+        for (name, array) in self._arrays.items():
+            np.save(os.path.join(dirname, f'{name}.npy'), array, allow_pickle=False)
+        with open(os.path.join(dirname, META), 'w', encoding='utf-8') as fid:
+            json.dump({
+                'rows': len(self),
+                'fields': self.fields,
+                'kinds': kinds,
+                'categories': self._categories,
+            }, fid)
+
+
+class Columns():
+    """Collect namedtuple rows in typed, growable column buffers
+
+    Rows collected are converted to columns in chunks of `chunk` rows.
+    """
+    def __init__(self, chunk=CHUNK):
+        self._chunk = chunk
+        self._type = None
+        self._buffers = {}
+        self._restore = {}
+        self._vocabularies = {}
+        self._pending = []
+
+    def __len__(self):
+        for buffer in self._buffers.values():
+            return len(buffer) + len(self._pending)
+        return len(self._pending)
+
+    def append(self, row):
+        """Collect `row`"""
+        self.extend((row,))
+
+    def extend(self, rows):
+        """Collect `rows`
+
+        `rows` may be an iterable of any length: rows are taken from it a
+        chunk at a time, so that at most a chunk of rows is held pending.
+        """
+        rows = iter(rows)
+        while True:
+            self._pending.extend(islice(rows, self._chunk - len(self._pending)))
+            if len(self._pending) < self._chunk:
+                return
+            self._flush()
+
+    def _flush(self):
+        """Convert pending rows to columns"""
+        if not self._pending:
+            return
+        if self._type is None:
+            row = self._pending[0]
+            self._type = type(row)
+            for (name, value) in zip(row._fields, row):
+                if isinstance(value, Category):
+                    self._vocabularies[name] = value.vocabulary
+                    (dtype, self._restore[name]) = (CODE, value.vocabulary.__getitem__)
+                else:
+                    (dtype, self._restore[name]) = _kind(value)
+                self._buffers[name] = Buffer(dtype)
+        for (name, values) in zip(self._type._fields, zip(*self._pending)):
+            try:
+                if name in self._vocabularies:
+                    self._buffers[name].extend(self._vocabularies[name].encode(values))
+                else:
+                    self._buffers[name].extend(values)
+            except (TypeError, ValueError, OverflowError):
+                # values of other types: hold all values in an object array
+                self._widen(name)
+                self._buffers[name].extend(values)
+        self._pending = []
+
+    def _widen(self, name):
+        """Hold values of field `name` in an object array"""
+        restore = self._restore[name]
+        buffer = Buffer(object, max(len(self._buffers[name]), 1))
+        buffer.extend([restore(value) for value in self._buffers[name].values])
+        self._buffers[name] = buffer
+        self._restore[name] = _identity
+        self._vocabularies.pop(name, None)
+
+    def table(self):
+        """Return a :class:`Table` of the rows collected
+
+        Arrays in the table are views of the column buffers, not copies.
+        """
+        self._flush()
+        arrays = {name: buffer.values for (name, buffer) in self._buffers.items()}
+        restore = dict(self._restore)
+        categories = {}
+        for (name, vocabulary) in self._vocabularies.items():
+            categories[name] = vocabulary.values
+            restore[name] = categories[name].__getitem__
+        return Table(self._type, arrays, restore, categories)
+
+
+def load(dirname, type_):
+    """Return a :class:`Table` of rows of namedtuple type `type_` saved in `dirname`
+
+    The table must have been saved by :meth:`Table.save`. Columns are
+    read-only memory maps of the files saved. Raise :class:`FileNotFoundError`
+    if no table is saved in `dirname`.
+    """
+    with open(os.path.join(dirname, META), encoding='utf-8') as fid:
+        meta = json.load(fid)
+    arrays = {}
+    for name in meta['fields']:
+        # a plain array viewing the memory map
+        arrays[name] = np.asarray(np.load(os.path.join(dirname, f'{name}.npy'), mmap_mode='r', allow_pickle=False))
+        if len(arrays[name]) != meta['rows']:
+            raise ValueError(f'column {name} of table saved in {dirname} has {len(arrays[name])} rows')
+    categories = {name: tuple(values) for (name, values) in meta['categories'].items()}
+    restore = {name: KINDS[kind] for (name, kind) in meta['kinds'].items()}
+    for (name, values) in categories.items():
+        restore[name] = values.__getitem__
+    return Table(type_ if arrays else None, arrays, restore, categories)
+
+
+def tabulate(rows):
+    """Return a :class:`Table` of namedtuple `rows` collected in columns"""
+    columns = Columns()
+    columns.extend(rows)
+    return columns.table()
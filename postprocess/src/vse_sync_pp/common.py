@@ -3,11 +3,12 @@
 """Common code for command line tools"""
 
 import sys
+from collections.abc import Mapping
 from contextlib import nullcontext
+from importlib import import_module
 
 import json
 from decimal import Decimal
-import numpy
 
 
 def open_input(filename, encoding='utf-8', **kwargs):
@@ -28,11 +29,41 @@ class JsonEncoder(json.JSONEncoder):
         """Return a commonly serializable value from `o`"""
         if isinstance(o, Decimal):
             return float(o)
-        if isinstance(o, numpy.ndarray):
+        # there are no arrays to encode unless numpy has been imported
+        numpy = sys.modules.get('numpy')
+        if numpy is not None and isinstance(o, numpy.ndarray):
             return o.tolist()
         return super().default(o)
 
 
+class Registry(Mapping):
+    """A mapping of ids to classes, importing each class when first accessed
+
+    `paths` maps each id to the path of its class, 'module.name', relative to
+    `package`. Ids are available without importing any module, so that
+    command line tools can offer choices of ids without paying the cost of
+    importing every class and its dependencies.
+    """
+    def __init__(self, package, paths):
+        self._package = package
+        self._paths = dict(paths)
+        self._classes = {}
+
+    def __getitem__(self, id_):
+        try:
+            return self._classes[id_]
+        except KeyError:
+            (module, _, name) = self._paths[id_].rpartition('.')
+            cls = self._classes[id_] = getattr(import_module(f'.{module}', self._package), name)
+            return cls
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+
 def print_loj(val, encoder_cls=JsonEncoder, flush=True):
     """Print value `val` as a line of JSON and, optionally, `flush` stdout.
 
@@ -0,0 +1,142 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Wander metrics at long taus, from a pyramid of decimated phase series
+
+Taus of at most :data:`MAX_FACTOR` samples are computed from the phase series
+itself (see :mod:`vse_sync_pp.parallel`). Longer taus are computed from a level
+of a :class:`DecimationPyramid`, which decimates the series by a power of
+:data:`FACTOR`: the coarsest level with at least :data:`MIN_FACTOR` samples in
+the tau. The cost of a tau computed at a level is that of the level, a fraction
+of the cost of the series.
+
+TDEV is the deviation of second differences of averages of phase. At a level,
+averages of whole blocks of samples are exact averages of the series, so TDEV
+is the same estimator as for the series but from averages starting at block
+boundaries only. A tau is rounded to whole blocks, as allantools rounds taus
+to whole samples: the tau used is reported.
+
+MTIE is the maximum range of phase in windows of a tau. At a level, the range
+in windows of whole blocks, from the minimum to the maximum of samples in
+each block, is computed for windows covering every window of the tau. The
+value reported is therefore an upper bound of MTIE for the tau, exceeding it by
+at most the increase in MTIE over one block.
+"""
+
+import numpy as np
+
+from . import parallel
+from .wander import (
+    averaging_factors,
+    max_range,
+)
+
+# taus of at most this many samples are computed from the series
+MAX_FACTOR = 100000
+
+# each level of a pyramid decimates the level before by this factor
+FACTOR = 10
+
+# longer taus are computed at the coarsest level with at least this many
+# samples in the tau
+MIN_FACTOR = 10000
+
+
+class DecimationPyramid():
+    """A pyramid of progressively decimated phase `series`
+
+    Level k decimates `series` by FACTOR^k: each sample of the level is a
+    block of FACTOR^k samples of `series`, represented by their mean, minimum
+    and maximum. Levels are computed on demand, each from the level before.
+    Samples at the end of `series` not filling a block are omitted.
+    """
+    def __init__(self, series):
+        series = np.asarray(series, dtype=float)
+        self._levels = [(series, series, series)]
+
+    def level(self, k):
+        """Return a 3-tuple of arrays (means, mins, maxs) of blocks at level `k`"""
+        while len(self._levels) <= k:
+            (means, mins, maxs) = self._levels[-1]
+            size = len(means) - len(means) % FACTOR
+            self._levels.append(tuple(
+                func(arr[:size].reshape(-1, FACTOR), axis=1)
+                for (func, arr) in ((np.mean, means), (np.min, mins), (np.max, maxs))
+            ))
+        return self._levels[k]
+
+
+def _levels(factors):
+    """Generator yielding (k, factor) for `factors` longer than MAX_FACTOR
+
+    `k` is the coarsest level with at least MIN_FACTOR samples in `factor`.
+    """
+    for factor in factors:
+        k = 0
+        while MIN_FACTOR * FACTOR ** (k + 1) <= factor:
+            k += 1
+        yield (k, int(factor))
+
+
+def _split(taus, rate):
+    """Return (short, long) arrays of averaging factors for `taus`"""
+    factors = averaging_factors(taus, rate)
+    return (factors[factors <= MAX_FACTOR], factors[MAX_FACTOR < factors])
+
+
+def _merge(short, long):
+    """Return a 2-tuple of arrays (taus, values) from (taus, values) `short` and `long`"""
+    taus = np.concatenate((short[0], long[0]))
+    values = np.concatenate((short[1], long[1]))
+    (taus, index) = np.unique(taus, return_index=True)
+    return (taus, values[index])
+
+
+def tdev(series, rate, taus):
+    """Return a 2-tuple of arrays (taus, tdev) of phase `series` at `rate` for `taus`
+
+    Taus for which TDEV cannot be computed are omitted.
+    """
+    import allantools  # pylint: disable=import-outside-toplevel
+    (short, long) = _split(taus, rate)
+    if not len(long):
+        return parallel.tdev(series, rate, taus)
+    result = parallel.tdev(series, rate, short / rate) if len(short) else (np.zeros(0), np.zeros(0))
+    pyramid = DecimationPyramid(series)
+    (ltaus, lvalues) = ([], [])
+    for (k, factor) in _levels(long):
+        block = FACTOR ** k
+        means = pyramid.level(k)[0]
+        # at least two second differences of averages of `blocks` blocks
+        blocks = round(factor / block)
+        if len(means) <= 3 * blocks:
+            continue
+        (taus_, values, _, _) = allantools.tdev(
+            means, rate=rate / block, data_type='phase', taus=[blocks * block / rate],
+        )
+        ltaus.extend(taus_)
+        lvalues.extend(values)
+    return _merge(result, (np.array(ltaus), np.array(lvalues)))
+
+
+def mtie(series, rate, taus):
+    """Return a 2-tuple of arrays (taus, mtie) of phase `series` at `rate` for `taus`
+
+    Taus for which MTIE cannot be computed are omitted.
+    """
+    (short, long) = _split(taus, rate)
+    if not len(long):
+        return parallel.mtie(series, rate, taus)
+    result = parallel.mtie(series, rate, short / rate) if len(short) else (np.zeros(0), np.zeros(0))
+    pyramid = DecimationPyramid(series)
+    (ltaus, lvalues) = ([], [])
+    for (k, factor) in _levels(long):
+        block = FACTOR ** k
+        (_, mins, maxs) = pyramid.level(k)
+        # windows of `blocks` blocks cover every window of factor + 1 samples
+        blocks = (factor + block - 1) // block + 1
+        # at least two windows
+        if len(maxs) - blocks + 1 < 2:
+            continue
+        ltaus.append(factor / rate)
+        lvalues.append(max_range(maxs, blocks, mins))
+    return _merge(result, (np.array(ltaus), np.array(lvalues)))
@@ -0,0 +1,187 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Follow growing log files and analyze log messages as they arrive"""
+
+import os
+import time
+from collections import deque
+
+# interval in seconds between checks for new content in a followed file
+POLL = 1.0
+
+# reasons for which a test failure may be reversed by more data
+PROVISIONAL = frozenset((
+    'short test duration',
+    'short test samples',
+))
+
+
+class Follow():
+    """A file object yielding lines from `file` as they are appended to it
+
+    When no complete line can be read from `file`, check for new content every
+    `poll` seconds. If `idle` is not None and no new content is appended for
+    `idle` seconds, then end the file. If `file` is truncated, then read again
+    from the start of `file`.
+
+    Checking for new content polls `file`, as is portable to any file system
+    and to files written by any process.
+    """
+    def __init__(self, file, poll=POLL, idle=None):
+        self._file = file
+        self._poll = poll
+        self._idle = idle
+        self._partial = ''
+
+    def _truncated(self):
+        """Return True if `file` is now shorter than the position read to"""
+        try:
+            return os.fstat(self._file.fileno()).st_size < self._file.tell()
+        except (AttributeError, OSError, ValueError):
+            return False
+
+    def readline(self):
+        """Return the next complete line, or '' at the end of the file"""
+        last = time.monotonic()
+        while True:
+            line = self._file.readline()
+            if line:
+                last = time.monotonic()
+                line = self._partial + line
+                if line.endswith('\n'):
+                    self._partial = ''
+                    return line
+                self._partial = line
+            elif self._idle is not None and self._idle <= time.monotonic() - last:
+                (line, self._partial) = (self._partial, '')
+                return line
+            else:
+                if self._truncated():
+                    self._file.seek(0)
+                time.sleep(self._poll)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if line == '':
+            raise StopIteration
+        return line
+
+    def close(self):
+        """Close the file followed"""
+        self._file.close()
+
+
+def summary(analyzer, brief=False):
+    """Return a dict of the test result and analysis from `analyzer`
+
+    If `brief` then the analysis is brief (see :meth:`Analyzer.brief`).
+    """
+    return {
+        'result': analyzer.result,
+        'timestamp': analyzer.timestamp,
+        'duration': analyzer.duration,
+        'reason': analyzer.reason,
+        'analysis': analyzer.brief() if brief else analyzer.analysis,
+    }
+
+
+class Rolling():
+    """Collect rows for an analyzer, with interim analyses as rows arrive
+
+    Rows are collected by an analyzer of class `cls` with configuration
+    `config`, for the final analysis of all rows. For each `interval` seconds
+    of rows collected after the transient period (by row timestamp), a new
+    analyzer of class `cls` analyzes the rows collected after the transient
+    period: if `window` is not None, then only rows in the last `window`
+    seconds.
+
+    If `window` is None and `cls` analyzes online (see
+    :meth:`Analyzer.estimate`), then each interim analyzer collects only the
+    rows since the last interim analysis, and updates the running state of
+    the analysis of all rows with them: rows are not analyzed again, nor kept
+    for interim analysis. Otherwise, if `window` is None, then interim
+    analyzers analyze the rows collected for the final analysis, without
+    copying them.
+
+    If `brief` then interim analyses are brief (see :meth:`Analyzer.brief`).
+    """
+    def __init__(self, cls, config, interval, window=None, brief=False):
+        self._cls = cls
+        self._analyzer = cls(config)
+        # rows within the transient period are excluded from the window, so
+        # interim analyzers have no transient period
+        try:
+            self._transient = config.parameter('transient-period/s')
+        except KeyError:
+            self._transient = 0
+        self._config = config.updated({'transient-period/s': 0})
+        self._interval = interval
+        self._window = window
+        self._brief = brief
+        self._online = window is None and cls.online
+        # rows in the window, or rows since the last interim analysis if online
+        self._rows = deque()
+        # timestamps of the first row and of the first row after the transient period
+        self._tzero = None
+        self._start = None
+        # the number of rows collected, and of rows within the transient period
+        self._count = 0
+        self._skip = None
+        self._next = None
+        self._interim = None
+        self._running = None
+
+    @property
+    def analyzer(self):
+        """The analyzer collecting all rows"""
+        return self._analyzer
+
+    @property
+    def interim(self):
+        """The last interim summary (see :func:`summary`), or None"""
+        return self._interim
+
+    @property
+    def failed(self):
+        """True if the last interim result is a failure more data cannot reverse"""
+        return bool(
+            self._interim
+            and self._interim['result'] is False
+            and self._interim['reason'] not in PROVISIONAL
+        )
+
+    def collect(self, row):
+        """Collect `row`; return an interim summary if one is due, otherwise None"""
+        self._analyzer.collect(row)
+        self._count += 1
+        if self._tzero is None:
+            self._tzero = row.timestamp
+        if row.timestamp - self._tzero < self._transient:
+            return None
+        if self._start is None:
+            self._start = row.timestamp
+            self._skip = self._count - 1
+            self._next = 1
+        if self._window is not None:
+            self._rows.append(row)
+            while self._window < row.timestamp - self._rows[0].timestamp:
+                self._rows.popleft()
+        elif self._online:
+            self._rows.append(row)
+        if float(row.timestamp - self._start) < self._next * self._interval:
+            return None
+        self._next = int(float(row.timestamp - self._start) // self._interval) + 1
+        analyzer = self._cls(self._config)
+        if self._online:
+            analyzer.collect(*self._rows)
+            self._rows.clear()
+            self._running = analyzer.estimate(self._running)
+        elif self._window is not None:
+            analyzer.collect(*self._rows)
+        else:
+            analyzer.load(self._analyzer.collected()[self._skip:])
+        self._interim = dict(summary(analyzer, self._brief), interim=True)
+        return self._interim
@@ -5,6 +5,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
 
 
 class Heatmap():
@@ -17,6 +18,7 @@ class Heatmap():
     unallowed_cells - a list of cells to be colored in red representing a bad relationship
                       between the two axis variables.
                       row/column format: ([0,1], [1,1])
+                      or a 2D array of row/column pairs, e.g. from numpy.argwhere
     colorbar_label - colorbar label
     xlabel - x axis label
     ylabel - y axis label
@@ -32,12 +34,16 @@ class Heatmap():
         self._ylabel = ylabel
 
     def plot(self, data, filename):
-        np_data = np.array(data)
+        """Plot 2D array-like `data` to image file `filename`
+
+        Element [i, j] of `data` is the value of the cell in row i, column j.
+        """
+        np_data = np.asarray(data)
         fig, ax = plt.subplots()
         im = ax.imshow(np_data, cmap="cividis")
 
         # Add a colorbar for reference
-        cbar = plt.colorbar(im)
+        cbar = fig.colorbar(im)
         cbar.set_label(self._colorbar_label)
 
         # Show all ticks and label them with the respective list entries
@@ -47,19 +53,19 @@ class Heatmap():
         # Rotate the tick labels and set their alignment.
         plt.setp(ax.get_xticklabels(), rotation=45, ha="right",
                  rotation_mode="anchor")
-        plt.xlabel(self._xlabel)
-        plt.ylabel(self._ylabel)
+        ax.set_xlabel(self._xlabel)
+        ax.set_ylabel(self._ylabel)
 
-        # Loop over data dimensions and create text annotations.
-        for i in range(len(self._x_ticks)):
-            for j in range(len(self._y_ticks)):
-                ax.text(j, i, np_data[i, j],
-                        ha="center", va="center", color="white")
+        # Create text annotations: matplotlib draws each text separately, one per cell.
+        for ((row, col), value) in np.ndenumerate(np_data):
+            ax.text(col, row, value, ha="center", va="center", color="white")
 
-        for row, col in self._unallowed_cells:
-            if np_data[row][col] >= 1:
-                rect = patches.Rectangle((col - 0.5, row - 0.5), 1, 1, linewidth=1, edgecolor='none', facecolor='red')
-                ax.add_patch(rect)
+        # Color all unallowed cells with a nonzero value in one collection.
+        cells = np.array(self._unallowed_cells, dtype=int).reshape(-1, 2)
+        cells = cells[np_data[cells[:, 0], cells[:, 1]] >= 1]
+        rects = [patches.Rectangle((col - 0.5, row - 0.5), 1, 1) for (row, col) in cells]
+        ax.add_collection(PatchCollection(rects, linewidth=1, edgecolor='none', facecolor='red'))
         ax.set_title(self._title)
         fig.tight_layout()
-        plt.savefig(filename)
+        fig.savefig(filename)
+        plt.close(fig)
@@ -0,0 +1,149 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Low-pass filter long series in chunks, in bounded memory
+
+:class:`FiltFilt` applies a filter forwards and backwards, as
+:func:`scipy.signal.sosfiltfilt` does, to a series presented in chunks. The
+forward pass carries filter state from chunk to chunk. The backward pass over
+each chunk starts from a settling overlap of forward output after the chunk,
+in which the error from not knowing the backward filter state decays below
+:data:`TOLERANCE` (relative to the magnitude of the series): filtered output
+therefore lags input by the overlap. At the end of the series, both passes
+extend the series by odd extension as :func:`scipy.signal.sosfiltfilt` does.
+
+Memory used by :class:`FiltFilt` is bounded by the chunk size plus the
+overlap, whatever the length of the series. :func:`filtfilt` returns the
+whole output, so also allocates one array the size of the series.
+"""
+
+from math import ceil, log
+
+import numpy as np
+
+# default filter: order and cutoff frequency in Hz
+ORDER = 1
+CUTOFF = 0.1
+
+# default number of samples in a chunk
+CHUNK = 65536
+
+# error in output from settling the backward filter state, relative to input
+TOLERANCE = 1e-12
+
+
+def design(rate, cutoff=CUTOFF, order=ORDER):
+    """Return second-order sections of a Butterworth low-pass filter
+
+    The filter of `order` has `cutoff` frequency in Hz for samples at `rate`.
+    """
+    from scipy import signal as scipy_signal  # pylint: disable=import-outside-toplevel
+    return scipy_signal.butter(order, cutoff / (rate / 2), btype='low', analog=False, output='sos')
+
+
+def padlen(sos):
+    """Return the length of odd extension at each end of a series, as for sosfiltfilt"""
+    ntaps = 2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    return 3 * int(ntaps)
+
+
+def overlap(sos, tolerance=TOLERANCE):
+    """Return the number of samples for the state of filter `sos` to settle
+
+    After this many samples, the impulse response of the filter has decayed
+    below `tolerance` relative to its peak.
+    """
+    from scipy import signal as scipy_signal  # pylint: disable=import-outside-toplevel
+    radius = max(np.abs(np.roots(section[3:])).max() for section in sos)
+    count = 2 * ceil(log(tolerance) / log(radius)) if 0 < radius < 1 else 1
+    while True:
+        impulse = np.zeros(2 * count)
+        impulse[0] = 1
+        response = np.abs(scipy_signal.sosfilt(sos, impulse))
+        if response[count:].max() < tolerance * response.max():
+            return count
+        count *= 2
+
+
+class FiltFilt():
+    """Apply filter `sos` forwards and backwards to a series presented in chunks
+
+    Call :meth:`update` with each chunk of the series, then :meth:`finish`:
+    each returns the samples of output ready. `overlap` is the number of
+    samples by which output lags input: if None, enough for the backward
+    filter state to settle.
+    """
+    def __init__(self, sos, overlap_=None):
+        from scipy import signal as scipy_signal  # pylint: disable=import-outside-toplevel
+        self._sosfilt = scipy_signal.sosfilt
+        self._sos = sos
+        self._zi = scipy_signal.sosfilt_zi(sos)
+        self._padlen = padlen(sos)
+        self._overlap = overlap(sos) if overlap_ is None else overlap_
+        # input before the forward pass starts, and the last input
+        self._head = np.zeros(0)
+        self._tail = np.zeros(0)
+        # forward filter state and output not yet returned
+        self._state = None
+        self._pending = np.zeros(0)
+
+    def _backward(self, forward, count):
+        """Return the first `count` samples of `forward` filtered backward"""
+        (backward, _) = self._sosfilt(self._sos, forward[::-1], zi=self._zi * forward[-1])
+        return backward[::-1][:count]
+
+    def update(self, samples):
+        """Filter `samples`; return an array of the output ready"""
+        samples = np.asarray(samples, dtype=float)
+        if self._state is None:
+            # the forward pass starts from odd extension of the first samples
+            self._head = np.concatenate((self._head, samples))
+            if len(self._head) <= self._padlen:
+                return np.zeros(0)
+            (samples, self._head) = (self._head, np.zeros(0))
+            extension = 2 * samples[0] - samples[self._padlen:0:-1]
+            (_, self._state) = self._sosfilt(self._sos, extension, zi=self._zi * extension[0])
+        (forward, self._state) = self._sosfilt(self._sos, samples, zi=self._state)
+        self._tail = np.concatenate((self._tail, samples))[-(self._padlen + 1):]
+        self._pending = np.concatenate((self._pending, forward))
+        count = len(self._pending) - self._overlap
+        if count <= 0:
+            return np.zeros(0)
+        output = self._backward(self._pending, count)
+        self._pending = self._pending[count:]
+        return output
+
+    def finish(self):
+        """Return an array of the remaining output, at the end of the series
+
+        Raise :class:`ValueError` if the series is too short to filter.
+        """
+        if self._state is None:
+            if len(self._head):
+                raise ValueError(f'series of {len(self._head)} samples is too short to filter')
+            return np.zeros(0)
+        # the backward pass starts from odd extension of the last samples
+        extension = 2 * self._tail[-1] - self._tail[-2::-1]
+        (forward, _) = self._sosfilt(self._sos, extension, zi=self._state)
+        output = self._backward(np.concatenate((self._pending, forward)), len(self._pending))
+        self._pending = np.zeros(0)
+        return output
+
+
+def filtfilt(sos, series, chunk=CHUNK):
+    """Return an array of `series` filtered forwards and backwards by `sos`
+
+    `series` is converted to float and filtered in chunks of `chunk` samples.
+    Output is written in place into one array the size of `series`,
+    allocated first: other temporary arrays are bounded by the chunk size
+    plus the overlap. Raise :class:`ValueError` if `series` is too short to
+    filter.
+    """
+    output = np.empty(len(series))
+    lpf = FiltFilt(sos)
+    idx = 0
+    for start in range(0, len(series), chunk):
+        filtered = lpf.update(np.asarray(series[start:start + chunk], dtype=float))
+        output[idx:idx + len(filtered)] = filtered
+        idx += len(filtered)
+    output[idx:] = lpf.finish()
+    return output
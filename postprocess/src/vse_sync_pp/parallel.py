@@ -0,0 +1,149 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Compute wander metrics, optionally in parallel across processes
+
+By default metrics are computed in this process, by allantools. If more than
+one process is configured, by calling :func:`configure` or by setting
+environment variable VSE_SYNC_PP_PROCESSES (to a number of processes, or to 0
+for one per CPU), then metrics of series of at least :data:`MIN_SAMPLES`
+samples are computed by a pool of worker processes. The series is shared with
+workers in shared memory, not copied to each worker.
+
+Workers compute TDEV for a partition of taus, each over the whole series. For
+MTIE, the series is partitioned into segments overlapping by the largest tau,
+workers compute the maximum range in windows of each tau in a segment and
+these maxima are merged. Results equal those computed in this process.
+"""
+
+import os
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .wander import (
+    averaging_factors,
+    max_range,
+)
+
+ENVIRON = 'VSE_SYNC_PP_PROCESSES'
+
+# minimum number of samples in a series for which to use worker processes
+MIN_SAMPLES = 100000
+
+
+def _from_environ():
+    """Return the number of processes set in the environment, or 1"""
+    try:
+        return int(os.environ.get(ENVIRON, '1')) or None
+    except ValueError:
+        return 1
+
+
+_PROCESSES = _from_environ()
+
+
+def configure(processes):
+    """Compute metrics using `processes` processes (if None, one per CPU)"""
+    global _PROCESSES  # pylint: disable=global-statement
+    _PROCESSES = processes
+
+
+def processes():
+    """Return the number of processes configured (if None, one per CPU)"""
+    return _PROCESSES
+
+
+def _count(series):
+    """Return the number of worker processes to use for `series`"""
+    count = _PROCESSES or os.cpu_count() or 1
+    return count if MIN_SAMPLES <= len(series) else 1
+
+
+# the series shared with a worker process
+_SERIES = None
+_SHM = None
+
+
+def _attach(name, length):
+    """Attach a worker process to the series in shared memory `name`"""
+    global _SERIES, _SHM  # pylint: disable=global-statement
+    _SHM = SharedMemory(name=name)
+    _SERIES = np.ndarray((length,), dtype=float, buffer=_SHM.buf)
+
+
+def _tdev(taus, rate):
+    """Return (taus, tdev) for `taus` of the series in a worker process"""
+    import allantools  # pylint: disable=import-outside-toplevel
+    (taus, values, _, _) = allantools.tdev(_SERIES, rate=rate, data_type='phase', taus=taus)
+    return (taus, values)
+
+
+def _mtie(start, stop, factors):
+    """Return the maximum range of the series from `start` to `stop` for `factors`
+
+    The maximum range for a factor is that of windows of factor + 1 samples,
+    or 0 if there are none.
+    """
+    series = _SERIES[start:stop]
+    return [max_range(series, factor + 1) or 0 for factor in factors]
+
+
+def _map(series, func, tasks, count):
+    """Return a list of results of `func` for `tasks` on `series` in `count` workers"""
+    shm = SharedMemory(create=True, size=max(series.nbytes, 1))
+    try:
+        np.ndarray(series.shape, dtype=float, buffer=shm.buf)[:] = series
+        with Pool(count, initializer=_attach, initargs=(shm.name, len(series))) as pool:
+            return pool.starmap(func, tasks)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def tdev(series, rate, taus):
+    """Return a 2-tuple of arrays (taus, tdev) of phase `series` at `rate` for `taus`
+
+    Taus for which TDEV cannot be computed are omitted, as by allantools.
+    """
+    import allantools  # pylint: disable=import-outside-toplevel
+    series = np.asarray(series, dtype=float)
+    count = _count(series)
+    factors = averaging_factors(taus, rate)
+    # allantools requires at least two second differences for a tau
+    factors = factors[3 * factors < len(series)]
+    if count == 1 or len(factors) < 2:
+        (taus, values, _, _) = allantools.tdev(series, rate=rate, data_type='phase', taus=taus)
+        return (taus, values)
+    # the cost for each tau is the same: distribute taus evenly
+    tasks = [(factors[idx::count] / rate, rate) for idx in range(min(count, len(factors)))]
+    results = _map(series, _tdev, tasks, count)
+    taus = np.concatenate([result[0] for result in results])
+    values = np.concatenate([result[1] for result in results])
+    order = np.argsort(taus)
+    return (taus[order], values[order])
+
+
+def mtie(series, rate, taus):
+    """Return a 2-tuple of arrays (taus, mtie) of phase `series` at `rate` for `taus`
+
+    Taus for which MTIE cannot be computed are omitted, as by allantools.
+    """
+    import allantools  # pylint: disable=import-outside-toplevel
+    series = np.asarray(series, dtype=float)
+    count = _count(series)
+    factors = averaging_factors(taus, rate)
+    # allantools requires at least two windows for a tau
+    factors = factors[factors < len(series) - 1]
+    if count == 1 or not len(factors):
+        (taus, values, _, _) = allantools.mtie(series, rate=rate, data_type='phase', taus=taus)
+        return (taus, values)
+    # segments of windows starting from `start`, overlapping by the largest tau
+    span = int(factors.max())
+    starts = np.linspace(0, len(series) - span, count + 1).astype(int)
+    tasks = [
+        (start, min(stop + span, len(series)), factors)
+        for (start, stop) in zip(starts[:-1], starts[1:])
+    ]
+    results = _map(series, _mtie, tasks, count)
+    return (factors / rate, np.max(np.array(results), axis=0))
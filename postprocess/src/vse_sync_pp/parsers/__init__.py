@@ -2,21 +2,14 @@
 
 """Parsers"""
 
-from . import dpll
-from . import gnss
-from . import ts2phc
-from . import phc2sys
-from . import pmc
-from . import ptp4l
+from ..common import Registry
 
-PARSERS = {
-    cls.id_: cls for cls in (
-        dpll.TimeErrorParser,
-        dpll.SMA1TimeErrorParser,
-        gnss.TimeErrorParser,
-        ts2phc.TimeErrorParser,
-        phc2sys.TimeErrorParser,
-        pmc.ClockClassParser,
-        ptp4l.TimeErrorParser,
-    )
-}
+PARSERS = Registry(__name__, {
+    'dpll/time-error': 'dpll.TimeErrorParser',
+    'dpll-sma1/time-error': 'dpll.SMA1TimeErrorParser',
+    'gnss/time-error': 'gnss.TimeErrorParser',
+    'ts2phc/time-error': 'ts2phc.TimeErrorParser',
+    'phc2sys/time-error': 'phc2sys.TimeErrorParser',
+    'phc/gm-settings': 'pmc.ClockClassParser',
+    'ptp4l/time-error': 'ptp4l.TimeErrorParser',
+})
@@ -7,6 +7,9 @@ import re
 from datetime import (datetime, timezone)
 from decimal import (Decimal, InvalidOperation)
 
+from .. import profiling
+from ..vocabulary import Vocabulary
+
 # sufficient regex to extract the whole decimal fraction part
 RE_ISO8601_DECFRAC = re.compile(
     r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})\.(\d+)(.*)$'
@@ -70,7 +73,22 @@ def relative_timestamp(parsed, tzero):
 
 
 class Parser():
-    """A base class providing common parser functionality"""
+    """A base class providing common parser functionality
+
+    Derived classes may override class attribute `categories`, naming elems
+    with few distinct string values. Values of these elems are interned in a
+    vocabulary for each elem by :meth:`category`, so that parsed values share
+    one :class:`vse_sync_pp.vocabulary.Category` for each distinct string.
+    """
+    categories = ()
+
+    def __init__(self):
+        self._vocabularies = {name: Vocabulary() for name in self.categories}
+
+    def category(self, name, value):
+        """Return string `value` of categorical elem `name` interned"""
+        return self._vocabularies[name].intern(str(value))
+
     def make_parsed(self, elems):
         """Return a namedtuple value from parsed iterable `elems`.
 
@@ -90,17 +108,11 @@ class Parser():
     def parse(self, file, relative=False):
         """Parse lines from `file` object.
 
-        This method is a generator yielding a namedtuple value for each
-        accepted line in `file`. If `relative` is truthy, then present all
+        Return a generator yielding a namedtuple value for each accepted line
+        in `file`. If `relative` is truthy, then present all
         timestamps relative to the first accepted line's timestamp.
         """
-        tzero = None
-        for line in file:
-            parsed = self.parse_line(line)
-            if parsed is not None:
-                if relative:
-                    tzero, parsed = relative_timestamp(parsed, tzero)
-                yield parsed
+        return profiling.iterate('parse', self._generate(file, self.parse_line, relative))
 
     def canonical(self, file, relative=False):
         """Parse canonical data from `file` object.
@@ -109,13 +121,25 @@ class Parser():
         parsed item per line in `file`. If `relative` is truthy, then present
         all timestamps relative to the first accepted line's timestamp.
 
-        This method is a generator yielding a namedtuple value for each line in
-        `file`.
+        Return a generator yielding a namedtuple value for each line in `file`.
+        """
+        return profiling.iterate('canonical', self._generate(file, self._parse_canonical, relative))
+
+    def _parse_canonical(self, line):
+        """Return a namedtuple value or None from canonical data in `line`"""
+        return self.make_parsed(json.loads(line, parse_float=Decimal))
+
+    @staticmethod
+    def _generate(file, parse_line, relative):
+        """Generator yielding a namedtuple value for each line in `file` parsed by `parse_line`
+
+        Lines for which `parse_line` returns None are discarded. If `relative`
+        is truthy, then present all timestamps relative to the first accepted
+        line's timestamp.
         """
         tzero = None
         for line in file:
-            obj = json.loads(line, parse_float=Decimal)
-            parsed = self.make_parsed(obj)
+            parsed = parse_line(line)
             if parsed is not None:
                 if relative:
                     tzero, parsed = relative_timestamp(parsed, tzero)
@@ -14,6 +14,7 @@ class TimeErrorParser(Parser):
     elems = ('timestamp', 'terror', 'state', 'delay')
     y_name = 'terror'
     parsed = namedtuple('Parsed', elems)
+    categories = ('state',)
 
     @staticmethod
     def build_regexp():
@@ -39,7 +40,7 @@ class TimeErrorParser(Parser):
             raise ValueError(elems)
         timestamp = parse_decimal(elems[0])
         terror = int(elems[1])
-        state = str(elems[2])
+        state = self.category('state', elems[2])
         delay = int(elems[3])
         return self.parsed(timestamp, terror, state, delay)
 
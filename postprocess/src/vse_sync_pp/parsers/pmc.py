@@ -13,14 +13,15 @@ class ClockClassParser(Parser):
     elems = ('timestamp', 'clock_class', 'clockAccuracy', 'offsetScaledLogVariance')
     y_name = 'clock_class'
     parsed = namedtuple('Parsed', elems)
+    categories = ('clockAccuracy', 'offsetScaledLogVariance')
 
     def make_parsed(self, elems):
         if len(elems) < len(self.elems):
             raise ValueError(elems)
         timestamp = parse_timestamp(elems[0])
         clock_class = int(elems[1])
-        clock_accuracy = str(elems[2]).rstrip()
-        offset_scaled_log_variance = str(elems[3]).rstrip()
+        clock_accuracy = self.category('clockAccuracy', str(elems[2]).rstrip())
+        offset_scaled_log_variance = self.category('offsetScaledLogVariance', str(elems[3]).rstrip())
         return self.parsed(timestamp, clock_class, clock_accuracy, offset_scaled_log_variance)
 
     def parse_line(self, line):
@@ -14,6 +14,7 @@ class TimeErrorParser(Parser):
     elems = ('timestamp', 'interface', 'terror', 'state', 'freq', 'path_delay')
     y_name = 'terror'
     parsed = namedtuple('Parsed', elems)
+    categories = ('interface', 'state')
 
     @staticmethod
     def build_regexp(interface=None):
@@ -39,9 +40,9 @@ class TimeErrorParser(Parser):
         if len(elems) < len(self.elems):
             raise ValueError(elems)
         timestamp = parse_decimal(elems[0])
-        interface = str(elems[1])
+        interface = self.category('interface', elems[1])
         terror = int(elems[2])
-        state = str(elems[3])
+        state = self.category('state', elems[3])
         freq = int(elems[4])
         path_delay = int(elems[5])
         return self.parsed(timestamp, interface, terror, state, freq, path_delay)
@@ -19,6 +19,7 @@ class TimeErrorParser(Parser):
     elems = ('timestamp', 'interface', 'terror', 'state')
     y_name = 'terror'
     parsed = namedtuple('Parsed', elems)
+    categories = ('interface', 'state')
 
     @staticmethod
     def _interface_pattern(interface):
@@ -60,9 +61,9 @@ class TimeErrorParser(Parser):
         if len(elems) < len(self.elems):
             raise ValueError(elems)
         timestamp = parse_decimal(elems[0])
-        interface = str(elems[1])
+        interface = self.category('interface', elems[1])
         terror = int(elems[2])
-        state = str(elems[3])
+        state = self.category('state', elems[3])
         return self.parsed(timestamp, interface, terror, state)
 
     def parse_line(self, line):
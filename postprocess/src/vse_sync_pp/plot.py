@@ -4,26 +4,109 @@
 
 from argparse import ArgumentParser
 
+import os.path
+
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from collections import namedtuple
 
+from .columns import (
+    Buffer,
+    tabulate,
+)
 from .common import open_input
 
 from .parsers import PARSERS
+from .pyramid import EnvelopePyramid
+from .sketch import QuantileSketch
 
 
 Axis = namedtuple("Axis", ["desc", "attr", "scale", "scale_kwargs"], defaults=[None, None, None, None])
 TIMESERIES = Axis("Time (s)", "timestamp")
 
+# the number of buckets for decimation: twice the width in pixels of a plot
+# 10 inches wide at matplotlib's default 100 dpi
+BUCKETS = 2000
+# the maximum number of data values in exact histograms and CDFs of plots
+# decimated: histograms and CDFs of more are drawn from a sketch
+EXACT = 1 << 20
+# the number of data values sketched at a time
+SKETCH_CHUNK = 1 << 16
+
+# kind of plot -> (number of rows of axes, figure size in inches)
+LAYOUTS = {
+    'plot': (2, (10, 8)),
+    'scatter': (1, (10, 4)),
+    'histogram': (1, (10, 4)),
+}
+
+
+def envelope(x, y, buckets, log=False):
+    """Return arrays (x, y) decimated to the envelope of y in `buckets` intervals of x.
+
+    The range of `x` is divided into `buckets` intervals of equal width (of
+    equal width in log10(x) if `log`). In each interval only the data points
+    with minimum and maximum y are kept, so that extremes of y are preserved.
+    Data points kept are returned in their original order. If there are at
+    most two data points for each interval, then `x` and `y` are returned.
+    """
+    if len(x) <= 2 * buckets:
+        return (x, y)
+    pos = np.log10(x) if log else x
+    (lo, hi) = (np.nanmin(pos), np.nanmax(pos))
+    if not hi > lo:
+        index = np.zeros(len(x), dtype=int)
+    else:
+        index = np.floor((pos - lo) * (buckets / (hi - lo)))
+        index = np.nan_to_num(index, nan=buckets).clip(0, buckets - 1).astype(int)
+    # order by interval, then y: the first and last in each interval are kept
+    order = np.lexsort((y, index))
+    ordered = index[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    keep = np.unique(np.concatenate((order[starts], order[ends])))
+    return (x[keep], y[keep])
+
 
 class Plotter():
-    """Rudimentary plotter of data values against timestamp"""
-    def __init__(self, x, y):
+    """Rudimentary plotter of data values against timestamp
+
+    Data values are stored in arrays. By default all data points are plotted
+    and histograms and CDFs are exact. If `buckets` is not None, then plots of
+    more than `buckets` data points are decimated (see :func:`envelope`), so
+    that the time to render a plot does not grow with the number of points:
+    histograms and CDFs of more than :data:`EXACT` data values are then drawn
+    from a :class:`QuantileSketch`.
+    """
+    def __init__(self, x, y, buckets=None):
         self._x = x
         self._y = y
-        self._x_data = []
-        self._y_data = []
+        self._buckets = buckets
+        self._x_buffer = Buffer()
+        self._y_buffer = Buffer()
+
+    @classmethod
+    def from_arrays(cls, x, y, x_data, y_data, buckets=None):
+        """Return a plotter of array-like `x_data` and `y_data` on axes `x` and `y`"""
+        plotter = cls(x, y, buckets)
+        plotter.extend(x_data, y_data)
+        return plotter
+
+    @classmethod
+    def from_table(cls, x, y, table, buckets=None):
+        """Return a plotter of the columns of :class:`Table` `table` on axes `x` and `y`"""
+        if len(table) == 0:
+            return cls(x, y, buckets)
+        return cls.from_arrays(x, y, getattr(table, x.attr), getattr(table, y.attr), buckets)
+
+    @property
+    def _x_data(self):
+        return self._x_buffer.values
+
+    @property
+    def _y_data(self):
+        return self._y_buffer.values
 
     @staticmethod
     def _extract_attr(axis, data):
@@ -32,59 +115,156 @@ class Plotter():
     def _set_yscale(self, ax):
         if self._y.scale is not None:
             ax.set_yscale(self._y.scale, **(self._y.scale_kwargs or {}))
-        elif any((abs(v) > 10 for v in self._y_data)):
+        elif np.any(np.abs(self._y_data) > 10):
             ax.set_yscale("symlog", linthresh=10)
 
     def append(self, data):
         """Append x and y data points extracted from `data`"""
-        self._x_data.append(self._extract_attr(self._x, data))
-        self._y_data.append(self._extract_attr(self._y, data))
+        self._x_buffer.append(self._extract_attr(self._x, data))
+        self._y_buffer.append(self._extract_attr(self._y, data))
+
+    def extend(self, x_data, y_data):
+        """Append data points from array-like `x_data` and `y_data`
+
+        `x_data` and `y_data` may be sequences, arrays or DataFrame columns of
+        equal length.
+        """
+        if len(x_data) != len(y_data):
+            raise ValueError(f'x and y data lengths differ: {len(x_data)} != {len(y_data)}')
+        self._x_buffer.extend(x_data)
+        self._y_buffer.extend(y_data)
 
     def _plot_scatter(self, ax):
         ax.axhline(0, color='black')
         self._set_yscale(ax)
         if self._x.scale is not None:
             ax.set_xscale(self._x.scale, **(self._x.scale_kwargs or {}))
-        ax.plot(self._x_data, self._y_data, '.')
+        (x_data, y_data) = (self._x_data, self._y_data)
+        if self._buckets is not None:
+            (x_data, y_data) = envelope(x_data, y_data, self._buckets, self._x.scale == 'log')
+        ax.plot(x_data, y_data, '.')
         ax.grid()
         ax.set_title(f'{self._x.desc} vs {self._y.desc}')
 
-    def _plot_hist(self, ax):
-        counts, bins = np.histogram(
-            np.array(self._y_data, dtype=float),
-            bins='scott'
+    def _sketch(self):
+        """Return a sketch of y data, or None to use y data directly
+
+        A sketch is only used for series decimated of more than :data:`EXACT`
+        values.
+        """
+        y_data = self._y_data
+        if self._buckets is None or len(y_data) <= max(2 * self._buckets, EXACT):
+            return None
+        sketch = QuantileSketch()
+        for start in range(0, len(y_data), SKETCH_CHUNK):
+            sketch.update(y_data[start:start + SKETCH_CHUNK])
+        return sketch if len(sketch) else None
+
+    def _plot_ecdf(self, ax, sketch=None):
+        if sketch is None:
+            ax.ecdf(self._y_data, color="black", linewidth=2)
+            return
+        (values, probabilities) = sketch.cdf()
+        ax.plot(
+            np.r_[values[0], values],
+            np.r_[0, probabilities],
+            drawstyle='steps-post', color="black", linewidth=2,
         )
+
+    def _plot_hist(self, ax, sketch=None):
+        if sketch is None:
+            counts, bins = np.histogram(
+                self._y_data,
+                bins='scott'
+            )
+        else:
+            counts, bins = sketch.histogram()
         ax.hist(bins[:-1], bins, weights=counts)
         self._set_yscale(ax)
         if self._x.scale is not None:
             ax.set_xscale(self._x.scale, **(self._x.scale_kwargs or {}))
         ax.set_title(f'Histogram of {self._y.desc}')
 
-    def plot(self, filename):
-        """Plot data to `filename`"""
-        fig, (ax1, ax2) = plt.subplots(2, constrained_layout=True)
-        fig.set_size_inches(10, 8)
+    def draw(self, fig, kind='plot'):
+        """Draw plot `kind` on matplotlib figure `fig` and return its axes
+
+        `kind` is one of the keys of :data:`LAYOUTS`. `fig` must be empty and
+        is resized for `kind`.
+        """
+        (nrows, size) = LAYOUTS[kind]
+        fig.set_size_inches(*size)
+        if kind == 'scatter':
+            ax = fig.subplots(nrows)
+            self._plot_scatter(ax)
+            return ax
+        if kind == 'histogram':
+            ax = fig.subplots(nrows)
+            self._plot_hist(ax, self._sketch())
+            return ax
+        (ax1, ax2) = fig.subplots(nrows)
         self._plot_scatter(ax1)
-        self._plot_hist(ax2)
+        sketch = self._sketch()
+        self._plot_hist(ax2, sketch)
         ax3 = ax2.twinx()
         ax3.set_ylabel('CDF')
-        ax3.ecdf(np.array(self._y_data, dtype=float), color="black", linewidth=2)
+        self._plot_ecdf(ax3, sketch)
+        return (ax1, ax2, ax3)
+
+    def _plot_kind(self, kind, filename):
+        fig = plt.figure(layout='constrained')
+        axes = self.draw(fig, kind)
         plt.savefig(filename)
-        return fig, (ax1, ax2, ax3)
+        return fig, axes
+
+    def plot(self, filename):
+        """Plot data to `filename`"""
+        return self._plot_kind('plot', filename)
 
     def plot_scatter(self, filename):
-        fig, ax = plt.subplots(1, constrained_layout=True)
-        fig.set_size_inches(10, 4)
-        self._plot_scatter(ax)
-        plt.savefig(filename)
-        return fig, ax
+        return self._plot_kind('scatter', filename)
 
     def plot_histogram(self, filename):
-        fig, ax = plt.subplots(1, constrained_layout=True)
-        fig.set_size_inches(10, 4)
-        self._plot_hist(ax)
-        plt.savefig(filename)
-        return fig, ax
+        return self._plot_kind('histogram', filename)
+
+    def _plot_envelope(self, ax, pyramid, x0, x1):
+        ax.axhline(0, color='black')
+        self._set_yscale(ax)
+        if self._x.scale is not None:
+            ax.set_xscale(self._x.scale, **(self._x.scale_kwargs or {}))
+        level = pyramid.level(x0, x1, self._buckets or BUCKETS)
+        (x_data, ymin, ymax) = pyramid.envelope(level, x0, x1)
+        ax.vlines(x_data, ymin, ymax, color='C0', linewidth=0.5)
+        ax.plot(np.r_[x_data, x_data], np.r_[ymin, ymax], '.', color='C0')
+        ax.set_xlim(x0, x1)
+        ax.grid()
+        ax.set_title(f'{self._x.desc} vs {self._y.desc}')
+
+    def plot_tiles(self, prefix, tiles, fmt='png'):
+        """Plot data to an overview image and `tiles` images of consecutive ranges of x
+
+        The overview is output to '`prefix`.`fmt`' and tiles to
+        '`prefix`_1.`fmt`', '`prefix`_2.`fmt`' and so on. Each image plots the
+        envelope of the data from an :class:`EnvelopePyramid` at the resolution
+        of the image, so that no image renders more than about `buckets`
+        intervals.
+        Return a list of 2-tuples (filename, (x0, x1)) for each image output,
+        where [x0, x1] is the range of x plotted.
+        """
+        log = self._x.scale == 'log'
+        pyramid = EnvelopePyramid(self._x_data, self._y_data, self._buckets or BUCKETS, log)
+        (lo, hi) = pyramid.extent
+        edges = (np.geomspace if log else np.linspace)(lo, hi, tiles + 1)
+        ranges = [(lo, hi)] + list(zip(edges[:-1], edges[1:]))
+        fig = Figure(layout='constrained')
+        outputs = []
+        for (idx, (x0, x1)) in enumerate(ranges):
+            fig.clear()
+            fig.set_size_inches(*LAYOUTS['scatter'][1])
+            self._plot_envelope(fig.subplots(), pyramid, x0, x1)
+            filename = f'{prefix}.{fmt}' if idx == 0 else f'{prefix}_{idx}.{fmt}'
+            fig.savefig(filename)
+            outputs.append((filename, (float(x0), float(x1))))
+        return outputs
 
 
 def main():
@@ -109,14 +289,28 @@ def main():
         'output',
         help="output image filename",
     )
+    aparser.add_argument(
+        '--tiles', type=int,
+        help="plot an overview of data to output, plus this many images of"
+             " consecutive time ranges, named by appending '_1', '_2', ... to"
+             " the output stem; the output extension gives the image format",
+    )
+    aparser.add_argument(
+        '--buckets', type=int,
+        help=f"decimate plots of more data points to this many intervals,"
+             f" for example {BUCKETS} (default: plot all data points)",
+    )
     args = aparser.parse_args()
     parser = PARSERS[args.parser]()
-    plotter = Plotter(TIMESERIES, Axis(parser.y_name, parser.y_name))
     with open_input(args.input) as fid:
         method = parser.canonical if args.canonical else parser.parse
-        for parsed in method(fid):
-            plotter.append(parsed)
-    plotter.plot(args.output)
+        table = tabulate(method(fid))
+    plotter = Plotter.from_table(TIMESERIES, Axis(parser.y_name, parser.y_name), table, args.buckets or None)
+    if args.tiles:
+        (stem, ext) = os.path.splitext(args.output)
+        plotter.plot_tiles(stem, args.tiles, ext.lstrip('.') or 'png')
+    else:
+        plotter.plot(args.output)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,31 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Import every module analysis uses, for processes forking analysis jobs
+
+Modules of vse_sync_pp import heavy libraries on first use, and analyzers and
+parsers are imported when first looked up (see :class:`Registry`), so that
+command line tools start fast. A process forking jobs (for example, a worker
+of ``python -m testdrive.run --fork``) should instead import everything its
+jobs use once, before forking: importing this module does so.
+"""
+
+# pylint: disable=unused-import
+import allantools  # noqa: F401
+import pandas  # noqa: F401
+import scipy.ndimage  # noqa: F401
+import scipy.signal  # noqa: F401
+import yaml  # noqa: F401
+
+from .analyzers import ANALYZERS
+from .analyzers import analyzer  # noqa: F401
+from .parsers import PARSERS
+from . import (  # noqa: F401
+    cache,
+    columns,
+    service,
+)
+
+# import each analyzer and parser class
+for registry in (ANALYZERS, PARSERS):
+    for _ in registry.values():
+        pass
@@ -0,0 +1,117 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Opt-in profiling of the stages of parsing and analysis
+
+Profiling is enabled if environment variable VSE_SYNC_PP_PROFILE is set to a
+value other than '' or '0', or by calling :func:`enable`. When enabled, the
+wall time, CPU time and rows processed are recorded for each stage, such as
+parsing log messages or testing data in an analyzer. When disabled, recording
+a stage costs only a check of whether profiling is enabled.
+"""
+
+import os
+import resource
+from contextlib import contextmanager
+from time import perf_counter, process_time
+
+ENVIRON = 'VSE_SYNC_PP_PROFILE'
+
+_ENABLED = os.environ.get(ENVIRON, '') not in ('', '0')
+
+# stage name -> dict of values recorded
+_STAGES = {}
+
+
+def enable(enabled=True):
+    """Enable profiling if `enabled`, otherwise disable it"""
+    global _ENABLED  # pylint: disable=global-statement
+    _ENABLED = bool(enabled)
+
+
+def enabled():
+    """Return True if profiling is enabled"""
+    return _ENABLED
+
+
+def _record(name, wall, cpu, rows):
+    """Record a call of stage `name` taking `wall` and `cpu` seconds for `rows`"""
+    try:
+        values = _STAGES[name]
+    except KeyError:
+        values = _STAGES[name] = {'calls': 0, 'wall_time': 0.0, 'cpu_time': 0.0, 'rows': 0}
+    values['calls'] += 1
+    values['wall_time'] += wall
+    values['cpu_time'] += cpu
+    values['rows'] += rows or 0
+    values['max_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Context manager recording the body as a call of stage `name` for `rows`"""
+    if not _ENABLED:
+        yield
+        return
+    (wall, cpu) = (perf_counter(), process_time())
+    try:
+        yield
+    finally:
+        _record(name, perf_counter() - wall, process_time() - cpu, rows)
+
+
+def iterate(name, iterable):
+    """Return an iterable of the items from `iterable`, recorded as stage `name`
+
+    Only the time taken to produce items is recorded, not the time taken by
+    the consumer of items. Each item counts as one row. If profiling is not
+    enabled, then return `iterable`.
+    """
+    if not _ENABLED:
+        return iterable
+    return _iterate(name, iterable)
+
+
+def _iterate(name, iterable):
+    """Generator yielding items from `iterable`, recorded as stage `name`"""
+    iterator = iter(iterable)
+    (wall, cpu, rows) = (0.0, 0.0, 0)
+    try:
+        while True:
+            (wall0, cpu0) = (perf_counter(), process_time())
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                wall += perf_counter() - wall0
+                cpu += process_time() - cpu0
+            rows += 1
+            yield item
+    finally:
+        _record(name, wall, cpu, rows)
+
+
+def report():
+    """Return a dict of the values recorded for each stage, then reset them
+
+    Each value is a dict with pairs for the number of calls of the stage
+    'calls', the total wall time and CPU time in seconds 'wall_time' and
+    'cpu_time', the total number of rows 'rows' and the peak resident set size
+    of this process in KiB at the end of the last call 'max_rss'.
+    """
+    profile = {
+        name: {key: round(val, 6) if isinstance(val, float) else val for (key, val) in values.items()}
+        for (name, values) in _STAGES.items()
+    }
+    _STAGES.clear()
+    return profile
+
+
+def attach(output):
+    """Return dict `output`, with a profile at key 'profile' if enabled
+
+    The profile is as returned by :func:`report`.
+    """
+    if _ENABLED:
+        output['profile'] = report()
+    return output
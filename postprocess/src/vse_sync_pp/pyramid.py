@@ -0,0 +1,112 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Multi-resolution envelopes of data series
+
+Used by :meth:`vse_sync_pp.plot.Plotter.plot_tiles` (option ``--tiles`` of
+``python -m vse_sync_pp.plot``) to draw an overview and tiles of a series.
+"""
+
+import numpy as np
+
+
+def _envelope(index, y, size):
+    """Return arrays (ymin, ymax) of `y` values in each of `size` buckets
+
+    `index` is an array of the bucket index of each value in `y`. Empty buckets
+    have NaN minimum and maximum.
+    """
+    ymin = np.full(size, np.nan)
+    ymax = np.full(size, np.nan)
+    if not len(index):
+        return (ymin, ymax)
+    if np.any(index[1:] < index[:-1]):
+        order = np.argsort(index, kind='stable')
+        (index, y) = (index[order], y[order])
+    starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+    ymin[index[starts]] = np.fmin.reduceat(y, starts)
+    ymax[index[starts]] = np.fmax.reduceat(y, starts)
+    return (ymin, ymax)
+
+
+class EnvelopePyramid():
+    """A multi-resolution pyramid of the envelope of data `y` against `x`
+
+    Level 0 divides the range of `x` (of log10(`x`) if `log`) into `buckets`
+    intervals of equal width, and each following level into twice as many
+    intervals as the level before. The last level has at most two data points
+    per interval on average, or is level `max_depth`. For each interval the
+    pyramid records the minimum and maximum of `y`, so that the extremes of `y`
+    are preserved at every level.
+
+    The last level is computed from the data; each other level from the level
+    after it. Memory used is bounded by the number of intervals in the last
+    level, not the number of data points.
+    """
+    def __init__(self, x, y, buckets, log=False, max_depth=10):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        keep = ~(np.isnan(x) | np.isnan(y))
+        (x, y) = (x[keep], y[keep])
+        self._log = log
+        pos = np.log10(x) if log else x
+        if len(pos):
+            (self._lo, self._hi) = (pos.min(), pos.max())
+        else:
+            (self._lo, self._hi) = (0.0, 1.0)
+        if not self._hi > self._lo:
+            self._hi = self._lo + 1
+        depth = 0
+        while depth < max_depth and 2 * buckets * (2 ** depth) < len(pos):
+            depth += 1
+        size = buckets * (2 ** depth)
+        index = np.floor((pos - self._lo) * (size / (self._hi - self._lo)))
+        index = index.clip(0, size - 1).astype(int)
+        self._levels = [_envelope(index, y, size)]
+        while len(self._levels) <= depth:
+            (ymin, ymax) = self._levels[0]
+            self._levels.insert(0, (
+                np.fmin(ymin[0::2], ymin[1::2]),
+                np.fmax(ymax[0::2], ymax[1::2]),
+            ))
+
+    def __len__(self):
+        return len(self._levels)
+
+    def _from_pos(self, pos):
+        """Return x values for positions `pos`"""
+        return np.power(10, pos) if self._log else pos
+
+    def _to_pos(self, x):
+        """Return positions for x values `x`"""
+        return np.log10(x) if self._log else x
+
+    @property
+    def extent(self):
+        """A 2-tuple (min, max) of the range of x values"""
+        return (self._from_pos(self._lo), self._from_pos(self._hi))
+
+    def level(self, x0, x1, buckets):
+        """Return the index of the coarsest level with at least `buckets` intervals in [`x0`, `x1`]
+
+        If no level has this many intervals, return the index of the last level.
+        """
+        fraction = (self._to_pos(x1) - self._to_pos(x0)) / (self._hi - self._lo)
+        for (idx, (ymin, _)) in enumerate(self._levels):
+            if len(ymin) * fraction >= buckets:
+                return idx
+        return len(self._levels) - 1
+
+    def envelope(self, level, x0=None, x1=None):
+        """Return arrays (x, ymin, ymax) for intervals at `level` overlapping [`x0`, `x1`]
+
+        `x` is the center of each interval. Empty intervals are omitted. If
+        `x0` or `x1` is None, then the range is unbounded below or above.
+        """
+        (ymin, ymax) = self._levels[level]
+        width = (self._hi - self._lo) / len(ymin)
+        start = 0 if x0 is None else max(int((self._to_pos(x0) - self._lo) // width), 0)
+        stop = len(ymin) if x1 is None else min(int(np.ceil((self._to_pos(x1) - self._lo) / width)), len(ymin))
+        pos = self._lo + (np.arange(start, stop) + 0.5) * width
+        (ymin, ymax) = (ymin[start:stop], ymax[start:stop])
+        keep = ~np.isnan(ymin)
+        return (self._from_pos(pos[keep]), ymin[keep], ymax[keep])
@@ -0,0 +1,161 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Render a batch of plots to image files.
+
+Run ``python -m vse_sync_pp.render``, or call :func:`render_all`, to render
+plots listed as :class:`PlotJob`. The plot scripts of the test suite do not
+render through this module: each is run as a separate process by the test
+driver.
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from collections import namedtuple
+from multiprocessing import Pool
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .common import (
+    open_input,
+    print_loj,
+)
+from .columns import tabulate
+from .parsers import PARSERS
+from .plot import Plotter, Axis, LAYOUTS
+
+
+PlotJob = namedtuple(
+    'PlotJob',
+    ('output', 'series', 'x', 'y', 'kind', 'title', 'parser', 'canonical'),
+    defaults=('plot', None, None, False),
+)
+PlotJob.__doc__ = """A plot to render to image file `output`.
+
+`series` is the filename of the data to plot: if `parser` is None, a NumPy
+.npz file containing arrays named by the `attr` of :class:`Axis` `x` and `y`;
+otherwise a log file (or canonical data, if `canonical`) parsed by the parser
+with id `parser`. `kind` is the kind of plot (see :data:`LAYOUTS`). If `title`
+is not None, then it is drawn as the title of the figure.
+"""
+
+
+def load(job):
+    """Return a :class:`Plotter` of the data for :class:`PlotJob` `job`"""
+    if job.parser is None:
+        with np.load(job.series) as arrays:
+            return Plotter.from_arrays(job.x, job.y, arrays[job.x.attr], arrays[job.y.attr])
+    parser = PARSERS[job.parser]()
+    with open_input(job.series) as fid:
+        method = parser.canonical if job.canonical else parser.parse
+        return Plotter.from_table(job.x, job.y, tabulate(method(fid)))
+
+
+class Renderer():
+    """Render plots using the Agg backend, reusing one figure per kind of plot
+
+    Reusing figures avoids the cost of creating a figure and canvas for each
+    plot rendered.
+    """
+    def __init__(self):
+        self._figures = {}
+
+    def _figure(self, kind):
+        """Return an empty figure for plot `kind`"""
+        try:
+            fig = self._figures[kind]
+        except KeyError:
+            fig = self._figures[kind] = Figure(layout='constrained')
+            FigureCanvasAgg(fig)
+        else:
+            fig.clear()
+        return fig
+
+    def render(self, job):
+        """Render :class:`PlotJob` `job`; return an item for the image output
+
+        The item is a dict with pairs for 'path' and, if `job` has a title,
+        'title', as output by plot scripts.
+        """
+        fig = self._figure(job.kind)
+        load(job).draw(fig, job.kind)
+        if job.title is not None:
+            fig.suptitle(job.title)
+        fig.savefig(job.output)
+        item = {'path': job.output}
+        if job.title is not None:
+            item['title'] = job.title
+        return item
+
+
+# the renderer in a worker process
+_RENDERER = None
+
+
+def _render(job):
+    """Render `job` in a worker process"""
+    global _RENDERER  # pylint: disable=global-statement
+    if _RENDERER is None:
+        _RENDERER = Renderer()
+    return _RENDERER.render(job)
+
+
+def render_all(jobs, processes=None):
+    """Render :class:`PlotJob` `jobs`; return a list of items for images output
+
+    Plots are rendered in parallel by `processes` worker processes (by default,
+    one per CPU), each reusing figures between plots. If `processes` is 1, then
+    plots are rendered in this process.
+    """
+    if processes == 1:
+        renderer = Renderer()
+        return [renderer.render(job) for job in jobs]
+    with Pool(processes) as pool:
+        return pool.map(_render, jobs)
+
+
+def _axis(obj):
+    """Return an :class:`Axis` from JSON object `obj`"""
+    return Axis(**obj)
+
+
+def job_from_json(obj):
+    """Return a :class:`PlotJob` from JSON object `obj`
+
+    Pairs for 'x' and 'y' are objects with pairs for fields of :class:`Axis`.
+    """
+    return PlotJob(**dict(obj, x=_axis(obj['x']), y=_axis(obj['y'])))
+
+
+def main():
+    """Render a batch of plots to image files.
+
+    Each line of input is a JSON object specifying a plot to render, with pairs
+    for 'output', 'series', 'x', 'y' and optionally 'kind', 'title', 'parser'
+    and 'canonical' (see :class:`PlotJob`). Print the images output as a JSON
+    array, as plot scripts do.
+    """
+    aparser = ArgumentParser(description=main.__doc__)
+    aparser.add_argument(
+        '-j', '--processes', type=int,
+        help="number of worker processes (default: one per CPU)",
+    )
+    aparser.add_argument(
+        'input',
+        help="input file, or '-' to read from stdin",
+    )
+    args = aparser.parse_args()
+    with open_input(args.input) as fid:
+        jobs = [job_from_json(json.loads(line)) for line in fid if line.strip()]
+    unknown = {job.kind for job in jobs}.difference(LAYOUTS)
+    if unknown:
+        aparser.error(f'unknown kind of plot: {", ".join(sorted(unknown))}')
+    # Python exits with error code 1 on EPIPE
+    if not print_loj(render_all(jobs, args.processes)):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
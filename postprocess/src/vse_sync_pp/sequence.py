@@ -7,7 +7,6 @@ import sys
 from sys import stdin
 
 from collections import namedtuple
-import yaml
 
 from .common import print_loj
 
@@ -32,6 +31,7 @@ def build_emit(available, include=(), exclude=()):
 
 def build_sources(parsers, filename, encoding='utf-8'):
     """Generator yielding (id_, data) generators for sources in `filename`"""
+    import yaml  # pylint: disable=import-outside-toplevel
     parsers = {id_: cls() for (id_, cls) in parsers.items()}
     with open(filename, encoding=encoding) as fid:
         for obj in yaml.safe_load_all(fid.read()):
@@ -0,0 +1,611 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Serve analysis from a persistent process, caching datasets and results
+
+A test suite runs a reference implementation and a plotter for each test, each
+in a new process importing the scientific stack and parsing its input again.
+Run ``python -m vse_sync_pp.service`` to serve analysis from one persistent
+process instead: it listens on a Unix domain socket, keeps recently parsed
+datasets in a least-recently-used cache, each with a cache of the analyzers
+recently used on it, and answers requests to analyze a file. Analyzers are
+evicted with their dataset, so the number of datasets cached bounds the
+memory used. A cached analyzer computes each section of its analysis, and
+the arrays it plots, only when first requested.
+
+Clients call :func:`analyze`. If no service is listening, or if profiling is
+enabled (so that the profile is of the process analyzing), then
+:func:`analyze` analyzes in-process instead: the result is the same. A client
+uses a service only if it runs the same code as the client: the service
+answers 'ping' with its :func:`identity`, the package version and a digest of
+its sources, which the client checks before each request. A service left
+running from another checkout or environment is not used.
+
+The socket is at the path in environment variable VSE_SYNC_PP_SOCKET, if set,
+otherwise in the user's runtime directory (or the temporary directory) and is
+accessible only by its owner. Requests and responses are lines of JSON: a
+request is an object with the method called at 'method' and its keyword
+arguments at 'params'; a response is an object with the value returned at
+'result', or a description of the exception raised at 'error', with the name
+of its type at 'type' and its arguments at 'args'. Methods are 'analyze' (see
+:meth:`Service.analyze`), 'stats' (see :meth:`Service.stats`), 'ping' and
+'shutdown'. Clients raise a built-in exception raised in the service, such as
+:class:`FileNotFoundError` for an input missing, as its own type.
+
+Whether analyzing in-process or in the service, datasets are shared with
+other processes through the on-disk cache, if there is one (see
+:mod:`vse_sync_pp.cache`).
+
+If environment variable VSE_SYNC_PP_BRIEF is set to a value other than '' or
+'0', then :func:`analyze` returns brief analyses (see :meth:`Analyzer.brief`):
+expensive metrics are not computed to explain a test failing before them.
+
+Cached datasets and analyzers are identified by the file analyzed and the
+configuration file used, including their size and modification time: when a
+file changes, it is parsed and analyzed again.
+"""
+
+from argparse import ArgumentParser
+import builtins
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata
+
+from .common import (
+    JsonEncoder,
+    open_input,
+    print_loj,
+)
+from . import (
+    cache,
+    profiling,
+)
+
+ENVIRON = 'VSE_SYNC_PP_SOCKET'
+BRIEF = 'VSE_SYNC_PP_BRIEF'
+
+# default number of parsed datasets cached, and of analyzers cached per dataset
+DATASETS = 4
+ANALYSES = 16
+
+
+class ServiceError(Exception):
+    """The service failed to handle a request"""
+    # empty
+
+
+@lru_cache(maxsize=None)
+def identity():
+    """Return a dict identifying the code of this package
+
+    The dict has the version of the package installed, or None if it is not
+    installed, at 'version' and a hex digest of the path and content of each
+    of its source files at 'sources'.
+    """
+    try:
+        version = metadata.version('vse-sync-pp')
+    except metadata.PackageNotFoundError:
+        version = None
+    root = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for (dirpath, dirnames, filenames) in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith('.py'):
+                filename = os.path.join(dirpath, name)
+                digest.update(os.path.relpath(filename, root).encode() + b'\0')
+                with open(filename, 'rb') as fid:
+                    digest.update(hashlib.sha256(fid.read()).digest())
+    return {'version': version, 'sources': digest.hexdigest()}
+
+
+def address():
+    """Return the path of the service socket"""
+    path = os.environ.get(ENVIRON)
+    if path:
+        return path
+    basedir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(basedir, f'vse_sync_pp-{os.getuid()}.sock')
+
+
+class LRU():
+    """A cache of at most `size` values, evicting the least recently used
+
+    Concurrent calls of :meth:`get` for the same key build its value once.
+    """
+    def __init__(self, size):
+        self._size = size
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> lock held while building its value
+        self._building = {}
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def values(self):
+        """Return a list of the values cached"""
+        with self._lock:
+            return list(self._values.values())
+
+    def get(self, key, build):
+        """Return the value cached at `key`, or cache and return `build()`"""
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            with self._lock:
+                if key in self._values:
+                    self._values.move_to_end(key)
+                    self._hits += 1
+                    return self._values[key]
+                self._misses += 1
+            try:
+                value = build()
+                with self._lock:
+                    self._values[key] = value
+                    while self._size < len(self._values):
+                        self._values.popitem(last=False)
+                return value
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+
+    def stats(self):
+        """Return a dict of the size, length, hits and misses of this cache"""
+        with self._lock:
+            return {
+                'size': self._size,
+                'length': len(self._values),
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+
+def _identity(filename):
+    """Return a tuple identifying the content of file `filename`
+
+    Raise :class:`OSError` if `filename` cannot be accessed.
+    """
+    path = os.path.realpath(filename)
+    status = os.stat(path)
+    return (path, status.st_dev, status.st_ino, status.st_size, status.st_mtime_ns)
+
+
+def _parser_id(analyzer, parser):
+    """Return `parser` if not None, otherwise the id of the parser for `analyzer`"""
+    if parser is not None:
+        return parser
+    from .analyzers import ANALYZERS  # pylint: disable=import-outside-toplevel
+    return ANALYZERS[analyzer].parser
+
+
+def _parser(analyzer, parser, kwargs):
+    """Return a parser for `analyzer`, of id `parser` if not None, built with `kwargs`"""
+    from .parsers import PARSERS  # pylint: disable=import-outside-toplevel
+    return PARSERS[_parser_id(analyzer, parser)](**kwargs)
+
+
+def _analyzer(analyzer, config):
+    """Return analyzer of id `analyzer` configured by YAML file `config`, if not None"""
+    from .analyzers import (  # pylint: disable=import-outside-toplevel
+        ANALYZERS,
+        Config,
+    )
+    return ANALYZERS[analyzer](Config.from_yaml(config) if config else Config())
+
+
+def _rows(parser, fid, canonical):
+    """Return an iterable of rows parsed by `parser` from `fid`"""
+    return parser.canonical(fid) if canonical else parser.parse(fid)
+
+
+def _table(filename, analyzer, parser, kwargs, canonical, encoding):
+    """Return a :class:`Table` of the data in `filename` parsed for `analyzer`
+
+    Arguments are as for :meth:`Service.analyze`. If there is an on-disk
+    cache (see :mod:`vse_sync_pp.cache`), then the table is shared with other
+    processes through the cache.
+    """
+    from .columns import tabulate  # pylint: disable=import-outside-toplevel
+    instance = _parser(analyzer, parser, kwargs)
+
+    def build():
+        with open_input(filename, encoding=encoding) as fid:
+            return tabulate(_rows(instance, fid, canonical))
+    path = cache.directory()
+    if path is None or filename == '-':
+        return build()
+    name = cache.key(
+        filename, _parser_id(analyzer, parser),
+        kwargs=kwargs, canonical=bool(canonical), encoding=encoding,
+    )
+    return cache.Cache(path).get(name, instance.parsed, build)
+
+
+def summarize(analyzer, brief=False, arrays=False):
+    """Return a dict summarizing `analyzer`
+
+    The summary has the test result, reason, timestamp, duration and analysis
+    at the keys of these names, then: at key 'arrays', if `arrays` then the
+    arrays to plot if the analyzer plots arrays; at key 'transitions', the
+    transition matrix if the analyzer counts transitions. If `brief` then the
+    analysis is brief (see :meth:`Analyzer.brief`).
+    """
+    summary = {
+        'result': analyzer.result,
+        'reason': analyzer.reason,
+        'timestamp': analyzer.timestamp,
+        'duration': analyzer.duration,
+        'analysis': analyzer.brief() if brief else analyzer.analysis,
+    }
+    if arrays and hasattr(analyzer, 'toarrays'):
+        summary['arrays'] = analyzer.toarrays()
+    if hasattr(analyzer, 'transitions'):
+        summary['transitions'] = analyzer.transitions
+    return summary
+
+
+class Analysis():
+    """The analysis of a file, from summary dict `summary` (see :func:`summarize`)
+
+    If `summary` has no arrays to plot, then `arrays` is a function of no
+    arguments returning a summary with arrays, called when arrays are needed.
+    """
+    def __init__(self, summary, arrays=None):
+        self._summary = summary
+        self._arrays = arrays
+
+    @property
+    def result(self):
+        """The test result"""
+        return self._summary['result']
+
+    @property
+    def reason(self):
+        """The reason for the test result"""
+        return self._summary['reason']
+
+    @property
+    def timestamp(self):
+        """The timestamp of the data analyzed"""
+        return self._summary['timestamp']
+
+    @property
+    def duration(self):
+        """The duration of the data analyzed"""
+        return self._summary['duration']
+
+    @property
+    def analysis(self):
+        """The analysis of the data"""
+        return self._summary['analysis']
+
+    def toarrays(self):
+        """Return a 2-tuple of float arrays (taus, samples) to plot"""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        if 'arrays' not in self._summary:
+            self._summary['arrays'] = self._arrays()['arrays']
+        return tuple(np.asarray(array, dtype=float) for array in self._summary['arrays'])
+
+    @property
+    def transitions(self):
+        """The transition matrix: a 2D int array counting transitions between states"""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        return np.asarray(self._summary['transitions'], dtype=int)
+
+
+class Service():
+    """Analyze files, caching parsed datasets and analyzers
+
+    At most `datasets` parsed datasets are cached and, for each, at most
+    `analyses` analyzers of it. Analyzers are evicted with their dataset.
+    """
+    def __init__(self, datasets=DATASETS, analyses=ANALYSES):
+        self._datasets = LRU(datasets)
+        self._analyses = analyses
+
+    def analyze(
+        self, filename, analyzer, config=None, parser=None,
+        canonical=False, encoding='utf-8', brief=False, arrays=False, **kwargs,
+    ):
+        """Return a summary dict of `analyzer` having collected data in `filename`
+
+        `analyzer` is the id of the analyzer, configured by YAML file `config`
+        if not None. Data is parsed by the parser of id `parser` if not None,
+        otherwise by the parser for `analyzer`, built with `kwargs`. If
+        `canonical` then `filename` contains canonical data. The summary is as
+        returned by :func:`summarize` for `brief` and `arrays`.
+        """
+        # analyzers of data from the same parser share the dataset parsed
+        parser = _parser_id(analyzer, parser)
+        dkey = (parser, json.dumps(kwargs, sort_keys=True), bool(canonical), encoding, _identity(filename))
+        akey = (analyzer, _identity(config) if config else None)
+
+        def dataset():
+            table = _table(filename, analyzer, parser, kwargs, canonical, encoding)
+            return (table, LRU(self._analyses))
+        (table, analyses) = self._datasets.get(dkey, dataset)
+
+        def build():
+            instance = _analyzer(analyzer, config)
+            instance.load(table)
+            # requests for the same analyzer compute each of its results once
+            return (instance, threading.Lock())
+        (instance, lock) = analyses.get(akey, build)
+        with lock:
+            return summarize(instance, brief, arrays)
+
+    def stats(self):
+        """Return a dict of statistics of the dataset cache and of the analyzer caches
+
+        Statistics of analyzers are totals for the datasets cached: the size
+        is that of the cache of each dataset.
+        """
+        analyses = [cached.stats() for (_, cached) in self._datasets.values()]
+        return {
+            'datasets': self._datasets.stats(),
+            'analyses': {
+                'size': self._analyses,
+                'length': sum(stats['length'] for stats in analyses),
+                'hits': sum(stats['hits'] for stats in analyses),
+                'misses': sum(stats['misses'] for stats in analyses),
+            },
+        }
+
+
+def _error(exc):
+    """Return a response describing exception `exc`"""
+    args = exc.args
+    if isinstance(exc, OSError) and exc.filename is not None:
+        args = (exc.errno, exc.strerror, exc.filename)
+    try:
+        json.dumps(args, cls=JsonEncoder)
+    except (TypeError, ValueError):
+        args = (str(exc),)
+    return {'error': f'{type(exc).__name__}: {exc}', 'type': type(exc).__name__, 'args': list(args)}
+
+
+def _raise(response):
+    """Raise the exception described by error `response`
+
+    Raise a built-in exception as its own type, otherwise raise
+    :class:`ServiceError`.
+    """
+    error = getattr(builtins, response.get('type') or '', None)
+    if isinstance(error, type) and issubclass(error, Exception):
+        raise error(*response.get('args', ()))
+    raise ServiceError(response['error'])
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handle lines of JSON requests to the service of the server"""
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = {'result': self.server.call(request['method'], request.get('params') or {})}
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                response = _error(exc)
+            self.wfile.write(json.dumps(response, cls=JsonEncoder).encode() + b'\n')
+            self.wfile.flush()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve requests to `service` on a Unix domain socket at `path`
+
+    Raise :class:`ServiceError` if a server is already listening at `path`.
+    """
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        if _listening(path):
+            raise ServiceError(f'already serving at {path}')
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            # a socket left by a server no longer running
+            os.unlink(path)
+        self.service = service
+        umask = os.umask(0o077)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def call(self, method, params):
+        """Return the value of service method `method` called with `params`"""
+        if method == 'ping':
+            return identity()
+        if method == 'analyze':
+            return self.service.analyze(**params)
+        if method == 'stats':
+            return self.service.stats()
+        if method == 'shutdown':
+            threading.Thread(target=self.shutdown).start()
+            return True
+        raise ValueError(f'unknown method {method}')
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _listening(path):
+    """Return True if a server is listening at `path`"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+    except OSError:
+        return False
+    return True
+
+
+def _connect(path):
+    """Return a socket connected to the service listening at `path`, or at :func:`address` if None
+
+    Raise :class:`ConnectionError` or :class:`FileNotFoundError` if no service
+    is listening.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path or address())
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def _call(sock, method, params):
+    """Return the value returned by service method `method` called with `params` on `sock`"""
+    with sock.makefile('rwb') as fid:
+        fid.write(json.dumps({'method': method, 'params': params}, cls=JsonEncoder).encode() + b'\n')
+        fid.flush()
+        line = fid.readline()
+    if not line:
+        raise ServiceError(f'no response to {method}')
+    response = json.loads(line)
+    if 'error' in response:
+        _raise(response)
+    return response['result']
+
+
+def call(method, path=None, **params):
+    """Return the value returned by service method `method` called with `params`
+
+    Call the service listening at `path`, or at :func:`address` if None.
+    Raise :class:`ConnectionError` or :class:`FileNotFoundError` if no service
+    is listening. If the service reports an error, then raise a built-in
+    exception as its own type, otherwise :class:`ServiceError`.
+    """
+    with _connect(path) as sock:
+        return _call(sock, method, params)
+
+
+def _served(path, method, params):
+    """Return the value returned by service method `method` called with `params`
+
+    Call the service listening at `path`, or at :func:`address` if None.
+    Return None if no service is listening, or if the service does not run
+    the same code as this process (see :func:`identity`).
+    """
+    try:
+        sock = _connect(path)
+    except (ConnectionError, FileNotFoundError):
+        # no service listening
+        return None
+    with sock:
+        if _call(sock, 'ping', {}) != identity():
+            return None
+        return _call(sock, method, params)
+
+
+def _local(filename, analyzer, config, parser, canonical, encoding, kwargs):
+    """Return an analyzer of id `analyzer` having collected data in `filename`, in-process"""
+    instance = _analyzer(analyzer, config)
+    if cache.directory() is not None and filename != '-':
+        instance.load(_table(filename, analyzer, parser, kwargs, canonical, encoding))
+    else:
+        with open_input(filename, encoding=encoding) as fid:
+            instance.collect(*_rows(_parser(analyzer, parser, kwargs), fid, canonical))
+    return instance
+
+
+def analyze(
+    filename, analyzer, config=None, parser=None,
+    canonical=False, encoding='utf-8', brief=None, path=None, **kwargs,
+):
+    """Return an :class:`Analysis` of `analyzer` having collected data in `filename`
+
+    Arguments are as for :meth:`Service.analyze`. If `brief` is None, then
+    the analysis is brief if environment variable VSE_SYNC_PP_BRIEF is set to
+    a value other than '' or '0'. If `filename` is '-' then read from stdin.
+    Call the service listening at `path`, or at :func:`address` if None: if
+    none is listening, or it does not run the same code as this process, then
+    analyze in-process.
+    """
+    if brief is None:
+        brief = os.environ.get(BRIEF, '') not in ('', '0')
+    if filename != '-' and not profiling.enabled():
+        params = dict(
+            kwargs, analyzer=analyzer, parser=parser, canonical=canonical, encoding=encoding, brief=brief,
+            filename=os.path.abspath(filename),
+            config=os.path.abspath(config) if config else None,
+        )
+        summary = _served(path, 'analyze', params)
+        if summary is not None:
+            def arrays():
+                served = _served(path, 'analyze', dict(params, arrays=True))
+                if served is not None:
+                    return served
+                instance = _local(filename, analyzer, config, parser, canonical, encoding, kwargs)
+                return summarize(instance, brief, arrays=True)
+            return Analysis(summary, arrays)
+    instance = _local(filename, analyzer, config, parser, canonical, encoding, kwargs)
+    return Analysis(summarize(instance, brief), lambda: summarize(instance, brief, arrays=True))
+
+
+def main():
+    """Serve analysis of log files from a persistent process.
+
+    Listen on a Unix domain socket for requests to analyze files, caching
+    recently parsed datasets and their analyzers. Reference implementations
+    and plotters analyze files in-process when no service is listening.
+    """
+    aparser = ArgumentParser(description=main.__doc__)
+    aparser.add_argument(
+        '--socket',
+        help=f"path of the socket (default: environment variable {ENVIRON}, or {address()})",
+    )
+    aparser.add_argument(
+        '--datasets', type=int, default=DATASETS,
+        help=f"number of parsed datasets to cache (default: {DATASETS})",
+    )
+    aparser.add_argument(
+        '--analyses', type=int, default=ANALYSES,
+        help=f"number of analyzers to cache per dataset (default: {ANALYSES})",
+    )
+    group = aparser.add_mutually_exclusive_group()
+    group.add_argument(
+        '--stats', action='store_true',
+        help="print statistics of the caches of a running service, then exit",
+    )
+    group.add_argument(
+        '--stop', action='store_true',
+        help="stop a running service, then exit",
+    )
+    args = aparser.parse_args()
+    path = args.socket or address()
+    try:
+        if args.stats:
+            # Python exits with error code 1 on EPIPE
+            if not print_loj(call('stats', path)):
+                sys.exit(1)
+            return
+        if args.stop:
+            call('shutdown', path)
+            return
+        with Server(path, Service(args.datasets, args.analyses)) as server:
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    except (OSError, ServiceError) as exc:
+        sys.exit(f'{aparser.prog}: {exc}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Sketch the distribution of streamed values in bounded memory"""
+
+from math import ceil, floor, log
+
+import numpy as np
+
+
+class QuantileSketch():
+    """A sketch of the distribution of values, updated from a stream of values.
+
+    Values are counted in buckets with bounds at successive powers of
+    gamma = (1 + `alpha`) / (1 - `alpha`), separately for positive and negative
+    values. Values of magnitude at most `tiny` are counted as zero; values of
+    magnitude greater than `huge` are counted in the bucket of `huge`. Memory
+    used is bounded by the number of buckets, not the number of values.
+
+    Each bucket is represented by the mean of the values counted in it. A
+    quantile estimated from the sketch is within relative error `alpha` of the
+    exact quantile, for values of magnitude between `tiny` and `huge`, and is
+    exact if all values in its bucket are equal. The minimum, maximum, mean and
+    standard deviation of values are exact.
+    """
+    def __init__(self, alpha=0.005, tiny=1e-3, huge=1e12):
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._lngamma = log(self._gamma)
+        # bucket `idx` counts magnitudes in (gamma^(i - 1), gamma^i], i = idx + offset
+        self._offset = floor(log(tiny) / self._lngamma) + 1
+        size = ceil(log(huge) / self._lngamma) - self._offset + 1
+        # counts and sums of values in buckets: negative, zero, positive
+        self._counts = np.zeros(2 * size + 1, dtype=np.int64)
+        self._sums = np.zeros(2 * size + 1, dtype=float)
+        self._size = size
+        self._tiny = tiny
+        self._count = 0
+        self._min = None
+        self._max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def _index(self, values):
+        """Return an array of the index of the bucket for each of `values`"""
+        magnitudes = np.abs(values)
+        nonzero = magnitudes > self._tiny
+        idx = np.zeros(len(values), dtype=np.int64)
+        idx[nonzero] = np.ceil(np.log(magnitudes[nonzero]) / self._lngamma) - self._offset
+        idx = idx.clip(0, self._size - 1) + 1
+        # buckets for negative values are in reverse order before zero
+        return self._size + np.where(nonzero, np.sign(values).astype(np.int64) * idx, 0)
+
+    def _combine(self, count, min_, max_, mean, m2):
+        """Combine moments of `count` other values into this sketch's moments"""
+        total = self._count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta * delta * self._count * count / total
+        self._count = total
+        self._min = min_ if self._min is None else min(self._min, min_)
+        self._max = max_ if self._max is None else max(self._max, max_)
+
+    def update(self, values):
+        """Update this sketch with array-like `values`, ignoring NaN values"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        mean = values.mean()
+        self._combine(
+            len(values), values.min(), values.max(),
+            mean, np.square(values - mean).sum(),
+        )
+        idx = self._index(values)
+        self._counts += np.bincount(idx, minlength=len(self._counts))
+        self._sums += np.bincount(idx, weights=values, minlength=len(self._sums))
+
+    def merge(self, other):
+        """Update this sketch with the values counted in sketch `other`
+
+        `other` must have been created with the same args as this sketch.
+        """
+        # pylint: disable=protected-access
+        if other._count:
+            self._combine(other._count, other._min, other._max, other._mean, other._m2)
+            self._counts += other._counts
+            self._sums += other._sums
+
+    @property
+    def min(self):
+        """The minimum value, or None if there are no values"""
+        return self._min
+
+    @property
+    def max(self):
+        """The maximum value, or None if there are no values"""
+        return self._max
+
+    @property
+    def mean(self):
+        """The mean value, or None if there are no values"""
+        return self._mean if self._count else None
+
+    @property
+    def std(self):
+        """The population standard deviation of values, or None if there are no values"""
+        return np.sqrt(self._m2 / self._count) if self._count else None
+
+    def variance(self, ddof=0):
+        """Return the variance of values with `ddof` delta degrees of freedom
+
+        Return None if there are no more values than `ddof`.
+        """
+        return self._m2 / (self._count - ddof) if ddof < self._count else None
+
+    def _buckets(self):
+        """Return a 2-tuple of arrays (values, counts) for non-empty buckets
+
+        `values` are the values representing each bucket, in ascending order.
+        """
+        nonzero = self._counts > 0
+        counts = self._counts[nonzero]
+        values = (self._sums[nonzero] / counts).clip(self._min, self._max)
+        # the extreme buckets contain the exact extremes
+        (values[0], values[-1]) = (self._min, self._max)
+        return (values, counts)
+
+    def quantile(self, q):
+        """Return the estimated `q` quantile(s) of values
+
+        `q` is a probability or array-like of probabilities in [0, 1]. As for
+        :func:`numpy.quantile` with method 'lower', the quantile returned is
+        that of the value at rank floor(`q` * (n - 1)) of n values.
+        """
+        if not self._count:
+            raise ValueError('no values in sketch')
+        (values, counts) = self._buckets()
+        ranks = np.floor(np.asarray(q, dtype=float) * (self._count - 1))
+        return values[np.searchsorted(np.cumsum(counts), ranks, side='right')]
+
+    def histogram(self):
+        """Return a 2-tuple of arrays (counts, bins) as for :func:`numpy.histogram`
+
+        Bins have equal width, chosen by Scott's rule as for :func:`numpy.histogram`
+        with bins='scott'. Each value is counted in the bin containing the value
+        representing its bucket.
+        """
+        if not self._count:
+            raise ValueError('no values in sketch')
+        (lo, hi) = (self._min, self._max)
+        if lo == hi:
+            (lo, hi) = (lo - 0.5, hi + 0.5)
+        width = (24 * np.sqrt(np.pi) / self._count) ** (1 / 3) * self.std
+        nbins = int(np.ceil((hi - lo) / width)) if width else 1
+        (values, counts) = self._buckets()
+        return np.histogram(values, bins=max(nbins, 1), range=(lo, hi), weights=counts)
+
+    def cdf(self):
+        """Return a 2-tuple of arrays (values, probabilities) for the empirical CDF
+
+        Each probability is the fraction of values less than or equal to the
+        corresponding value, in ascending order.
+        """
+        (values, counts) = self._buckets()
+        return (values, np.cumsum(counts) / self._count)
@@ -0,0 +1,380 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Generate synthetic log messages"""
+
+import heapq
+import json
+import sys
+from argparse import ArgumentParser
+from collections import namedtuple
+from contextlib import nullcontext
+from operator import itemgetter
+
+import numpy as np
+from scipy.signal import lfilter
+
+from .analyzers.pmc import (
+    CLOCK_ACCURACY_FOR_CLOCK_CLASS,
+    OFFSET_SCALED_LOG_VARIANCE_FOR_CLOCK_CLASS,
+)
+
+# number of samples generated at a time
+CHUNK = 10000
+
+# default timestamp of the first sample
+START = 1700000000
+
+# default interface for sources logging an interface
+INTERFACE = 'ens7f1'
+
+# servo states, and the state value logged by each source in each servo state
+SERVO_STATES = ('freerun', 'acquiring', 'locked', 'holdover')
+STATES = {
+    'ts2phc/time-error': dict(zip(SERVO_STATES, ('s0', 's1', 's2', 's3'))),
+    'ptp4l/time-error': dict(zip(SERVO_STATES, ('s0', 's1', 's2', 's3'))),
+    'phc2sys/time-error': dict(zip(SERVO_STATES, ('s0', 's1', 's2', 's3'))),
+    'dpll/time-error': dict(zip(SERVO_STATES, (1, 2, 3, 4))),
+    'gnss/time-error': dict(zip(SERVO_STATES, (0, 2, 5, 1))),
+    'phc/gm-settings': dict(zip(SERVO_STATES, (248, 248, 6, 7))),
+}
+
+# noise is scaled by this factor in servo states other than locked
+UNLOCKED_SCALE = 10
+
+
+class WhiteNoise():
+    """Time error noise: normally distributed about zero with std dev `sigma` ns"""
+    def __init__(self, sigma=5.0):
+        self._sigma = float(sigma)
+
+    def __call__(self, rng, times):
+        """Return an array of time error in ns at each of `times` in seconds"""
+        return rng.normal(0, self._sigma, len(times))
+
+
+class RandomWalk(WhiteNoise):
+    """Time error noise: white noise plus a random walk reverting to zero
+
+    Each sample the walk takes a normally distributed step with std dev `step`
+    ns, and reverts towards zero with time constant `tau` samples.
+    """
+    def __init__(self, sigma=5.0, step=0.5, tau=1000):
+        super().__init__(sigma)
+        self._step = float(step)
+        self._pole = 1 - 1 / float(tau)
+        self._zi = np.zeros(1)
+
+    def __call__(self, rng, times):
+        steps = rng.normal(0, self._step, len(times))
+        (walk, self._zi) = lfilter([1], [1, -self._pole], steps, zi=self._zi)
+        return walk + super().__call__(rng, times)
+
+
+class SineWander(WhiteNoise):
+    """Time error noise: white noise plus a sinusoidal wander
+
+    The wander (e.g. from daily temperature change) has `amplitude` ns and
+    `period` seconds.
+    """
+    def __init__(self, sigma=5.0, amplitude=20.0, period=86400):
+        super().__init__(sigma)
+        self._amplitude = float(amplitude)
+        self._omega = 2 * np.pi / float(period)
+
+    def __call__(self, rng, times):
+        wander = self._amplitude * np.sin(self._omega * times)
+        return wander + super().__call__(rng, times)
+
+
+NOISES = {
+    'white': WhiteNoise,
+    'walk': RandomWalk,
+    'sine': SineWander,
+}
+
+
+def noise_from_spec(spec):
+    """Return a noise model from string `spec`
+
+    `spec` is the name of a noise model in :data:`NOISES`, optionally followed
+    by comma-separated key=value args to the model: e.g. 'walk,step=1,tau=500'.
+    """
+    (name, *args) = spec.split(',')
+    kwargs = dict(arg.split('=', 1) for arg in args)
+    return NOISES[name](**kwargs)
+
+
+def _ints(values):
+    """Return a list of `values` rounded to int"""
+    return np.rint(values).astype(int).tolist()
+
+
+def _ts2phc(rng, timestamps, terrors, states, interface):
+    """Return columns of ts2phc log messages"""
+    return (timestamps, [interface] * len(timestamps), _ints(terrors), states, _ints(-terrors))
+
+
+def _ptp4l(rng, timestamps, terrors, states, interface):
+    """Return columns of ptp4l log messages"""
+    freqs = _ints(rng.normal(-6000, 20, len(timestamps)))
+    delays = _ints(rng.normal(500, 10, len(timestamps)))
+    return (timestamps, [interface] * len(timestamps), _ints(terrors), states, freqs, delays)
+
+
+def _phc2sys(rng, timestamps, terrors, states, _):
+    """Return columns of phc2sys log messages"""
+    freqs = _ints(rng.normal(6000, 20, len(timestamps)))
+    delays = _ints(rng.normal(500, 10, len(timestamps)))
+    return (timestamps, _ints(terrors), states, freqs, delays)
+
+
+def _dpll(_, timestamps, terrors, states, __):
+    """Return columns of dpll samples"""
+    return (timestamps, states, states, np.round(terrors, 2).tolist())
+
+
+def _gnss(_, timestamps, terrors, states, __):
+    """Return columns of GNSS samples"""
+    return (timestamps, states, _ints(terrors))
+
+
+def _pmc(_, timestamps, __, states, ___):
+    """Return columns of PMC samples"""
+    return (
+        timestamps, states,
+        [CLOCK_ACCURACY_FOR_CLOCK_CLASS[state] for state in states],
+        [OFFSET_SCALED_LOG_VARIANCE_FOR_CLOCK_CLASS[state] for state in states],
+    )
+
+
+Format = namedtuple('Format', ('columns', 'names', 'template'))
+Format.__doc__ = """The format of log messages for a parser
+
+`columns` is a function returning a tuple of columns (lists of values) of log
+messages, from a random generator, a list of timestamps, an array of time
+errors, a list of states and an interface. `names` are the names of columns.
+`template` is a format string for a log message from the values in a row.
+"""
+
+FORMATS = {
+    'ts2phc/time-error': Format(
+        _ts2phc,
+        ('timestamp', 'interface', 'terror', 'state', 'freq'),
+        'ts2phc[{0:.3f}]: [ts2phc.0.config] {1} master offset {2:10d} {3} freq {4:+7d}\n',
+    ),
+    'ptp4l/time-error': Format(
+        _ptp4l,
+        ('timestamp', 'interface', 'terror', 'state', 'freq', 'path_delay'),
+        'ptp4l[{0:.3f}]: [ptp4l.0.config] {1} offset {2:9d} {3} freq {4:+7d} path delay {5:9d}\n',
+    ),
+    'phc2sys/time-error': Format(
+        _phc2sys,
+        ('timestamp', 'terror', 'state', 'freq', 'delay'),
+        'phc2sys[{0:.3f}]: [ptp4l.0.config] CLOCK_REALTIME phc offset {1:9d} {2} freq {3:+7d} delay {4:6d}\n',
+    ),
+    'dpll/time-error': Format(
+        _dpll,
+        ('timestamp', 'eecstate', 'state', 'terror'),
+        '{0:.6f},{1},{2},{3:.2f}\n',
+    ),
+    'gnss/time-error': Format(
+        _gnss,
+        ('timestamp', 'state', 'terror'),
+        '{0:.2f},{1},{2}\n',
+    ),
+    'phc/gm-settings': Format(
+        _pmc,
+        ('timestamp', 'clock_class', 'clockAccuracy', 'offsetScaledLogVariance'),
+        '{0:.6f},{1},{2},{3}\n',
+    ),
+}
+
+
+def _servo_states(times, states):
+    """Return an array of the index in :data:`SERVO_STATES` at each of `times`
+
+    `states` is a sequence of (time, servo state) pairs: from each time (in
+    seconds from the first sample) the source is in that state. The source is
+    locked before the first time.
+    """
+    changes = sorted((float(time), SERVO_STATES.index(state)) for (time, state) in states)
+    indices = np.array([SERVO_STATES.index('locked')] + [idx for (_, idx) in changes])
+    return indices[np.searchsorted([time for (time, _) in changes], times, side='right')]
+
+
+def _in_gaps(times, gaps):
+    """Return a bool array, True for each of `times` in any of `gaps`
+
+    `gaps` is a sequence of (time, duration) pairs, in seconds.
+    """
+    missing = np.zeros(len(times), dtype=bool)
+    for (time, duration) in gaps:
+        missing |= (float(time) <= times) & (times < float(time) + float(duration))
+    return missing
+
+
+def _timed(
+    id_, count, rate=1, start=START, seed=0,
+    noise=None, states=(), gaps=(), interface=INTERFACE, muxed=False,
+):
+    """Generator yielding (timestamp, line) for log messages (see :func:`generate`)"""
+    fmt = FORMATS[id_]
+    values = np.array(list(STATES[id_][state] for state in SERVO_STATES), dtype=object)
+    rng = np.random.default_rng(seed)
+    noise = noise or WhiteNoise()
+    for offset in range(0, count, CHUNK):
+        times = (offset + np.arange(min(CHUNK, count - offset))) / rate
+        terrors = noise(rng, times)
+        servo = _servo_states(times, states)
+        terrors[servo != SERVO_STATES.index('locked')] *= UNLOCKED_SCALE
+        keep = ~_in_gaps(times, gaps)
+        timestamps = (start + times[keep]).tolist()
+        columns = fmt.columns(rng, timestamps, terrors[keep], values[servo[keep]].tolist(), interface)
+        if muxed:
+            lines = (
+                json.dumps({'id': id_, 'data': dict(zip(fmt.names, row))}) + '\n'
+                for row in zip(*columns)
+            )
+        else:
+            lines = (fmt.template.format(*row) for row in zip(*columns))
+        yield from zip(timestamps, lines)
+
+
+def generate(
+    id_, count, rate=1, start=START, seed=0,
+    noise=None, states=(), gaps=(), interface=INTERFACE, muxed=False,
+):
+    """Generator yielding `count` lines of log messages for parser `id_`
+
+    Samples are at `rate` per second from timestamp `start`. Time error is
+    from noise model `noise` (by default, :class:`WhiteNoise`), scaled by
+    :data:`UNLOCKED_SCALE` in servo states other than locked. `states` is a
+    sequence of (time, servo state) pairs, from each time (in seconds from the
+    first sample) the source is in that state (see :data:`SERVO_STATES`).
+    `gaps` is a sequence of (time, duration) pairs, in seconds from the first
+    sample, during which samples are missing. `interface` is logged by sources
+    logging an interface. If `muxed`, then lines are multiplexed content:
+    JSON-encoded objects with the parser id at 'id' and an object with a pair
+    for each value in the log message at 'data'.
+
+    Lines generated are deterministic for `seed`. Lines are generated in
+    chunks, so that memory used does not depend on `count`.
+    """
+    for (_, line) in _timed(id_, count, rate, start, seed, noise, states, gaps, interface, muxed):
+        yield line
+
+
+def merge(*sources):
+    """Generator yielding lines from `sources` in timestamp order
+
+    Each of `sources` is a dict of kwargs to :func:`generate`. Where several
+    sources have the same timestamp, lines are yielded in order of `sources`.
+    """
+    timed = (_timed(**source) for source in sources)
+    for (_, line) in heapq.merge(*timed, key=itemgetter(0)):
+        yield line
+
+
+def _pair(sep, convert=str):
+    """Return a function parsing an arg 'a<sep>b' to a tuple (float(a), convert(b))"""
+    def parse(arg):
+        (first, second) = arg.split(sep, 1)
+        return (float(first), convert(second))
+    return parse
+
+
+def main():
+    """Generate synthetic log messages.
+
+    Generate deterministic log messages for each parser specified, at the
+    sample rate for the duration specified, and write them in timestamp order
+    to output. Log messages from ts2phc and ptp4l are generated for each
+    interface specified. With --muxed, write multiplexed content (as in
+    collected.log) instead of log messages.
+    """
+    aparser = ArgumentParser(description=main.__doc__)
+    aparser.add_argument(
+        '-o', '--output', default='-',
+        help="output file, or '-' to write to stdout (default)",
+    )
+    aparser.add_argument(
+        '-d', '--duration', type=float, default=3600,
+        help="duration in seconds (default: 3600)",
+    )
+    aparser.add_argument(
+        '-r', '--rate', type=float, default=1,
+        help="samples per second from each source (default: 1)",
+    )
+    aparser.add_argument(
+        '--start', type=float, default=START,
+        help=f"timestamp of the first sample (default: {START})",
+    )
+    aparser.add_argument(
+        '--seed', type=int, default=0,
+        help="seed for random values (default: 0)",
+    )
+    aparser.add_argument(
+        '--noise', default='white',
+        help=f"time error noise model: one of {', '.join(NOISES)}, optionally"
+             " followed by comma-separated key=value args (default: white)",
+    )
+    aparser.add_argument(
+        '--state', type=_pair('='), action='append', default=[], metavar='TIME=STATE',
+        help=f"from TIME seconds the servo is in STATE: one of {', '.join(SERVO_STATES)}",
+    )
+    aparser.add_argument(
+        '--gap', type=_pair(':', float), action='append', default=[], metavar='TIME:DURATION',
+        help="no samples for DURATION seconds from TIME seconds",
+    )
+    aparser.add_argument(
+        '--interface', action='append', default=[],
+        help=f"interface logged by ts2phc and ptp4l, may be repeated (default: {INTERFACE})",
+    )
+    aparser.add_argument(
+        '--muxed', action='store_true',
+        help="write multiplexed content",
+    )
+    aparser.add_argument(
+        'parser', choices=tuple(FORMATS), nargs='+',
+        help="log messages to generate",
+    )
+    args = aparser.parse_args()
+    try:
+        noise_from_spec(args.noise)
+    except (KeyError, TypeError, ValueError):
+        aparser.error(f'invalid noise model: {args.noise}')
+    for (_, state) in args.state:
+        if state not in SERVO_STATES:
+            aparser.error(f'unknown servo state: {state}')
+    count = int(args.duration * args.rate)
+    common = {
+        'count': count, 'rate': args.rate, 'start': args.start,
+        'states': args.state, 'gaps': args.gap, 'muxed': args.muxed,
+    }
+    sources = []
+    for id_ in args.parser:
+        interfaces = args.interface or [INTERFACE]
+        if 'interface' not in FORMATS[id_].names:
+            interfaces = interfaces[:1]
+        for interface in interfaces:
+            # each source has its own seed and noise, so that sources differ
+            sources.append(dict(
+                common, id_=id_, interface=interface,
+                seed=(args.seed, len(sources)), noise=noise_from_spec(args.noise),
+            ))
+    if args.output == '-':
+        context = nullcontext(sys.stdout)
+    else:
+        context = open(args.output, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+    with context as fid:
+        try:
+            fid.writelines(merge(*sources))
+            fid.flush()
+        except BrokenPipeError:
+            # Python exits with error code 1 on EPIPE
+            sys.stdout = None
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Categories: string values interned in a vocabulary
+
+Fields with few distinct string values, such as servo state and interface
+names, are parsed as :class:`Category` values interned in a
+:class:`Vocabulary` (see :mod:`vse_sync_pp.columns`).
+"""
+
+
+class Category(str):
+    """A string value interned in a :class:`Vocabulary`
+
+    A category compares, hashes and encodes as JSON as its string value.
+    Attribute `code` is its index in attribute `vocabulary`.
+    """
+    # empty
+
+
+class Vocabulary():
+    """An ordered set of string values, interned as :class:`Category` values"""
+    def __init__(self):
+        self._index = {}
+        self._values = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, code):
+        return self._values[code]
+
+    def intern(self, value):
+        """Return the :class:`Category` in this vocabulary equal to `value`
+
+        If there is none, then add one.
+        """
+        try:
+            return self._index[value]
+        except KeyError:
+            category = Category(value)
+            category.code = len(self._values)
+            category.vocabulary = self
+            self._index[value] = category
+            self._values.append(category)
+            return category
+
+    def encode(self, values):
+        """Return a list of codes of `values` in this vocabulary"""
+        return [
+            value.code if getattr(value, 'vocabulary', None) is self else self.intern(value).code
+            for value in values
+        ]
+
+    @property
+    def values(self):
+        """A tuple of the values in this vocabulary, in order of code"""
+        return tuple(self._values)
@@ -0,0 +1,212 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Estimate wander metrics online, from a stream of phase samples
+
+Estimators are updated with successive chunks of samples and keep only the
+samples needed for the largest tau, so that memory used is bounded by the
+largest tau and not the number of samples.
+
+For the same (filtered) samples, estimates are equal to those computed by
+:func:`allantools.tdev` and :func:`allantools.mtie` for all samples, up to
+floating point rounding. Samples low-pass filtered by :class:`LowPassFilter`,
+which is causal, differ from those filtered by the non-causal
+:func:`vse_sync_pp.analyzers.analyzer.calculate_filter`: TDEV estimates are
+then within 1% of the batch computation. MTIE, the extreme of the filtered
+samples in a window, is more sensitive to the filter: estimates are within 5%
+for data dominated by wander, but may differ by tens of percent at small taus
+for data dominated by white noise.
+"""
+
+import numpy as np
+
+from .lowpass import (
+    CUTOFF,
+    ORDER,
+    design,
+)
+
+
+def averaging_factors(taus, rate):
+    """Return a sorted array of unique positive averaging factors for `taus`
+
+    An averaging factor is the number of samples at `rate` in a tau, as used
+    by allantools.
+    """
+    factors = np.round(np.asarray(taus, dtype=float) * rate)
+    return np.unique(factors[factors > 0]).astype(np.int64)
+
+
+def max_range(series, size, lower=None):
+    """Return the maximum range of values in windows of `size` values in `series`
+
+    If `lower` is not None, then it is a series of the same length as
+    `series` and the range in a window is from the minimum of `lower` to the
+    maximum of `series`. Return None if `series` has fewer than `size` values.
+    Sliding window extremes are computed in time proportional to the length of
+    `series`, whatever `size`.
+    """
+    from scipy.ndimage import (  # pylint: disable=import-outside-toplevel
+        maximum_filter1d,
+        minimum_filter1d,
+    )
+    count = len(series) - size + 1
+    if count < 1:
+        return None
+    half = size // 2
+    ranges = (
+        maximum_filter1d(series, size)[half:half + count]
+        - minimum_filter1d(series if lower is None else lower, size)[half:half + count]
+    )
+    return ranges.max()
+
+
+class TimeDeviation():
+    """Time deviation (TDEV) at `taus` of phase samples at `rate`
+
+    Each update accumulates the squared second differences of averages of
+    samples for each tau. Memory used is bounded by three times the largest
+    tau in samples.
+    """
+    def __init__(self, taus, rate):
+        self._factors = averaging_factors(taus, rate)
+        self._rate = rate
+        # prefix sums of samples, offset by the first sample for precision
+        self._span = 3 * int(self._factors.max(initial=0))
+        self._prefix = np.zeros(1)
+        self._offset = None
+        self._count = 0
+        self._sums = np.zeros(len(self._factors))
+        self._counts = np.zeros(len(self._factors), dtype=np.int64)
+
+    def __len__(self):
+        return self._count
+
+    def update(self, samples):
+        """Update this estimator with `samples`"""
+        samples = np.asarray(samples, dtype=float)
+        if not len(samples):
+            return
+        if self._offset is None:
+            self._offset = samples[0]
+        # prefix sums from index `first` to index `last`
+        prefix = np.concatenate((self._prefix, self._prefix[-1] + np.cumsum(samples - self._offset)))
+        first = self._count + 1 - len(self._prefix)
+        last = self._count + len(samples)
+        for (idx, factor) in enumerate(self._factors):
+            start = max(self._count + 1, 3 * factor) - first
+            stop = last - first + 1
+            if stop <= start:
+                continue
+            diffs = (
+                prefix[start:stop]
+                - 3 * prefix[start - factor:stop - factor]
+                + 3 * prefix[start - 2 * factor:stop - 2 * factor]
+                - prefix[start - 3 * factor:stop - 3 * factor]
+            )
+            self._sums[idx] += diffs @ diffs
+            self._counts[idx] += len(diffs)
+        self._prefix = prefix[-(self._span + 1):]
+        self._count = last
+
+    def result(self):
+        """Return a 2-tuple of arrays (taus, tdev) for taus with estimates"""
+        valid = self._counts > 1
+        factors = self._factors[valid]
+        tdev = np.sqrt(self._sums[valid] / (6.0 * factors * factors * self._counts[valid]))
+        return (factors / self._rate, tdev)
+
+
+class MaxTimeIntervalError():
+    """Maximum time interval error (MTIE) at `taus` of phase samples at `rate`
+
+    Each update computes the range of samples in each window of a tau ending
+    with a sample updated. Memory used is bounded by the largest tau in
+    samples. An update takes time proportional to the number of samples
+    updated plus the largest tau in samples, so updates of many samples are
+    more efficient than updates of few.
+    """
+    def __init__(self, taus, rate):
+        self._factors = averaging_factors(taus, rate)
+        self._rate = rate
+        self._span = int(self._factors.max(initial=0))
+        self._tail = np.zeros(0)
+        self._count = 0
+        self._mtie = np.zeros(len(self._factors))
+        self._counts = np.zeros(len(self._factors), dtype=np.int64)
+
+    def __len__(self):
+        return self._count
+
+    def update(self, samples):
+        """Update this estimator with `samples`"""
+        samples = np.asarray(samples, dtype=float)
+        if not len(samples):
+            return
+        # samples from index `first`
+        window = np.concatenate((self._tail, samples))
+        first = self._count - len(self._tail)
+        last = self._count + len(samples)
+        for (idx, factor) in enumerate(self._factors):
+            # windows of factor + 1 samples ending from index `end`
+            end = max(self._count, factor)
+            if last <= end:
+                continue
+            self._mtie[idx] = max(self._mtie[idx], max_range(window[end - factor - first:], factor + 1))
+            self._counts[idx] += last - end
+        self._tail = window[max(len(window) - self._span, 0):]
+        self._count = last
+
+    def result(self):
+        """Return a 2-tuple of arrays (taus, mtie) for taus with estimates"""
+        valid = self._counts > 1
+        return (self._factors[valid] / self._rate, self._mtie[valid])
+
+
+class LowPassFilter():
+    """A causal low-pass filter of samples at `rate`
+
+    The Butterworth filter of `order` with `cutoff` frequency in Hz used by
+    :func:`vse_sync_pp.analyzers.analyzer.calculate_filter` is applied twice,
+    forwards only: the magnitude response equals that of the forward-backward
+    filter, but with a phase delay. Filter state is kept between calls.
+    """
+    def __init__(self, rate, cutoff=CUTOFF, order=ORDER):
+        from scipy import signal as scipy_signal  # pylint: disable=import-outside-toplevel
+        self._signal = scipy_signal
+        sos = design(rate, cutoff, order)
+        self._sos = np.vstack((sos, sos))
+        self._zi = None
+
+    def __call__(self, samples):
+        """Return an array of `samples` filtered"""
+        samples = np.asarray(samples, dtype=float)
+        if not len(samples):
+            return samples
+        if self._zi is None:
+            # start in steady state at the first sample
+            self._zi = self._signal.sosfilt_zi(self._sos) * samples[0]
+        (filtered, self._zi) = self._signal.sosfilt(self._sos, samples, zi=self._zi)
+        return filtered
+
+
+class Wander():
+    """Online estimate of a wander metric of unfiltered phase samples at `rate`
+
+    Samples are filtered by :class:`LowPassFilter`, then update an estimator
+    of class `cls` (:class:`TimeDeviation` or :class:`MaxTimeIntervalError`) at
+    `taus`. `cutoff` and `order` specify the filter.
+    """
+    def __init__(self, cls, taus, rate, cutoff=CUTOFF, order=ORDER):
+        self._filter = LowPassFilter(rate, cutoff, order)
+        self._estimator = cls(taus, rate)
+
+    def __len__(self):
+        return len(self._estimator)
+
+    def update(self, samples):
+        """Update this estimate with `samples`"""
+        self._estimator.update(self._filter(samples))
+
+    def result(self):
+        """Return a 2-tuple of arrays (taus, values) for taus with estimates"""
+        return self._estimator.result()
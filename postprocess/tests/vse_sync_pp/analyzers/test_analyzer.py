@@ -3,19 +3,168 @@
 """Test cases for vse_sync_pp.analyzers"""
 
 from unittest import TestCase
+from collections import namedtuple
+from decimal import Decimal
 from os.path import join as joinpath
 from os.path import dirname
 
 from nose2.tools import params
+import numpy as np
 
 from vse_sync_pp.analyzers.analyzer import (
+    Analyzer,
     Config,
     CollectionIsClosed,
+    skip_transient,
+    unlocked,
 )
+from vse_sync_pp.analyzers.ts2phc import (
+    TimeErrorAnalyzer,
+    TimeDeviationAnalyzer,
+)
+from vse_sync_pp.columns import (
+    Columns,
+    Vocabulary,
+)
+from vse_sync_pp import profiling
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.sketch import QuantileSketch
+from vse_sync_pp.synth import generate
 
 from .. import make_fqname
 
 
+class TestSkipTransient(TestCase):
+    """Tests for vse_sync_pp.analyzers.analyzer.skip_transient"""
+    def test_skip_transient(self):
+        """Test vse_sync_pp.analyzers.analyzer.skip_transient"""
+        row = namedtuple('ROW', ('timestamp', 'terror'))
+        columns = Columns()
+        columns.extend(row(Decimal(idx) / 2, idx) for idx in range(10))
+        data = columns.table()
+        self.assertEqual(len(skip_transient(data, 0)), 10)
+        self.assertEqual(skip_transient(data, 1).first, row(Decimal(1), 2))
+        self.assertEqual(skip_transient(data, Decimal('1.25')).first, row(Decimal('1.5'), 3))
+        self.assertEqual(len(skip_transient(data, 5)), 0)
+        self.assertEqual(len(skip_transient(Columns().table(), 1)), 0)
+
+
+class TestPercentiles(TestCase):
+    """Tests for vse_sync_pp.analyzers.analyzer.Analyzer._percentiles"""
+    def test_exact(self):
+        """Test percentiles of an array are exact"""
+        data = np.array([7.5, -3.25, 1000.125, 2.0, 0.5] * 200 + [123.456])
+        self.assertEqual(
+            Analyzer._percentiles(data),  # pylint: disable=protected-access
+            {'p50': 2.0, 'p99': 1000.125, 'p99.9': 1000.125},
+        )
+        data = np.arange(1, 1001) / 8
+        self.assertEqual(
+            Analyzer._percentiles(data),  # pylint: disable=protected-access
+            {'p50': 62.5, 'p99': 123.75, 'p99.9': 124.875},
+        )
+
+    def test_sketch(self):
+        """Test percentiles of a sketch are estimated with the interpolation of an array's"""
+        data = np.array([7.5, -3.25, 1000.125, 2.0, 0.5] * 200)
+        sketch = QuantileSketch()
+        sketch.update(data)
+        self.assertEqual(
+            Analyzer._percentiles(sketch),  # pylint: disable=protected-access
+            Analyzer._percentiles(data),  # pylint: disable=protected-access
+        )
+
+
+class TestUnlocked(TestCase):
+    """Tests for vse_sync_pp.analyzers.analyzer.unlocked"""
+    def test_unlocked(self):
+        """Test vse_sync_pp.analyzers.analyzer.unlocked for categories and other states"""
+        row = namedtuple('ROW', ('timestamp', 'state'))
+        vocabulary = Vocabulary()
+        for intern in (vocabulary.intern, str, lambda state: int(state[1])):
+            with self.subTest(intern=intern):
+                columns = Columns()
+                columns.extend(row(idx, intern('s2')) for idx in range(5))
+                self.assertFalse(unlocked(columns.table(), {'s2', 2}))
+                columns.extend([row(5, intern('s1'))])
+                self.assertTrue(unlocked(columns.table(), {'s2', 2}))
+                self.assertFalse(unlocked(columns.table(), {'s1', 's2', 1, 2}))
+
+
+class TestLoad(TestCase):
+    """Tests for vse_sync_pp.analyzers.analyzer.Analyzer.load"""
+    def test_load(self):
+        """Test vse_sync_pp.analyzers.analyzer.Analyzer.load is collecting all rows of a table"""
+        config = Config(None, 'G.8272/PRTC-A', {
+            'transient-period/s': 1,
+            'min-test-duration/s': 1,
+            'time-error-limit/%': 100,
+        })
+        rows = list(PARSERS['ts2phc/time-error']().parse(generate('ts2phc/time-error', 100)))
+        collected = TimeErrorAnalyzer(config)
+        collected.collect(*rows)
+        loaded = TimeErrorAnalyzer(config)
+        columns = Columns()
+        columns.extend(rows)
+        loaded.load(columns.table())
+        for name in ('result', 'reason', 'timestamp', 'duration', 'analysis'):
+            self.assertEqual(getattr(loaded, name), getattr(collected, name), name)
+        with self.assertRaises(CollectionIsClosed):
+            loaded.collect(*rows)
+        analyzer = TimeErrorAnalyzer(config)
+        analyzer.collect(*rows)
+        with self.assertRaises(ValueError):
+            analyzer.load(columns.table())
+
+
+class TestBrief(TestCase):
+    """Tests for vse_sync_pp.analyzers.analyzer.Analyzer.brief"""
+    def setUp(self):
+        self._enabled = profiling.enabled()
+        profiling.enable()
+        profiling.report()
+
+    def tearDown(self):
+        profiling.report()
+        profiling.enable(self._enabled)
+
+    @staticmethod
+    def _analyzer(states=()):
+        """Return a TDEV analyzer having collected synthetic data with servo `states`"""
+        analyzer = TimeDeviationAnalyzer(Config(None, 'G.8272/PRTC-A', {
+            'transient-period/s': 1,
+            'min-test-duration/s': 1,
+            'time-deviation-limit/%': 1000,
+        }))
+        lines = generate('ts2phc/time-error', 100, states=states)
+        analyzer.collect(*PARSERS[TimeDeviationAnalyzer.parser]().parse(lines))
+        return analyzer
+
+    def test_failed(self):
+        """Test vse_sync_pp.analyzers.analyzer.Analyzer.brief omits a metric not computed for the test result"""
+        analyzer = self._analyzer(states=((50, 'freerun'),))
+        self.assertEqual(analyzer.reason, "loss of lock")
+        self.assertEqual(analyzer.brief(), {})
+        self.assertEqual(analyzer.duration, 98)
+        self.assertNotIn('tdev', profiling.report())
+        self.assertEqual(set(analyzer.analysis), {'tdev'})
+        self.assertIn('tdev', profiling.report())
+
+    def test_passed(self):
+        """Test vse_sync_pp.analyzers.analyzer.Analyzer.brief includes a metric computed for the test result"""
+        analyzer = self._analyzer()
+        self.assertTrue(analyzer.result)
+        self.assertEqual(analyzer.brief(), analyzer.analysis)
+        self.assertEqual(profiling.report()['tdev']['calls'], 1)
+
+    def test_names(self):
+        """Test vse_sync_pp.analyzers.analyzer.Analyzer.brief of sections named"""
+        analyzer = self._analyzer(states=((50, 'freerun'),))
+        self.assertEqual(analyzer.brief(('tdev', 'duration', 'foo')), {'tdev': analyzer.analysis['tdev']})
+        self.assertEqual(analyzer.brief(()), {})
+        self.assertEqual(profiling.report()['explain']['calls'], 1)
+
+
 class TestConfig(TestCase):
     """Tests for vse_sync_pp.analyzers.analyzer.Config"""
     def test_requirement_errors(self):
@@ -116,6 +265,18 @@ class TestConfig(TestCase):
         config = Config(parameters={'xxyyz': 'success'})
         self.assertEqual(config.parameter('xxyyz'), 'success')
 
+    def test_updated(self):
+        """Test vse_sync_pp.analyzers.analyzer.Config.updated"""
+        config = Config(parameters={'xxyyz': 'success', 'foo': 'bar'})
+        updated = config.updated({'foo': 'baz'})
+        self.assertEqual(updated.parameter('xxyyz'), 'success')
+        self.assertEqual(updated.parameter('foo'), 'baz')
+        self.assertEqual(config.parameter('foo'), 'bar')
+        # no parameters
+        config = Config()
+        with self.assertRaises(KeyError):
+            config.updated({'foo': 'baz'}).parameter('foo')
+
     def test_yaml(self):
         """Test vse_sync_pp.analyzers.analyzer.Config.from_yaml"""
         filename = joinpath(dirname(__file__), 'config.yaml')
@@ -6,7 +6,14 @@ from unittest import TestCase
 from collections import namedtuple
 from decimal import Decimal
 
-from vse_sync_pp.analyzers.pmc import ClockStateAnalyzer
+import numpy as np
+
+from vse_sync_pp.analyzers.analyzer import Config
+from vse_sync_pp.analyzers.pmc import (
+    ClockStateAnalyzer,
+    STATES,
+    ALLOWED_TRANSITIONS,
+)
 
 from .test_analyzer import AnalyzerTestBuilder
 
@@ -2533,3 +2540,31 @@ class TestClockStateAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
             }
         },
     )
+
+
+class TestClockStateTransitions(TestCase):
+    """Test cases for vse_sync_pp.analyzers.pmc.ClockStateAnalyzer.transitions"""
+    def test_transitions(self):
+        """Test transition matrix counts transitions between states"""
+        analyzer = ClockStateAnalyzer(Config(None, None, {'min-test-duration/s': 1}))
+        classes = (248, 248, 6, 6, 7, 6, 248)
+        analyzer.collect(*(
+            CLOCK_CLASS(
+                Decimal(idx), clock_class,
+                '0x21' if clock_class == 6 else '0xFE',
+                '0x4E5D' if clock_class == 6 else '0xFFFF',
+            )
+            for (idx, clock_class) in enumerate(classes)
+        ))
+        transitions = analyzer.transitions
+        self.assertEqual(transitions.shape, (len(STATES), len(STATES)))
+        expect = np.zeros((len(STATES), len(STATES)), dtype=int)
+        for (prev, curr) in zip(classes, classes[1:]):
+            expect[STATES.index(prev), STATES.index(curr)] += 1
+        self.assertTrue(np.array_equal(transitions, expect))
+        self.assertFalse(analyzer.result)
+        self.assertEqual(analyzer.reason, "illegal state transition")
+        # the matrix agrees with the per-state counts in the analysis
+        counts = analyzer.analysis['clock_class_count']
+        self.assertEqual(counts['LOCKED']['transitions']['FREERUN'], transitions[1, 0])
+        self.assertFalse(ALLOWED_TRANSITIONS[1, 0])
@@ -11,6 +11,7 @@ from vse_sync_pp.analyzers.ppsdpll import (
     TimeDeviationAnalyzer,
     MaxTimeIntervalErrorAnalyzer
 )
+from vse_sync_pp.analyzers.analyzer import Config
 
 from .test_analyzer import AnalyzerTestBuilder
 
@@ -82,6 +83,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 1.0,
                     'stddev': 0.0,
                     'variance': 0.0,
+                    'percentiles': {
+                        'p50': 1.0,
+                        'p99': 1.0,
+                        'p99.9': 1.0,
+                    },
                 },
             },
         },
@@ -111,6 +117,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 1,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 1.0,
+                        'p99': 1.0,
+                        'p99.9': 1.0,
+                    },
                 },
             },
         },
@@ -141,6 +152,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': -39.0,
                     'stddev': 1.0,
                     'variance': 1.0,
+                    'percentiles': {
+                        'p50': -39.0,
+                        'p99': -39.0,
+                        'p99.9': -39.0,
+                    },
                 },
             },
         },
@@ -171,6 +187,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 38.0,
                     'stddev': 1.0,
                     'variance': 1.0,
+                    'percentiles': {
+                        'p50': 38.0,
+                        'p99': 38.0,
+                        'p99.9': 38.0,
+                    },
                 },
             },
         },
@@ -201,6 +222,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 1,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 1.0,
+                        'p99': 1.0,
+                        'p99.9': 1.0,
+                    },
                 },
             },
         },
@@ -230,6 +256,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 1,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 1.0,
+                        'p99': 1.0,
+                        'p99.9': 1.0,
+                    },
                 },
             },
         },
@@ -734,3 +765,24 @@ class TestTimeDeviationAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
             },
         },
     )
+
+
+class TestTimeDeviationAnalyzerArrays(TestCase):
+    """Test cases for vse_sync_pp.analyzers.ppsdpll.TimeDeviationAnalyzer.toarrays"""
+    def test_toarrays(self):
+        """Test vse_sync_pp.analyzers.ppsdpll.TimeDeviationAnalyzer.toarrays matches toplot"""
+        config = Config(None, 'G.8272/PRTC-A', {
+            'time-deviation-limit/%': 100,
+            'transient-period/s': 1,
+            'min-test-duration/s': 19,
+        })
+        rows = tuple(
+            DPLLS(Decimal('1876878.28') + idx, 3, 3, Decimal(idx % 3))
+            for idx in range(40)
+        )
+        analyzer = TimeDeviationAnalyzer(config)
+        analyzer.collect(*rows)
+        (taus, samples) = analyzer.toarrays()
+        self.assertEqual(taus.dtype, float)
+        self.assertEqual(samples.dtype, float)
+        self.assertEqual(list(zip(taus, samples)), list(analyzer.toplot()))
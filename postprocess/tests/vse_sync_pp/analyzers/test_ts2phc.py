@@ -88,6 +88,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 0,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 0.0,
+                        'p99': 0.0,
+                        'p99.9': 0.0,
+                    },
                 },
             },
         },
@@ -120,6 +125,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 2,
                     'stddev': round(math.sqrt(20), 3),
                     'variance': 20.0,
+                    'percentiles': {
+                        'p50': 0.0,
+                        'p99': 0.0,
+                        'p99.9': 0.0,
+                    },
                 },
             },
         },
@@ -151,6 +161,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 0,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 0.0,
+                        'p99': 0.0,
+                        'p99.9': 0.0,
+                    },
                 },
             },
         },
@@ -182,6 +197,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 0,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 0.0,
+                        'p99': 0.0,
+                        'p99.9': 0.0,
+                    },
                 },
             },
         },
@@ -214,6 +234,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 0,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 0.0,
+                        'p99': 0.0,
+                        'p99.9': 0.0,
+                    },
                 },
             },
         },
@@ -245,6 +270,11 @@ class TestTimeErrorAnalyzer(TestCase, metaclass=AnalyzerTestBuilder):
                     'mean': 0,
                     'stddev': 0,
                     'variance': 0,
+                    'percentiles': {
+                        'p50': 0.0,
+                        'p99': 0.0,
+                        'p99.9': 0.0,
+                    },
                 },
             },
         },
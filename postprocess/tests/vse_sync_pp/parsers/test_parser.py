@@ -8,6 +8,7 @@ from io import StringIO
 from unittest import TestCase
 from nose2.tools import params
 
+from vse_sync_pp.vocabulary import Category
 from vse_sync_pp.common import JsonEncoder
 from vse_sync_pp.parsers.parser import Parser
 
@@ -25,6 +26,22 @@ class TestParser(TestCase):
         """Test vse_sync_pp.parsers.parser.Parser.parse_line"""
         self.assertIsNone(Parser().parse_line('foo bar baz'))
 
+    def test_category(self):
+        """Test vse_sync_pp.parsers.parser.Parser.category"""
+        class CategoryParser(Parser):
+            """A parser with a categorical elem"""
+            categories = ('state',)
+        parser = CategoryParser()
+        state = parser.category('state', 's2')
+        self.assertIsInstance(state, Category)
+        self.assertEqual(state, 's2')
+        self.assertIs(parser.category('state', 's2'), state)
+        self.assertEqual(parser.category('state', 's1').code, 1)
+        self.assertEqual(state.vocabulary.values, ('s2', 's1'))
+        other = CategoryParser().category('state', 's1')
+        self.assertIsNot(other.vocabulary, state.vocabulary)
+        self.assertEqual(other.code, 0)
+
 
 class ParserTestBuilder(type):
     """Build tests for vse_sync_pp.parsers
@@ -81,6 +98,11 @@ class ParserTestBuilder(type):
                 dct['file'][1],
                 dct.get("constructor_kwargs", {}),
             ),
+            'test_categories': cls.make_test_categories(
+                constructor, fqname,
+                dct['file'][0], dct['file'][1],
+                dct.get("constructor_kwargs", {}),
+            ),
         })
         return super().__new__(cls, name, bases, dct)
 
@@ -200,3 +222,23 @@ class ParserTestBuilder(type):
                 self.assertEqual(pair[0], pair[1])
         method.__doc__ = f'Test {fqname} parses canonical'
         return method
+
+    @staticmethod
+    def make_test_categories(constructor, fqname, lines, expect, constructor_kwargs):
+        """Make a function testing parser interns values of categorical elems"""
+        def method(self):
+            """Test parser interns categories"""
+            parser = constructor(**constructor_kwargs)
+            parsed = list(parser.parse(StringIO(lines)))
+            for name in constructor.categories:
+                values = [getattr(item, name) for item in parsed]
+                for value in values:
+                    self.assertIsInstance(value, Category)
+                    self.assertIs(value.vocabulary[value.code], value)
+                # values of an elem share the parser's vocabulary for it
+                self.assertLessEqual(len({id(value.vocabulary) for value in values}), 1)
+            # canonical data encodes categories as strings
+            for pair in zip(parsed, expect, strict=True):
+                self.assertEqual(json.dumps(pair[0], cls=JsonEncoder), json.dumps(pair[1], cls=JsonEncoder))
+        method.__doc__ = f'Test {fqname} interns categories'
+        return method
@@ -0,0 +1,109 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.cache"""
+
+import os
+import threading
+from collections import namedtuple
+from decimal import Decimal
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from vse_sync_pp import cache
+from vse_sync_pp.columns import Columns
+
+ROW = namedtuple('ROW', ('timestamp', 'terror'))
+
+
+def table(count, kind=Decimal):
+    """Return a table of `count` rows with time error values of `kind`"""
+    columns = Columns()
+    columns.extend(ROW(Decimal(idx), kind(idx)) for idx in range(count))
+    return columns.table()
+
+
+class TestKey(TestCase):
+    """Test cases for vse_sync_pp.cache.key"""
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _write(self, name, content):
+        """Write `content` to file `name` in the temporary directory; return its path"""
+        filename = os.path.join(self._tmpdir.name, name)
+        with open(filename, 'w', encoding='utf-8') as fid:
+            fid.write(content)
+        return filename
+
+    def test_key(self):
+        """Test vse_sync_pp.cache.key identifies content, parser and arguments"""
+        foo = self._write('foo', 'foo\n')
+        key = cache.key(foo, 'ts2phc/time-error', interface='ens7f1')
+        self.assertEqual(cache.key(self._write('bar', 'foo\n'), 'ts2phc/time-error', interface='ens7f1'), key)
+        self.assertNotEqual(cache.key(foo, 'ts2phc/time-error', interface='ens8f0'), key)
+        self.assertNotEqual(cache.key(foo, 'phc2sys/time-error', interface='ens7f1'), key)
+        self._write('foo', 'bar\n')
+        self.assertNotEqual(cache.key(foo, 'ts2phc/time-error', interface='ens7f1'), key)
+
+
+class TestCache(TestCase):
+    """Test cases for vse_sync_pp.cache.Cache"""
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+        self._cache = cache.Cache(os.path.join(self._tmpdir.name, 'cache'))
+        self._calls = []
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _build(self, count=10, kind=Decimal):
+        """Return a function recording a call, then returning a table of `count` rows of `kind`"""
+        def build():
+            self._calls.append(None)
+            return table(count, kind)
+        return build
+
+    def test_get(self):
+        """Test vse_sync_pp.cache.Cache builds a table once, then memory-maps the table saved"""
+        built = self._cache.get('foo', ROW, self._build())
+        loaded = self._cache.get('foo', ROW, self._build())
+        self.assertEqual(len(self._calls), 1)
+        self.assertEqual(list(loaded), list(built))
+        self.assertIsInstance(loaded.terror.base, np.memmap)
+        self.assertEqual(len(self._cache.get('bar', ROW, self._build(5))), 5)
+        self.assertEqual(len(self._calls), 2)
+
+    def test_objects(self):
+        """Test vse_sync_pp.cache.Cache does not save a table of Python objects"""
+        for _ in range(2):
+            self.assertEqual(self._cache.get('foo', ROW, self._build(kind=str)).terror[1], '1')
+        self.assertEqual(len(self._calls), 2)
+        self.assertEqual(os.listdir(os.path.join(self._tmpdir.name, 'cache')), ['foo.lock'])
+
+    def test_concurrent(self):
+        """Test vse_sync_pp.cache.Cache builds a table once for concurrent calls"""
+        (started, release) = (threading.Event(), threading.Event())
+
+        def build():
+            self._calls.append(None)
+            started.set()
+            release.wait()
+            return table(10)
+        tables = []
+        threads = [
+            threading.Thread(target=lambda: tables.append(self._cache.get('foo', ROW, build)))
+            for _ in range(4)
+        ]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self._calls), 1)
+        self.assertEqual([len(item) for item in tables], [10, 10, 10, 10])
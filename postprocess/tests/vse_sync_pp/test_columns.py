@@ -0,0 +1,235 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.columns"""
+
+import os
+from collections import namedtuple
+from decimal import Decimal
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from vse_sync_pp.columns import (
+    Buffer,
+    Columns,
+    Vocabulary,
+    load,
+    tabulate,
+)
+
+ROW = namedtuple('ROW', ('timestamp', 'terror', 'state', 'count'))
+
+
+def rows(count, vocabulary=None):
+    """Return a list of `count` rows, with states interned in `vocabulary` if not None"""
+    intern = vocabulary.intern if vocabulary is not None else str
+    return [ROW(Decimal(f'{idx}.125'), Decimal(idx) / 4, intern(f's{idx % 3}'), idx) for idx in range(count)]
+
+
+class TestBuffer(TestCase):
+    """Test cases for vse_sync_pp.columns.Buffer"""
+    def test_grow(self):
+        """Test vse_sync_pp.columns.Buffer grows to hold values appended"""
+        buffer = Buffer(np.int64, capacity=2)
+        buffer.append(1)
+        buffer.extend(range(2, 10))
+        buffer.append(10)
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(buffer.values.dtype, np.int64)
+        self.assertEqual(buffer.values.tolist(), list(range(1, 11)))
+
+    def test_objects(self):
+        """Test vse_sync_pp.columns.Buffer holds sequences as object values"""
+        buffer = Buffer(object)
+        buffer.extend([(1, 2), (3, 4)])
+        self.assertEqual(buffer.values.shape, (2,))
+        self.assertEqual(buffer.values[1], (3, 4))
+
+
+class TestColumns(TestCase):
+    """Test cases for vse_sync_pp.columns.Columns"""
+    def test_types(self):
+        """Test vse_sync_pp.columns.Columns holds fields in typed arrays"""
+        columns = Columns(chunk=7)
+        for row in rows(20):
+            columns.append(row)
+        self.assertEqual(len(columns), 20)
+        table = columns.table()
+        self.assertEqual(len(table), 20)
+        self.assertEqual(table.fields, ROW._fields)
+        self.assertEqual(table.timestamp.dtype, float)
+        self.assertEqual(table.terror.dtype, float)
+        self.assertEqual(table.state.dtype, object)
+        self.assertEqual(table.count.dtype, np.int64)
+        self.assertEqual(table.terror[5], 1.25)
+        with self.assertRaises(AttributeError):
+            table.foo  # pylint: disable=pointless-statement
+
+    def test_rows(self):
+        """Test vse_sync_pp.columns.Table restores rows"""
+        columns = Columns(chunk=3)
+        columns.extend(rows(10))
+        table = columns.table()
+        self.assertEqual(list(table), rows(10))
+        self.assertEqual(table.first, rows(10)[0])
+        self.assertEqual(table.last, rows(10)[-1])
+        self.assertIsInstance(table.last.timestamp, Decimal)
+        self.assertEqual(str(table.last.timestamp), '9.125')
+        self.assertIsInstance(table.last.count, int)
+        self.assertEqual(list(table[4:6]), rows(10)[4:6])
+
+    def test_iterator(self):
+        """Test vse_sync_pp.columns.Columns holds at most a chunk of rows from an iterator pending"""
+        columns = Columns(chunk=4)
+        pending = []
+
+        def generate():
+            for row in rows(10):
+                # pylint: disable=protected-access
+                pending.append(len(columns._pending))
+                yield row
+        columns.extend(generate())
+        self.assertEqual(max(pending), 3)
+        self.assertEqual(list(columns.table()), rows(10))
+
+    def test_tabulate(self):
+        """Test vse_sync_pp.columns.tabulate collects rows in a table"""
+        table = tabulate(iter(rows(5)))
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table.terror.tolist(), [0.0, 0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(len(tabulate([])), 0)
+
+    def test_widen(self):
+        """Test vse_sync_pp.columns.Columns holds values of mixed types in object arrays"""
+        columns = Columns(chunk=2)
+        columns.extend(rows(4))
+        columns.extend([ROW(Decimal(4), Decimal(1), 's1', None)])
+        table = columns.table()
+        self.assertEqual(table.count.dtype, object)
+        self.assertEqual(table.count.tolist(), [0, 1, 2, 3, None])
+        self.assertEqual(table.timestamp.dtype, float)
+
+    def test_views(self):
+        """Test vse_sync_pp.columns.Table arrays are views of the column buffers"""
+        columns = Columns(chunk=1)
+        columns.extend(rows(10))
+        table = columns.table()
+        self.assertFalse(table.terror.flags.owndata)
+        self.assertTrue(np.shares_memory(table.terror, columns.table().terror))
+
+    def test_empty(self):
+        """Test vse_sync_pp.columns.Table of no rows"""
+        table = Columns().table()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(list(table), [])
+        self.assertEqual(table.fields, ())
+
+    def test_frame(self):
+        """Test vse_sync_pp.columns.Table constructs a DataFrame on demand"""
+        columns = Columns()
+        columns.extend(rows(5))
+        table = columns.table()
+        frame = table.frame()
+        self.assertIs(table.frame(), frame)
+        self.assertEqual(list(frame.columns), list(ROW._fields))
+        self.assertEqual(frame.terror.tolist(), [0, 0.25, 0.5, 0.75, 1])
+
+
+class TestCategories(TestCase):
+    """Test cases for columns of vse_sync_pp.columns.Category values"""
+    def test_vocabulary(self):
+        """Test vse_sync_pp.columns.Vocabulary interns values"""
+        vocabulary = Vocabulary()
+        self.assertEqual(vocabulary.encode(['b', 'a', 'b']), [0, 1, 0])
+        category = vocabulary.intern('a')
+        self.assertEqual(category, 'a')
+        self.assertEqual(hash(category), hash('a'))
+        self.assertIs(vocabulary[category.code], category)
+        self.assertEqual(vocabulary.values, ('b', 'a'))
+
+    def test_codes(self):
+        """Test vse_sync_pp.columns.Columns holds categories as codes"""
+        vocabulary = Vocabulary()
+        columns = Columns(chunk=4)
+        columns.extend(rows(10, vocabulary))
+        table = columns.table()
+        (codes, values) = table.codes('state')
+        self.assertEqual(codes.dtype, np.int16)
+        self.assertEqual(codes.tolist(), [0, 1, 2, 0, 1, 2, 0, 1, 2, 0])
+        self.assertEqual(values, ('s0', 's1', 's2'))
+        self.assertEqual(table.state.tolist(), ['s0', 's1', 's2'] * 3 + ['s0'])
+        self.assertEqual(list(table), rows(10))
+        self.assertIs(table.first.state, vocabulary.intern('s0'))
+
+    def test_other_values(self):
+        """Test vse_sync_pp.columns.Columns encodes values not from the vocabulary"""
+        vocabulary = Vocabulary()
+        columns = Columns(chunk=1)
+        columns.extend(rows(2, vocabulary))
+        columns.extend(rows(3, Vocabulary())[2:] + rows(4)[3:])
+        table = columns.table()
+        self.assertEqual(table.codes('state')[0].tolist(), [0, 1, 2, 0])
+        self.assertEqual(table.state.tolist(), ['s0', 's1', 's2', 's0'])
+
+    def test_codes_other(self):
+        """Test vse_sync_pp.columns.Table codes of columns other than categories"""
+        columns = Columns()
+        columns.extend(rows(5))
+        (codes, values) = columns.table().codes('count')
+        self.assertEqual(codes.tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(values, (0, 1, 2, 3, 4))
+
+    def test_frame(self):
+        """Test vse_sync_pp.columns.Table frames categories as pandas categoricals"""
+        columns = Columns()
+        columns.extend(rows(5, Vocabulary()))
+        frame = columns.table().frame()
+        self.assertEqual(frame.state.dtype, 'category')
+        self.assertEqual(frame.state.tolist(), ['s0', 's1', 's2', 's0', 's1'])
+
+
+class TestSave(TestCase):
+    """Test cases for vse_sync_pp.columns.Table.save and vse_sync_pp.columns.load"""
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+        self._dirname = self._tmpdir.name
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_load(self):
+        """Test vse_sync_pp.columns.load memory-maps the columns of a table saved"""
+        columns = Columns()
+        columns.extend(rows(10, Vocabulary()))
+        table = columns.table()
+        table.save(self._dirname)
+        loaded = load(self._dirname, ROW)
+        self.assertEqual(list(loaded), list(table))
+        self.assertEqual(loaded.fields, ROW._fields)
+        self.assertEqual(loaded.codes('state')[0].tolist(), table.codes('state')[0].tolist())
+        self.assertEqual(loaded.codes('state')[1], table.codes('state')[1])
+        self.assertEqual(loaded.state.tolist(), table.state.tolist())
+        self.assertEqual(loaded.count.dtype, np.int64)
+        self.assertIsInstance(loaded.terror.base, np.memmap)
+        self.assertFalse(loaded.terror.flags.writeable)
+
+    def test_empty(self):
+        """Test vse_sync_pp.columns.load of a saved table of no rows"""
+        Columns().table().save(self._dirname)
+        loaded = load(self._dirname, ROW)
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(loaded.fields, ())
+
+    def test_objects(self):
+        """Test vse_sync_pp.columns.Table.save does not save columns of Python objects"""
+        columns = Columns()
+        columns.extend(rows(10))
+        with self.assertRaises(ValueError):
+            columns.table().save(self._dirname)
+        self.assertEqual(os.listdir(self._dirname), [])
+
+    def test_missing(self):
+        """Test vse_sync_pp.columns.load of no table saved"""
+        with self.assertRaises(FileNotFoundError):
+            load(self._dirname, ROW)
@@ -7,7 +7,15 @@ from decimal import Decimal
 
 from unittest import TestCase
 
-from vse_sync_pp.common import JsonEncoder
+import numpy as np
+
+from vse_sync_pp.analyzers import ANALYZERS
+from vse_sync_pp.common import (
+    JsonEncoder,
+    Registry,
+)
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.parsers.dpll import TimeErrorParser
 
 
 class TestJsonEncoder(TestCase):
@@ -23,3 +31,31 @@ class TestJsonEncoder(TestCase):
         """Test vse_sync_pp.common.JsonEncoder rejects instance"""
         with self.assertRaises(TypeError):
             json.dumps(self, cls=JsonEncoder)
+
+    def test_array(self):
+        """Test vse_sync_pp.common.JsonEncoder encodes numpy arrays"""
+        self.assertEqual(
+            json.dumps(np.array([1.5, 2.5]), cls=JsonEncoder),
+            '[1.5, 2.5]',
+        )
+
+
+class TestRegistry(TestCase):
+    """Test cases for vse_sync_pp.common.Registry"""
+    def test_registry(self):
+        """Test vse_sync_pp.common.Registry maps ids to classes imported on access"""
+        registry = Registry('vse_sync_pp.parsers', {'foo': 'dpll.TimeErrorParser', 'bar': 'gnss.TimeErrorParser'})
+        self.assertEqual(tuple(registry), ('foo', 'bar'))
+        self.assertEqual(len(registry), 2)
+        self.assertIn('foo', registry)
+        self.assertNotIn('baz', registry)
+        self.assertIs(registry['foo'], TimeErrorParser)
+        with self.assertRaises(KeyError):
+            registry['baz']  # pylint: disable=pointless-statement
+
+    def test_registries(self):
+        """Test each id in PARSERS and ANALYZERS is the id of its class"""
+        for registry in (PARSERS, ANALYZERS):
+            for (id_, cls) in registry.items():
+                with self.subTest(id_=id_):
+                    self.assertEqual(cls.id_, id_)
@@ -0,0 +1,108 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.decimation"""
+
+from unittest import TestCase
+
+import allantools
+import numpy as np
+
+from vse_sync_pp import decimation
+from vse_sync_pp.analyzers.analyzer import Config
+from vse_sync_pp.analyzers.ts2phc import TimeDeviationAnalyzer
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.synth import generate
+
+TAUS = np.array([1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000])
+
+
+def phase(count, seed=0):
+    """Return an array of `count` phase samples: white noise and random walk"""
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(size=count)) * 0.05 + rng.normal(size=count) * 2
+
+
+class TestDecimationPyramid(TestCase):
+    """Test cases for vse_sync_pp.decimation.DecimationPyramid"""
+    def test_levels(self):
+        """Test vse_sync_pp.decimation.DecimationPyramid levels summarize blocks of samples"""
+        series = phase(1234)
+        pyramid = decimation.DecimationPyramid(series)
+        (means, mins, maxs) = pyramid.level(0)
+        self.assertTrue(np.array_equal(means, series))
+        (means, mins, maxs) = pyramid.level(2)
+        self.assertEqual(len(means), 12)
+        blocks = series[:1200].reshape(12, 100)
+        self.assertTrue(np.allclose(means, blocks.mean(axis=1)))
+        self.assertTrue(np.array_equal(mins, blocks.min(axis=1)))
+        self.assertTrue(np.array_equal(maxs, blocks.max(axis=1)))
+
+
+class TestMetrics(TestCase):
+    """Test cases for vse_sync_pp.decimation metrics at long taus"""
+    def setUp(self):
+        self._factors = (decimation.MAX_FACTOR, decimation.MIN_FACTOR)
+        # taus longer than 100 samples from levels with at least 20 samples in a tau
+        (decimation.MAX_FACTOR, decimation.MIN_FACTOR) = (100, 20)
+
+    def tearDown(self):
+        (decimation.MAX_FACTOR, decimation.MIN_FACTOR) = self._factors
+
+    def test_short(self):
+        """Test short taus are computed from the series"""
+        series = phase(1000)
+        for (func, batch) in ((decimation.tdev, allantools.tdev), (decimation.mtie, allantools.mtie)):
+            with self.subTest(func=func.__name__):
+                (taus, values) = func(series, 1, TAUS[:7])
+                (btaus, bvalues, _, _) = batch(series, rate=1, data_type='phase', taus=TAUS[:7])
+                self.assertTrue(np.array_equal(taus, btaus))
+                self.assertTrue(np.array_equal(values, bvalues))
+
+    def test_tdev(self):
+        """Test vse_sync_pp.decimation.tdev at long taus is close to TDEV of the series"""
+        series = phase(20000)
+        (taus, values) = decimation.tdev(series, 1, TAUS)
+        (btaus, bvalues, _, _) = allantools.tdev(series, rate=1, data_type='phase', taus=TAUS)
+        self.assertTrue(np.array_equal(taus, btaus))
+        self.assertTrue(np.array_equal(values[:7], bvalues[:7]))
+        self.assertTrue(np.allclose(values[7:], bvalues[7:], rtol=0.05, atol=0))
+
+    def test_mtie(self):
+        """Test vse_sync_pp.decimation.mtie at long taus bounds MTIE of the series"""
+        series = phase(20000)
+        (taus, values) = decimation.mtie(series, 1, TAUS)
+        self.assertTrue(np.array_equal(taus, TAUS))
+        for (tau, value) in zip(taus[7:], values[7:]):
+            with self.subTest(tau=tau):
+                # taus of 200 and 500 samples at level 1, 1000 and 2000 at level 2
+                block = 10 if tau < 1000 else 100
+                (_, lower, _, _) = allantools.mtie(series, rate=1, data_type='phase', taus=[tau])
+                (_, upper, _, _) = allantools.mtie(series, rate=1, data_type='phase', taus=[tau + 2 * block])
+                self.assertLessEqual(lower[0], value)
+                self.assertLessEqual(value, upper[0])
+
+    def test_too_short(self):
+        """Test long taus without enough samples are omitted"""
+        series = phase(2000)
+        (taus, _) = decimation.tdev(series, 1, TAUS)
+        self.assertEqual(taus.max(), 500)
+        (taus, _) = decimation.mtie(series, 1, TAUS)
+        self.assertEqual(taus.max(), 1000)
+
+
+class TestConfig(TestCase):
+    """Test cases for the tau grid configured for analyzers"""
+    def test_taus(self):
+        """Test parameter taus/s specifies taus for wander metrics"""
+        parameters = {
+            'transient-period/s': 0,
+            'min-test-duration/s': 1,
+            'time-deviation-limit/%': 100,
+        }
+        rows = list(PARSERS['ts2phc/time-error']().parse(generate('ts2phc/time-error', 1000)))
+        analyzer = TimeDeviationAnalyzer(Config(None, 'G.8272/PRTC-A', dict(parameters, **{'taus/s': [1, 10, 100]})))
+        analyzer.collect(*rows)
+        self.assertEqual(list(analyzer.toarrays()[0]), [1, 10, 100])
+        analyzer = TimeDeviationAnalyzer(Config(None, 'G.8272/PRTC-A', parameters))
+        analyzer.collect(*rows)
+        self.assertEqual(analyzer.toarrays()[0].max(), 300)
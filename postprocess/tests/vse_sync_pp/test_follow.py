@@ -0,0 +1,180 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.follow"""
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from vse_sync_pp.analyzers.analyzer import Config
+from vse_sync_pp.analyzers.pmc import ClockStateAnalyzer
+from vse_sync_pp.analyzers.ts2phc import (
+    TimeErrorAnalyzer,
+    TimeDeviationAnalyzer,
+)
+from vse_sync_pp.follow import (
+    Follow,
+    Rolling,
+    summary,
+)
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.synth import generate
+
+CONFIG = Config(None, 'G.8272/PRTC-A', {
+    'transient-period/s': 10,
+    'min-test-duration/s': 20,
+    'time-error-limit/%': 1000,
+})
+
+
+def parsed(count, **kwargs):
+    """Return a list of `count` rows parsed from synthetic ts2phc logs"""
+    return list(PARSERS['ts2phc/time-error']().parse(generate('ts2phc/time-error', count, **kwargs)))
+
+
+class TestFollow(TestCase):
+    """Test cases for vse_sync_pp.follow.Follow"""
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+        self._filename = os.path.join(self._tmpdir.name, 'followed.log')
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _append(self, text):
+        """Append `text` to the file followed"""
+        with open(self._filename, 'a', encoding='utf-8') as fid:
+            fid.write(text)
+
+    def test_appended(self):
+        """Test vse_sync_pp.follow.Follow reads lines appended, joining partial lines"""
+        self._append('foo\nba')
+        with open(self._filename, encoding='utf-8') as fid:
+            follow = Follow(fid, poll=0.01, idle=0.1)
+            self.assertEqual(follow.readline(), 'foo\n')
+            self._append('r\nbaz\n')
+            self.assertEqual(follow.readline(), 'bar\n')
+            self.assertEqual(list(follow), ['baz\n'])
+
+    def test_idle(self):
+        """Test vse_sync_pp.follow.Follow returns a partial line when idle"""
+        self._append('foo\nbar')
+        with open(self._filename, encoding='utf-8') as fid:
+            self.assertEqual(list(Follow(fid, poll=0.01, idle=0.05)), ['foo\n', 'bar'])
+
+    def test_truncated(self):
+        """Test vse_sync_pp.follow.Follow reads from the start of a truncated file"""
+        self._append('foo\nbar\n')
+        with open(self._filename, encoding='utf-8') as fid:
+            follow = Follow(fid, poll=0.01, idle=0.1)
+            self.assertEqual(list(follow), ['foo\n', 'bar\n'])
+            with open(self._filename, 'w', encoding='utf-8') as wid:
+                wid.write('baz\n')
+            self.assertEqual(list(follow), ['baz\n'])
+
+
+class TestRolling(TestCase):
+    """Test cases for vse_sync_pp.follow.Rolling"""
+    def test_interim(self):
+        """Test vse_sync_pp.follow.Rolling produces interim results for each interval"""
+        rolling = Rolling(TimeErrorAnalyzer, CONFIG, 10)
+        interims = [item for item in map(rolling.collect, parsed(61)) if item is not None]
+        self.assertEqual(len(interims), 5)
+        self.assertTrue(all(item['interim'] for item in interims))
+        self.assertEqual([item['duration'] for item in interims], [10, 20, 30, 40, 50])
+        self.assertEqual(
+            [(item['result'], item['reason']) for item in interims],
+            [(False, 'short test duration')] + [(True, None)] * 4,
+        )
+        self.assertFalse(rolling.failed)
+        # the final analysis is of all rows
+        final = summary(rolling.analyzer)
+        self.assertNotIn('interim', final)
+        self.assertEqual(final['duration'], 50)
+        self.assertEqual(final['result'], True)
+
+    def test_window(self):
+        """Test vse_sync_pp.follow.Rolling analyzes rows in the last window"""
+        rolling = Rolling(TimeErrorAnalyzer, CONFIG, 10, window=25)
+        interims = [item for item in map(rolling.collect, parsed(61)) if item is not None]
+        self.assertEqual([item['duration'] for item in interims], [10, 20, 25, 25, 25])
+
+    def test_failed(self):
+        """Test vse_sync_pp.follow.Rolling detects failure more data cannot reverse"""
+        rolling = Rolling(TimeErrorAnalyzer, CONFIG, 10)
+        for row in parsed(61, states=((35, 'freerun'),)):
+            if rolling.collect(row) is not None and rolling.failed:
+                break
+        self.assertEqual(rolling.interim['reason'], 'loss of lock')
+        self.assertEqual(rolling.interim['duration'], 30)
+
+    def test_online(self):
+        """Test vse_sync_pp.follow.Rolling updates an online estimate for interim results"""
+        config = Config(None, 'G.8272/PRTC-A', {
+            'transient-period/s': 10,
+            'min-test-duration/s': 20,
+            'time-deviation-limit/%': 100,
+        })
+        rolling = Rolling(TimeDeviationAnalyzer, config, 100)
+        interims = [item for item in map(rolling.collect, parsed(311)) if item is not None]
+        self.assertEqual(len(interims), 3)
+        # pylint: disable=protected-access
+        self.assertEqual(len(rolling._running.wander), 301)
+        self.assertEqual(len(rolling._rows), 0)
+        self.assertTrue(all(item['result'] for item in interims))
+        self.assertEqual([item['duration'] for item in interims], [100, 200, 300])
+        self.assertIn('tdev', interims[-1]['analysis'])
+        # no online estimate for a window
+        rolling = Rolling(TimeDeviationAnalyzer, config, 100, window=50)
+        for row in parsed(311):
+            rolling.collect(row)
+        self.assertIsNone(rolling._running)
+
+    def test_running(self):
+        """Test vse_sync_pp.follow.Rolling interim analyses online are of all rows after the transient period"""
+        rows = parsed(61)
+        rolling = Rolling(TimeErrorAnalyzer, CONFIG, 10)
+        for row in rows:
+            rolling.collect(row)
+        # pylint: disable=protected-access
+        self.assertLessEqual(len(rolling._rows), 10)
+        batch = TimeErrorAnalyzer(CONFIG.updated({'transient-period/s': 0}))
+        batch.collect(*(row for row in rows if 10 <= row.timestamp - rows[0].timestamp <= 60))
+        self.assertEqual(rolling.interim['result'], batch.result)
+        self.assertEqual(rolling.interim['duration'], batch.duration)
+        for (name, value) in batch.analysis['terror'].items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(rolling.interim['analysis']['terror'][name], value, places=2)
+        self.assertEqual(rolling.interim['analysis']['terror']['percentiles'], batch.analysis['terror']['percentiles'])
+        # more than one interval between samples
+        rolling = Rolling(TimeErrorAnalyzer, CONFIG, 10)
+        for row in rows[:35] + rows[36:]:
+            rolling.collect(row)
+        self.assertEqual(rolling.interim['reason'], 'missing test samples')
+
+    def test_collected(self):
+        """Test vse_sync_pp.follow.Rolling analyzes rows collected for analyzers not analyzing online"""
+        lines = generate('phc/gm-settings', 61, states=((30, 'holdover'),))
+        rows = list(PARSERS['phc/gm-settings']().parse(lines))
+        config = Config(None, None, {'transient-period/s': 10, 'min-test-duration/s': 20})
+        rolling = Rolling(ClockStateAnalyzer, config, 10)
+        interims = [item for item in map(rolling.collect, rows) if item is not None]
+        # pylint: disable=protected-access
+        self.assertEqual(len(rolling._rows), 0)
+        self.assertEqual([item['duration'] for item in interims], [10, 20, 30, 40, 50])
+        self.assertEqual(interims[-1]['analysis']['total_transitions'], 1)
+
+    def test_brief(self):
+        """Test vse_sync_pp.follow.Rolling interim results are brief if specified"""
+        config = Config(None, 'G.8272/PRTC-A', {
+            'transient-period/s': 10,
+            'min-test-duration/s': 20,
+            'time-deviation-limit/%': 100,
+        })
+        rolling = Rolling(TimeDeviationAnalyzer, config, 100, window=50, brief=True)
+        for row in parsed(211, states=((150, 'freerun'),)):
+            rolling.collect(row)
+        self.assertEqual(rolling.interim['reason'], "loss of lock")
+        self.assertEqual(rolling.interim['analysis'], {})
+        self.assertIn('tdev', summary(rolling.analyzer)['analysis'])
+        self.assertEqual(summary(rolling.analyzer, brief=True)['analysis'], {})
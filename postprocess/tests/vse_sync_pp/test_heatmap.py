@@ -0,0 +1,42 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.heatmap"""
+
+import os.path
+from tempfile import TemporaryDirectory
+
+from unittest import TestCase
+
+import numpy as np
+
+from vse_sync_pp.heatmap import Heatmap
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class TestHeatmap(TestCase):
+    """Test cases for vse_sync_pp.heatmap.Heatmap"""
+    def _plot(self, data, unallowed_cells):
+        """Plot `data` to a PNG image file; return the file signature"""
+        ticks = ('a', 'b', 'c')
+        heatmap = Heatmap(ticks, ticks, 'title', unallowed_cells, 'count', 'to', 'from')
+        with TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'heatmap.png')
+            heatmap.plot(data, filename)
+            with open(filename, 'rb') as fid:
+                return fid.read(len(PNG_SIGNATURE))
+
+    def test_array(self):
+        """Test heatmap plots an array with unallowed cells as an array"""
+        data = np.arange(9).reshape(3, 3)
+        unallowed = np.argwhere(np.eye(3, dtype=bool))
+        self.assertEqual(self._plot(data, unallowed), PNG_SIGNATURE)
+
+    def test_lists(self):
+        """Test heatmap plots nested lists with unallowed cells as a list"""
+        data = [[0, 1, 0], [2, 0, 0], [0, 0, 3]]
+        self.assertEqual(self._plot(data, [(0, 1), (1, 2)]), PNG_SIGNATURE)
+
+    def test_no_unallowed(self):
+        """Test heatmap plots with no unallowed cells"""
+        self.assertEqual(self._plot(np.zeros((3, 3), dtype=int), []), PNG_SIGNATURE)
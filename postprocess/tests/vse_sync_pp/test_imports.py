@@ -0,0 +1,91 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for the cost of importing vse_sync_pp modules"""
+
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import vse_sync_pp
+
+# libraries too heavy to import unless used
+HEAVY = ('numpy', 'pandas', 'scipy', 'allantools', 'yaml', 'matplotlib')
+
+
+def imported(code):
+    """Return a dict of cumulative import time in microseconds of each module imported by `code`
+
+    `code` is run in a new Python process with option `-X importtime`.
+    """
+    path = os.path.dirname(os.path.dirname(vse_sync_pp.__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (path, os.environ.get('PYTHONPATH')))))
+    proc = subprocess.run(
+        (sys.executable, '-X', 'importtime', '-c', code),
+        capture_output=True, text=True, check=True, env=env,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        (_, cumulative, name) = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestImports(TestCase):
+    """Test cases for modules imported by vse_sync_pp modules"""
+    def assertNotImported(self, code, heavy=HEAVY):  # pylint: disable=invalid-name
+        """Assert running `code` does not import any of `heavy` libraries"""
+        modules = imported(code)
+        for name in heavy:
+            if name in modules:
+                self.fail(f'{code!r} imports {name}, taking {modules[name] / 1000:.1f} ms')
+
+    def test_light(self):
+        """Test tools for parsing and sequencing do not import heavy libraries"""
+        for module in (
+            'vse_sync_pp.common',
+            'vse_sync_pp.parsers',
+            'vse_sync_pp.parse',
+            'vse_sync_pp.demux',
+            'vse_sync_pp.sequence',
+            'vse_sync_pp.analyzers',
+            'vse_sync_pp.service',
+        ):
+            with self.subTest(module=module):
+                self.assertNotImported(f'import {module}')
+
+    def test_parsers(self):
+        """Test building every parser does not import heavy libraries"""
+        self.assertNotImported(
+            'from vse_sync_pp.parsers import PARSERS\n'
+            'for cls in PARSERS.values():\n'
+            '    cls()\n'
+        )
+
+    def test_analyzers(self):
+        """Test analyzers import libraries for filtering and wander metrics only when used"""
+        self.assertNotImported(
+            'from vse_sync_pp.analyzers import ANALYZERS\n'
+            'for cls in ANALYZERS.values():\n'
+            '    pass\n',
+            ('pandas', 'scipy', 'allantools', 'yaml', 'matplotlib'),
+        )
+
+    def test_preload(self):
+        """Test vse_sync_pp.preload imports every library and analyzer module analysis uses"""
+        path = os.path.dirname(os.path.dirname(vse_sync_pp.__file__))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (path, os.environ.get('PYTHONPATH')))))
+        proc = subprocess.run(
+            (sys.executable, '-c', 'import sys, vse_sync_pp.preload\nprint("\\n".join(sys.modules))'),
+            capture_output=True, text=True, check=True, env=env,
+        )
+        modules = set(proc.stdout.split())
+        for name in (
+            'pandas', 'scipy.signal', 'scipy.ndimage', 'allantools', 'yaml',
+            'vse_sync_pp.analyzers.analyzer', 'vse_sync_pp.analyzers.ts2phc', 'vse_sync_pp.analyzers.pmc',
+            'vse_sync_pp.parsers.ts2phc', 'vse_sync_pp.service',
+        ):
+            with self.subTest(module=name):
+                self.assertIn(name, modules)
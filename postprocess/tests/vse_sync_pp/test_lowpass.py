@@ -0,0 +1,90 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.lowpass"""
+
+from unittest import TestCase
+
+import numpy as np
+from pandas import DataFrame
+from scipy import signal as scipy_signal
+
+from vse_sync_pp import lowpass
+from vse_sync_pp.analyzers.analyzer import (
+    Config,
+    calculate_filter,
+)
+from vse_sync_pp.analyzers.ts2phc import TimeDeviationAnalyzer
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.synth import generate
+
+
+def phase(count, seed=0):
+    """Return an array of `count` phase samples: white noise and random walk"""
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(size=count)) * 0.05 + rng.normal(size=count) * 2
+
+
+class TestFiltFilt(TestCase):
+    """Test cases for vse_sync_pp.lowpass.filtfilt"""
+    def test_sosfiltfilt(self):
+        """Test vse_sync_pp.lowpass.filtfilt equals scipy.signal.sosfiltfilt in chunks"""
+        series = phase(5000)
+        for rate in (1, 16):
+            for order in (1, 2, 3):
+                sos = lowpass.design(rate, 0.1, order)
+                expected = scipy_signal.sosfiltfilt(sos, series)
+                for chunk in (1, 7, 1000, lowpass.CHUNK):
+                    with self.subTest(rate=rate, order=order, chunk=chunk):
+                        filtered = lowpass.filtfilt(sos, series, chunk)
+                        self.assertTrue(np.allclose(filtered, expected, rtol=0, atol=1e-9))
+
+    def test_filtfilt(self):
+        """Test vse_sync_pp.lowpass.filtfilt equals scipy.signal.filtfilt of order 1"""
+        series = phase(3000)
+        (numerator, denominator) = scipy_signal.butter(1, 0.1 / 0.5, btype='low', analog=False, output='ba')
+        expected = scipy_signal.filtfilt(numerator, denominator, series)
+        filtered = lowpass.filtfilt(lowpass.design(1), series, 100)
+        self.assertTrue(np.allclose(filtered, expected, rtol=0, atol=1e-9))
+
+    def test_short(self):
+        """Test vse_sync_pp.lowpass.filtfilt requires more samples than the odd extension"""
+        sos = lowpass.design(1)
+        self.assertEqual(len(lowpass.filtfilt(sos, phase(lowpass.padlen(sos) + 1))), lowpass.padlen(sos) + 1)
+        with self.assertRaises(ValueError):
+            lowpass.filtfilt(sos, phase(lowpass.padlen(sos)))
+        self.assertEqual(len(lowpass.filtfilt(sos, [])), 0)
+
+    def test_objects(self):
+        """Test vse_sync_pp.lowpass.filtfilt converts samples to float"""
+        series = phase(500)
+        sos = lowpass.design(1)
+        filtered = lowpass.filtfilt(sos, series.astype(object), 64)
+        self.assertTrue(np.array_equal(filtered, lowpass.filtfilt(sos, series, 64)))
+
+
+class TestCalculateFilter(TestCase):
+    """Test cases for vse_sync_pp.analyzers.analyzer.calculate_filter"""
+    def test_transient(self):
+        """Test calculate_filter omits samples in the transient period"""
+        series = phase(1000)
+        data = DataFrame({'terror': series.astype(object)})
+        expected = scipy_signal.sosfiltfilt(lowpass.design(2, 0.05, 2), series)[10:]
+        filtered = calculate_filter(data, 10, 2, cutoff=0.05, order=2)
+        self.assertTrue(np.allclose(filtered, expected, rtol=0, atol=1e-9))
+
+    def test_config(self):
+        """Test parameters filter-cutoff/Hz and filter-order specify the filter for analyzers"""
+        parameters = {
+            'transient-period/s': 0,
+            'min-test-duration/s': 1,
+            'time-deviation-limit/%': 100,
+            'taus/s': [1, 10],
+        }
+        rows = list(PARSERS['ts2phc/time-error']().parse(generate('ts2phc/time-error', 1000)))
+        results = []
+        for extra in ({}, {'filter-cutoff/Hz': 0.1, 'filter-order': 1}, {'filter-cutoff/Hz': 0.02, 'filter-order': 2}):
+            analyzer = TimeDeviationAnalyzer(Config(None, 'G.8272/PRTC-A', dict(parameters, **extra)))
+            analyzer.collect(*rows)
+            results.append(analyzer.toarrays()[1])
+        self.assertTrue(np.array_equal(results[0], results[1]))
+        self.assertFalse(np.allclose(results[0], results[2]))
@@ -0,0 +1,59 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.parallel"""
+
+from unittest import TestCase
+
+import allantools
+import numpy as np
+
+from vse_sync_pp import parallel
+
+TAUS = np.array([1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000])
+
+
+def phase(count, seed=0):
+    """Return an array of `count` phase samples: white noise and random walk"""
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(size=count)) * 0.05 + rng.normal(size=count) * 2
+
+
+class TestParallel(TestCase):
+    """Test cases for vse_sync_pp.parallel"""
+    def setUp(self):
+        self._processes = parallel.processes()
+        self._min_samples = parallel.MIN_SAMPLES
+        parallel.MIN_SAMPLES = 100
+
+    def tearDown(self):
+        parallel.configure(self._processes)
+        parallel.MIN_SAMPLES = self._min_samples
+
+    def _assert_equal(self, func, batch, series, rate=1, taus=TAUS):
+        """Assert `func` in parallel returns the same as `batch` for `series`"""
+        (btaus, bvalues, _, _) = batch(series, rate=rate, data_type='phase', taus=taus)
+        for processes in (1, 2, 3):
+            with self.subTest(func=func.__name__, processes=processes):
+                parallel.configure(processes)
+                (ptaus, pvalues) = func(series, rate, taus)
+                self.assertTrue(np.array_equal(ptaus, btaus))
+                self.assertTrue(np.allclose(pvalues, bvalues, rtol=1e-12, atol=0))
+
+    def test_tdev(self):
+        """Test vse_sync_pp.parallel.tdev equals allantools.tdev"""
+        self._assert_equal(parallel.tdev, allantools.tdev, phase(7000))
+        self._assert_equal(parallel.tdev, allantools.tdev, phase(7000), rate=4)
+
+    def test_mtie(self):
+        """Test vse_sync_pp.parallel.mtie equals allantools.mtie"""
+        self._assert_equal(parallel.mtie, allantools.mtie, phase(7000))
+        self._assert_equal(parallel.mtie, allantools.mtie, phase(3000), taus=TAUS[:-2])
+
+    def test_few_samples(self):
+        """Test vse_sync_pp.parallel computes in this process for short series"""
+        parallel.configure(2)
+        parallel.MIN_SAMPLES = 1000
+        (taus, values) = parallel.tdev(phase(500), 1, TAUS)
+        (btaus, bvalues, _, _) = allantools.tdev(phase(500), rate=1, data_type='phase', taus=TAUS)
+        self.assertTrue(np.array_equal(taus, btaus))
+        self.assertTrue(np.array_equal(values, bvalues))
@@ -0,0 +1,96 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.plot"""
+
+from collections import namedtuple
+from decimal import Decimal
+
+from unittest import (
+    TestCase,
+    mock,
+)
+
+import numpy as np
+
+from vse_sync_pp import plot
+from vse_sync_pp.columns import tabulate
+from vse_sync_pp.plot import Plotter, Axis, TIMESERIES, envelope
+
+
+class TestEnvelope(TestCase):
+    """Test cases for vse_sync_pp.plot.envelope"""
+    def test_short(self):
+        """Test vse_sync_pp.plot.envelope does not decimate short series"""
+        x = np.arange(4.0)
+        y = np.array([3.0, 1.0, 4.0, 1.0])
+        (x_env, y_env) = envelope(x, y, 2)
+        self.assertTrue(np.array_equal(x_env, x))
+        self.assertTrue(np.array_equal(y_env, y))
+
+    def test_extremes(self):
+        """Test vse_sync_pp.plot.envelope keeps minimum and maximum per interval"""
+        x = np.arange(10.0)
+        y = np.array([0.0, 5.0, 1.0, 2.0, 9.0, 3.0, 3.0, 3.0, 3.0, -1.0])
+        (x_env, y_env) = envelope(x, y, 2)
+        self.assertEqual(list(x_env), [0.0, 4.0, 8.0, 9.0])
+        self.assertEqual(list(y_env), [0.0, 9.0, 3.0, -1.0])
+
+    def test_log(self):
+        """Test vse_sync_pp.plot.envelope divides log10(x) into intervals"""
+        x = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 10.0, 100.0])
+        y = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+        (x_env, y_env) = envelope(x, y, 2, log=True)
+        self.assertEqual(list(x_env), [1.0, 5.0, 10.0, 100.0])
+        self.assertEqual(list(y_env), [1.0, 5.0, 6.0, 7.0])
+
+
+class TestPlotter(TestCase):
+    """Test cases for vse_sync_pp.plot.Plotter"""
+    def test_append(self):
+        """Test vse_sync_pp.plot.Plotter stores appended data in arrays"""
+        parsed = namedtuple('Parsed', ('timestamp', 'terror'))
+        plotter = Plotter(TIMESERIES, Axis('Time Error (ns)', 'terror'))
+        for idx in range(2000):
+            plotter.append(parsed(Decimal(idx), Decimal(idx) / 4))
+        # pylint: disable=protected-access
+        self.assertEqual(plotter._x_data.dtype, float)
+        self.assertEqual(len(plotter._y_data), 2000)
+        self.assertEqual(plotter._y_data[-1], 499.75)
+
+    def test_table(self):
+        """Test vse_sync_pp.plot.Plotter plots the columns of a table"""
+        parsed = namedtuple('Parsed', ('timestamp', 'terror'))
+        table = tabulate(parsed(Decimal(idx), Decimal(idx) / 4) for idx in range(2000))
+        plotter = Plotter.from_table(TIMESERIES, Axis('Time Error (ns)', 'terror'), table)
+        # pylint: disable=protected-access
+        self.assertEqual(plotter._x_data.dtype, float)
+        self.assertEqual(len(plotter._y_data), 2000)
+        self.assertEqual(plotter._y_data[-1], 499.75)
+        plotter = Plotter.from_table(TIMESERIES, Axis('Time Error (ns)', 'terror'), tabulate([]))
+        self.assertEqual(len(plotter._y_data), 0)
+
+    def test_extend(self):
+        """Test vse_sync_pp.plot.Plotter extends data from arrays"""
+        plotter = Plotter.from_arrays(
+            Axis('tau observation window (s)', 'tau', 'log'),
+            Axis('filtered TDEV (ns)', 'tdev'),
+            [1, 2, 3], np.array([0.5, 0.25, 0.125]),
+        )
+        plotter.extend(np.arange(4.0, 2004.0), np.zeros(2000))
+        # pylint: disable=protected-access
+        self.assertEqual(len(plotter._x_data), 2003)
+        self.assertEqual(list(plotter._x_data[:4]), [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(list(plotter._y_data[:4]), [0.5, 0.25, 0.125, 0.0])
+        with self.assertRaises(ValueError):
+            plotter.extend([1.0], [])
+
+    def test_exact(self):
+        """Test vse_sync_pp.plot.Plotter histograms are exact unless decimating many values"""
+        (x_data, y_data) = (np.arange(5000.0), np.sin(np.arange(5000.0)))
+        # pylint: disable=protected-access
+        self.assertIsNone(Plotter.from_arrays(TIMESERIES, Axis('y', 'y'), x_data, y_data)._sketch())
+        plotter = Plotter.from_arrays(TIMESERIES, Axis('y', 'y'), x_data, y_data, buckets=10)
+        self.assertIsNone(plotter._sketch())
+        with mock.patch.object(plot, 'EXACT', 100):
+            self.assertIsNone(Plotter.from_arrays(TIMESERIES, Axis('y', 'y'), x_data, y_data)._sketch())
+            self.assertEqual(len(plotter._sketch()), 5000)
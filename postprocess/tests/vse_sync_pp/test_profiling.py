@@ -0,0 +1,89 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.profiling"""
+
+from unittest import TestCase
+
+from vse_sync_pp import profiling
+from vse_sync_pp.analyzers import ts2phc
+from vse_sync_pp.analyzers.analyzer import Config
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.synth import generate
+
+KEYS = {'calls', 'wall_time', 'cpu_time', 'rows', 'max_rss'}
+
+
+class TestProfiling(TestCase):
+    """Test cases for vse_sync_pp.profiling"""
+    def setUp(self):
+        self._enabled = profiling.enabled()
+        profiling.enable()
+        profiling.report()
+
+    def tearDown(self):
+        profiling.report()
+        profiling.enable(self._enabled)
+
+    def test_stage(self):
+        """Test vse_sync_pp.profiling.stage records calls and rows"""
+        with profiling.stage('foo', rows=3):
+            pass
+        with profiling.stage('foo', rows=4):
+            pass
+        profile = profiling.report()
+        self.assertEqual(set(profile), {'foo'})
+        self.assertEqual(set(profile['foo']), KEYS)
+        self.assertEqual(profile['foo']['calls'], 2)
+        self.assertEqual(profile['foo']['rows'], 7)
+        self.assertGreaterEqual(profile['foo']['wall_time'], 0)
+        self.assertGreater(profile['foo']['max_rss'], 0)
+        self.assertEqual(profiling.report(), {})
+
+    def test_stage_raises(self):
+        """Test vse_sync_pp.profiling.stage records a call raising an exception"""
+        with self.assertRaises(ValueError):
+            with profiling.stage('foo'):
+                raise ValueError()
+        self.assertEqual(profiling.report()['foo']['calls'], 1)
+
+    def test_iterate(self):
+        """Test vse_sync_pp.profiling.iterate records items as rows"""
+        self.assertEqual(list(profiling.iterate('foo', range(5))), list(range(5)))
+        profile = profiling.report()
+        self.assertEqual(profile['foo']['calls'], 1)
+        self.assertEqual(profile['foo']['rows'], 5)
+
+    def test_disabled(self):
+        """Test vse_sync_pp.profiling records nothing when disabled"""
+        profiling.enable(False)
+        self.assertFalse(profiling.enabled())
+        items = range(5)
+        self.assertIs(profiling.iterate('foo', items), items)
+        with profiling.stage('bar'):
+            pass
+        self.assertEqual(profiling.attach({'result': True}), {'result': True})
+        self.assertEqual(profiling.report(), {})
+
+    def test_attach(self):
+        """Test vse_sync_pp.profiling.attach adds a profile when enabled"""
+        with profiling.stage('foo'):
+            pass
+        output = profiling.attach({'result': True})
+        self.assertEqual(output['result'], True)
+        self.assertEqual(set(output['profile']), {'foo'})
+
+    def test_analyze(self):
+        """Test stages of parsing and analysis are profiled"""
+        parser = PARSERS['ts2phc/time-error']()
+        analyzer = ts2phc.TimeErrorAnalyzer(Config(None, 'G.8272/PRTC-A', {
+            'transient-period/s': 0,
+            'min-test-duration/s': 1,
+            'time-error-limit/%': 100,
+        }))
+        analyzer.collect(*parser.parse(generate('ts2phc/time-error', 20)))
+        self.assertIsNotNone(analyzer.result)
+        self.assertIsNotNone(analyzer.analysis)
+        profile = profiling.report()
+        self.assertTrue({'parse', 'columns', 'prepare', 'test', 'explain'}.issubset(profile))
+        self.assertEqual(profile['parse']['rows'], 20)
+        self.assertEqual(profile['columns']['rows'], 20)
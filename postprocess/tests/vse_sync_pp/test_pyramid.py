@@ -0,0 +1,74 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.pyramid"""
+
+import os.path
+from tempfile import TemporaryDirectory
+
+from unittest import TestCase
+
+import numpy as np
+
+from vse_sync_pp.plot import Plotter, Axis, TIMESERIES
+from vse_sync_pp.pyramid import EnvelopePyramid
+
+
+class TestEnvelopePyramid(TestCase):
+    """Test cases for vse_sync_pp.pyramid.EnvelopePyramid"""
+    def test_levels(self):
+        """Test vse_sync_pp.pyramid.EnvelopePyramid levels preserve extremes"""
+        x = np.arange(1000.0)
+        y = np.zeros(1000)
+        (y[123], y[877]) = (-5.0, 7.0)
+        pyramid = EnvelopePyramid(x, y, 4)
+        # 4, 8, ..., 512 intervals: at most two data points per interval
+        self.assertEqual(len(pyramid), 8)
+        self.assertEqual(pyramid.extent, (0.0, 999.0))
+        for level in range(len(pyramid)):
+            (centers, ymin, ymax) = pyramid.envelope(level)
+            self.assertEqual(len(centers), 4 * 2 ** level)
+            self.assertEqual(ymin.min(), -5.0)
+            self.assertEqual(ymax.max(), 7.0)
+
+    def test_envelope(self):
+        """Test vse_sync_pp.pyramid.EnvelopePyramid envelope of a range of x"""
+        x = np.arange(100.0)
+        y = np.arange(100.0)
+        pyramid = EnvelopePyramid(x, y, 2, max_depth=2)
+        self.assertEqual(len(pyramid), 3)
+        self.assertEqual(pyramid.level(0, 99, 2), 0)
+        self.assertEqual(pyramid.level(0, 25, 2), 2)
+        self.assertEqual(pyramid.level(0, 1, 2), 2)
+        # 8 intervals of width 12.375 at level 2
+        (centers, ymin, ymax) = pyramid.envelope(2, 0, 24.75)
+        self.assertEqual(list(centers), [6.1875, 18.5625])
+        self.assertEqual(list(ymin), [0.0, 13.0])
+        self.assertEqual(list(ymax), [12.0, 24.0])
+
+    def test_empty_intervals(self):
+        """Test vse_sync_pp.pyramid.EnvelopePyramid omits empty intervals"""
+        pyramid = EnvelopePyramid([1.0, 2.0, 9.0, 10.0], [1.0, 2.0, 3.0, 4.0], 3)
+        (centers, ymin, ymax) = pyramid.envelope(0)
+        self.assertEqual(list(centers), [2.5, 8.5])
+        self.assertEqual(list(ymin), [1.0, 3.0])
+        self.assertEqual(list(ymax), [2.0, 4.0])
+
+    def test_tiles(self):
+        """Test vse_sync_pp.plot.Plotter.plot_tiles outputs overview and tiles"""
+        plotter = Plotter.from_arrays(
+            TIMESERIES, Axis('Time Error (ns)', 'terror'),
+            np.arange(10000.0), np.sin(np.arange(10000.0)),
+        )
+        with TemporaryDirectory() as tmpdir:
+            prefix = os.path.join(tmpdir, 'foo')
+            outputs = plotter.plot_tiles(prefix, 2, 'svg')
+            self.assertEqual(
+                outputs,
+                [
+                    (f'{prefix}.svg', (0.0, 9999.0)),
+                    (f'{prefix}_1.svg', (0.0, 4999.5)),
+                    (f'{prefix}_2.svg', (4999.5, 9999.0)),
+                ],
+            )
+            for (filename, _) in outputs:
+                self.assertTrue(os.path.isfile(filename))
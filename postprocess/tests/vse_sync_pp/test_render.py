@@ -0,0 +1,83 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.render"""
+
+import os.path
+from tempfile import TemporaryDirectory
+
+from unittest import TestCase
+
+import numpy as np
+
+from vse_sync_pp.plot import Axis, TIMESERIES
+from vse_sync_pp.render import PlotJob, Renderer, job_from_json, render_all
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _is_png(filename):
+    """Return True if `filename` is a PNG image file"""
+    with open(filename, 'rb') as fid:
+        return fid.read(len(PNG_SIGNATURE)) == PNG_SIGNATURE
+
+
+class TestRender(TestCase):
+    """Test cases for vse_sync_pp.render"""
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.series = os.path.join(self._tmpdir.name, 'series.npz')
+        np.savez(
+            self.series,
+            timestamp=np.arange(100.0),
+            terror=np.sin(np.arange(100.0)),
+            tau=np.arange(1.0, 101.0),
+        )
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _jobs(self):
+        """Return plot jobs of each kind"""
+        return [
+            PlotJob(
+                os.path.join(self._tmpdir.name, f'{kind}.png'),
+                self.series,
+                Axis('tau (s)', 'tau', 'log') if kind == 'scatter' else TIMESERIES,
+                Axis('Time Error (ns)', 'terror'),
+                kind, title,
+            )
+            for (kind, title) in (('plot', 'foo'), ('scatter', None), ('histogram', 'bar'))
+        ]
+
+    def test_renderer(self):
+        """Test vse_sync_pp.render.Renderer reuses figures"""
+        renderer = Renderer()
+        jobs = self._jobs()
+        items = [renderer.render(job) for job in jobs + jobs]
+        self.assertEqual(items[0], {'path': jobs[0].output, 'title': 'foo'})
+        self.assertEqual(items[1], {'path': jobs[1].output})
+        self.assertEqual(len(renderer._figures), 3)  # pylint: disable=protected-access
+        for job in jobs:
+            self.assertTrue(_is_png(job.output))
+
+    def test_render_all(self):
+        """Test vse_sync_pp.render.render_all renders in worker processes"""
+        jobs = self._jobs()
+        items = render_all(jobs, processes=2)
+        self.assertEqual([item['path'] for item in items], [job.output for job in jobs])
+        for job in jobs:
+            self.assertTrue(_is_png(job.output))
+
+    def test_job_from_json(self):
+        """Test vse_sync_pp.render.job_from_json"""
+        job = job_from_json({
+            'output': 'foo.png',
+            'series': 'foo.log',
+            'x': {'desc': 'Time (s)', 'attr': 'timestamp'},
+            'y': {'desc': 'Time Error (ns)', 'attr': 'terror', 'scale': 'log'},
+            'parser': 'dpll/time-error',
+        })
+        self.assertEqual(job.x, TIMESERIES)
+        self.assertEqual(job.y, Axis('Time Error (ns)', 'terror', 'log'))
+        self.assertEqual(job.kind, 'plot')
+        self.assertFalse(job.canonical)
@@ -0,0 +1,239 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.service"""
+
+import json
+import os
+import threading
+from tempfile import TemporaryDirectory
+from unittest import (
+    TestCase,
+    mock,
+)
+
+import numpy as np
+
+from vse_sync_pp import (
+    cache,
+    service,
+)
+from vse_sync_pp.common import JsonEncoder
+from vse_sync_pp.synth import generate
+
+CONFIG = '''requirements: G.8272/PRTC-A
+parameters:
+    transient-period/s: 10
+    min-test-duration/s: 20
+    time-error-limit/%: 1000
+    time-deviation-limit/%: 1000
+    maximum-time-interval-error-limit/%: 1000
+'''
+
+
+class TestLRU(TestCase):
+    """Test cases for vse_sync_pp.service.LRU"""
+    def test_evict(self):
+        """Test vse_sync_pp.service.LRU evicts the least recently used value"""
+        cache = service.LRU(2)
+        self.assertEqual(cache.get('a', lambda: 1), 1)
+        self.assertEqual(cache.get('b', lambda: 2), 2)
+        self.assertEqual(cache.get('a', lambda: 3), 1)
+        self.assertEqual(cache.get('c', lambda: 4), 4)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats(), {'size': 2, 'length': 2, 'hits': 1, 'misses': 3})
+
+    def test_build_once(self):
+        """Test vse_sync_pp.service.LRU builds a value once for concurrent calls"""
+        cache = service.LRU(2)
+        (calls, started, release) = ([], threading.Event(), threading.Event())
+
+        def build():
+            calls.append(None)
+            started.set()
+            release.wait()
+            return len(calls)
+        values = []
+        threads = [threading.Thread(target=lambda: values.append(cache.get('a', build))) for _ in range(4)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(values, [1, 1, 1, 1])
+
+    def test_build_fails(self):
+        """Test vse_sync_pp.service.LRU does not cache a value failing to build"""
+        cache = service.LRU(2)
+
+        def build():
+            raise ValueError('no value')
+        with self.assertRaises(ValueError):
+            cache.get('a', build)
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.get('a', lambda: 1), 1)
+
+
+class TestService(TestCase):
+    """Test cases for vse_sync_pp.service"""
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+        self._config = self._write('config.yaml', CONFIG)
+        self._input = self._write('ts2phc.log', ''.join(
+            generate('ts2phc/time-error', 200, states=((100, 'freerun'),))
+        ))
+        self._socket = os.path.join(self._tmpdir.name, 'service.sock')
+        self._server = None
+
+    def tearDown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._tmpdir.cleanup()
+
+    def _write(self, name, content):
+        """Write `content` to file `name` in the temporary directory; return its path"""
+        filename = os.path.join(self._tmpdir.name, name)
+        with open(filename, 'w', encoding='utf-8') as fid:
+            fid.write(content)
+        return filename
+
+    def _serve(self, **kwargs):
+        """Serve analysis at the temporary socket; return the service"""
+        instance = service.Service(**kwargs)
+        self._server = service.Server(self._socket, instance)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return instance
+
+    def _analyze(self, analyzer, **kwargs):
+        """Return an analysis of the temporary input by `analyzer`"""
+        return service.analyze(self._input, analyzer, config=self._config, path=self._socket, **kwargs)
+
+    def assertAnalysisEqual(self, served, local):  # pylint: disable=invalid-name
+        """Assert analyses `served` and `local` are equal as JSON"""
+        for name in ('result', 'reason', 'timestamp', 'duration', 'analysis'):
+            self.assertEqual(
+                json.dumps(getattr(served, name), cls=JsonEncoder),
+                json.dumps(getattr(local, name), cls=JsonEncoder),
+                name,
+            )
+
+    def test_in_process(self):
+        """Test vse_sync_pp.service.analyze analyzes in-process when no service is listening"""
+        analysis = self._analyze('ts2phc/time-error')
+        self.assertFalse(analysis.result)
+        self.assertEqual(analysis.reason, 'loss of lock')
+        self.assertEqual(set(analysis.analysis), {'terror'})
+
+    def test_served(self):
+        """Test analyses served are those analyzed in-process"""
+        for analyzer in ('ts2phc/time-error', 'ts2phc/time-deviation', 'ts2phc/mtie'):
+            with self.subTest(analyzer=analyzer):
+                local = self._analyze(analyzer)
+                if self._server is None:
+                    self._serve()
+                served = self._analyze(analyzer)
+                self.assertAnalysisEqual(served, local)
+                if analyzer != 'ts2phc/time-error':
+                    for (sarray, larray) in zip(served.toarrays(), local.toarrays()):
+                        self.assertTrue(np.array_equal(sarray, larray))
+
+    def test_cached(self):
+        """Test analyzers of the same input share a dataset and repeated analyses are cached"""
+        instance = self._serve()
+        for analyzer in ('ts2phc/time-error', 'ts2phc/time-deviation', 'ts2phc/time-error'):
+            self._analyze(analyzer)
+        self.assertEqual(service.call('stats', self._socket), instance.stats())
+        self.assertEqual(instance.stats()['datasets'], {'size': 4, 'length': 1, 'hits': 2, 'misses': 1})
+        self.assertEqual(instance.stats()['analyses'], {'size': 16, 'length': 2, 'hits': 1, 'misses': 2})
+
+    def test_other_code(self):
+        """Test vse_sync_pp.service.analyze analyzes in-process if the service runs other code"""
+        instance = self._serve()
+        self.assertEqual(service.call('ping', self._socket), service.identity())
+        local = self._analyze('ts2phc/time-deviation')
+        other = dict(service.identity(), sources='0' * 64)
+        call = self._server.call
+
+        def other_call(method, params):
+            return other if method == 'ping' else call(method, params)
+        with mock.patch.object(self._server, 'call', side_effect=other_call):
+            analysis = self._analyze('ts2phc/time-deviation')
+            self.assertAnalysisEqual(analysis, local)
+            for (sarray, larray) in zip(analysis.toarrays(), local.toarrays()):
+                self.assertTrue(np.array_equal(sarray, larray))
+        self.assertEqual(instance.stats()['datasets'], {'size': 4, 'length': 1, 'hits': 0, 'misses': 1})
+
+    def test_evict(self):
+        """Test analyzers of a dataset are evicted with it"""
+        instance = self._serve(datasets=1)
+        self._analyze('ts2phc/time-error')
+        self._analyze('ts2phc/time-deviation')
+        self._input = self._write('other.log', ''.join(generate('ts2phc/time-error', 200)))
+        self._analyze('ts2phc/time-error')
+        self.assertEqual(instance.stats()['datasets'], {'size': 1, 'length': 1, 'hits': 1, 'misses': 2})
+        self.assertEqual(instance.stats()['analyses'], {'size': 16, 'length': 1, 'hits': 0, 'misses': 1})
+
+    def test_changed(self):
+        """Test an input file changed is analyzed again"""
+        self._serve()
+        self.assertFalse(self._analyze('ts2phc/time-error').result)
+        self._write('ts2phc.log', ''.join(generate('ts2phc/time-error', 200)))
+        self.assertTrue(self._analyze('ts2phc/time-error').result)
+
+    def test_brief(self):
+        """Test brief analyses omit a metric not computed for the test result, unless plotted"""
+        with mock.patch.dict(os.environ, {service.BRIEF: '1'}):
+            local = self._analyze('ts2phc/time-deviation')
+            self._serve()
+            served = self._analyze('ts2phc/time-deviation')
+        self.assertAnalysisEqual(served, local)
+        self.assertEqual(served.reason, 'loss of lock')
+        self.assertEqual(served.analysis, {})
+        self.assertIn('tdev', self._analyze('ts2phc/time-deviation', brief=False).analysis)
+        for (sarray, larray) in zip(served.toarrays(), local.toarrays()):
+            self.assertTrue(np.array_equal(sarray, larray))
+
+    def test_disk_cache(self):
+        """Test analyses in-process and served share datasets through the on-disk cache"""
+        local = self._analyze('ts2phc/time-deviation')
+        path = os.path.join(self._tmpdir.name, 'cache')
+        with mock.patch.dict(os.environ, {cache.ENVIRON: path}):
+            self.assertAnalysisEqual(self._analyze('ts2phc/time-deviation'), local)
+            self.assertEqual(len(os.listdir(path)), 2)
+            self._serve()
+            self.assertAnalysisEqual(self._analyze('ts2phc/time-deviation'), local)
+            self._analyze('ts2phc/time-error')
+            self.assertEqual(len(os.listdir(path)), 2)
+
+    def test_transitions(self):
+        """Test the transition matrix of a state analysis is served"""
+        lines = generate('phc/gm-settings', 100, states=((50, 'holdover'),))
+        self._input = self._write('pmc.log', ''.join(lines))
+        local = self._analyze('phc/gm-settings')
+        self._serve()
+        served = self._analyze('phc/gm-settings')
+        self.assertAnalysisEqual(served, local)
+        self.assertTrue(np.array_equal(served.transitions, local.transitions))
+
+    def test_error(self):
+        """Test vse_sync_pp.service.analyze raises errors in the service as in-process"""
+        missing = os.path.join(self._tmpdir.name, 'missing.log')
+        self._serve()
+        with self.assertRaises(KeyError):
+            self._analyze('ts2phc/unknown')
+        with self.assertRaises(FileNotFoundError) as context:
+            service.analyze(missing, 'ts2phc/time-error', path=self._socket)
+        self.assertEqual(context.exception.filename, missing)
+        with mock.patch.object(service.Service, 'analyze', side_effect=service.ServiceError('failed')):
+            with self.assertRaises(service.ServiceError):
+                self._analyze('ts2phc/time-error')
+
+    def test_already_serving(self):
+        """Test vse_sync_pp.service.Server does not replace a service listening at its path"""
+        self._serve()
+        with self.assertRaises(service.ServiceError):
+            service.Server(self._socket, service.Service())
+        self.assertEqual(service.call('ping', self._socket), service.identity())
@@ -0,0 +1,70 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.sketch"""
+
+from decimal import Decimal
+
+from unittest import TestCase
+
+import numpy as np
+
+from vse_sync_pp.sketch import QuantileSketch
+
+
+class TestQuantileSketch(TestCase):
+    """Test cases for vse_sync_pp.sketch.QuantileSketch"""
+    def test_empty(self):
+        """Test vse_sync_pp.sketch.QuantileSketch with no values"""
+        sketch = QuantileSketch()
+        sketch.update([float('nan')])
+        self.assertEqual(len(sketch), 0)
+        self.assertIsNone(sketch.min)
+        self.assertIsNone(sketch.std)
+        with self.assertRaises(ValueError):
+            sketch.quantile(0.5)
+
+    def test_exact(self):
+        """Test vse_sync_pp.sketch.QuantileSketch quantiles of repeated values are exact"""
+        sketch = QuantileSketch()
+        sketch.update([Decimal(-40), Decimal(-39), Decimal(-38)])
+        sketch.update([-39, 0, 0])
+        self.assertEqual(list(sketch.quantile([0, 0.2, 0.4, 0.6, 1])), [-40, -39, -39, -38, 0])
+        (values, probabilities) = sketch.cdf()
+        self.assertEqual(list(values), [-40, -39, -38, 0])
+        self.assertEqual(list(probabilities), [1 / 6, 0.5, 4 / 6, 1])
+
+    def test_accuracy(self):
+        """Test vse_sync_pp.sketch.QuantileSketch quantiles are within relative error"""
+        values = np.random.default_rng(8273).normal(0, 20, 100000)
+        sketch = QuantileSketch(alpha=0.01)
+        for chunk in np.array_split(values, 7):
+            sketch.update(chunk)
+        self.assertEqual(sketch.min, values.min())
+        self.assertEqual(sketch.max, values.max())
+        self.assertAlmostEqual(sketch.mean, values.mean())
+        self.assertAlmostEqual(sketch.std, values.std())
+        for q in (0.01, 0.5, 0.99, 0.999):
+            expect = np.quantile(values, q, method='lower')
+            self.assertLessEqual(abs(sketch.quantile(q) - expect), 0.01 * abs(expect) + 1e-3)
+
+    def test_merge(self):
+        """Test vse_sync_pp.sketch.QuantileSketch merges sketches"""
+        values = np.arange(-500.0, 500.0)
+        (lhs, rhs, both) = (QuantileSketch(), QuantileSketch(), QuantileSketch())
+        lhs.update(values[:300])
+        rhs.update(values[300:])
+        both.update(values)
+        lhs.merge(rhs)
+        self.assertEqual(len(lhs), 1000)
+        self.assertEqual(list(lhs.quantile([0.1, 0.5, 0.9])), list(both.quantile([0.1, 0.5, 0.9])))
+        self.assertAlmostEqual(lhs.std, both.std)
+
+    def test_histogram(self):
+        """Test vse_sync_pp.sketch.QuantileSketch histogram matches numpy"""
+        values = np.random.default_rng(8272).integers(-50, 50, 10000).astype(float)
+        sketch = QuantileSketch()
+        sketch.update(values)
+        (counts, bins) = sketch.histogram()
+        (expect_counts, expect_bins) = np.histogram(values, bins='scott')
+        self.assertTrue(np.allclose(bins, expect_bins))
+        self.assertEqual(list(counts), list(expect_counts))
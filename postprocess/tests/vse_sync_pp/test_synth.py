@@ -0,0 +1,91 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.synth"""
+
+from io import StringIO
+from unittest import TestCase
+
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.source import muxed
+from vse_sync_pp.synth import (
+    FORMATS,
+    CHUNK,
+    generate,
+    merge,
+    noise_from_spec,
+)
+
+
+class TestGenerate(TestCase):
+    """Test cases for vse_sync_pp.synth.generate"""
+    def test_parsed(self):
+        """Test every line generated is accepted by the parser"""
+        for id_ in FORMATS:
+            with self.subTest(id_=id_):
+                lines = list(generate(id_, 100, rate=4, start=1000))
+                parsed = list(PARSERS[id_]().parse(lines))
+                self.assertEqual(len(parsed), 100)
+                self.assertEqual(parsed[0].timestamp, 1000)
+                self.assertEqual(parsed[-1].timestamp, 1000 + 99 / 4)
+
+    def test_deterministic(self):
+        """Test lines generated are deterministic for a seed"""
+        count = CHUNK + 10
+        lines = list(generate('ts2phc/time-error', count, seed=3))
+        self.assertEqual(len(lines), count)
+        self.assertEqual(lines, list(generate('ts2phc/time-error', count, seed=3)))
+        self.assertNotEqual(lines, list(generate('ts2phc/time-error', count, seed=4)))
+
+    def test_states(self):
+        """Test servo states change the state logged and scale the time error"""
+        lines = list(generate('dpll/time-error', 20, states=((5, 'holdover'), (10, 'locked'))))
+        parsed = list(PARSERS['dpll/time-error']().parse(lines))
+        self.assertEqual([row.state for row in parsed], [3] * 5 + [4] * 5 + [3] * 10)
+        lines = list(generate('phc/gm-settings', 3, states=((1, 'freerun'),)))
+        parsed = list(PARSERS['phc/gm-settings']().parse(lines))
+        self.assertEqual(
+            [tuple(row[1:]) for row in parsed],
+            [(6, '0x21', '0x4E5D'), (248, '0xFE', '0xFFFF'), (248, '0xFE', '0xFFFF')],
+        )
+
+    def test_gaps(self):
+        """Test samples are missing in gaps"""
+        lines = list(generate('gnss/time-error', 10, rate=2, start=0, gaps=((1, 1.5), (4, 10))))
+        parsed = list(PARSERS['gnss/time-error']().parse(lines))
+        self.assertEqual([float(row.timestamp) for row in parsed], [0, 0.5, 2.5, 3, 3.5])
+
+    def test_interface(self):
+        """Test the interface logged"""
+        lines = list(generate('ptp4l/time-error', 3, interface='ens8f0'))
+        parsed = list(PARSERS['ptp4l/time-error']().parse(lines))
+        self.assertEqual({row.interface for row in parsed}, {'ens8f0'})
+
+    def test_noise(self):
+        """Test noise models"""
+        for spec in ('white', 'white,sigma=1', 'walk,step=1,tau=10', 'sine,amplitude=100,period=60'):
+            with self.subTest(spec=spec):
+                lines = list(generate('gnss/time-error', CHUNK + 10, noise=noise_from_spec(spec)))
+                parsed = list(PARSERS['gnss/time-error']().parse(lines))
+                self.assertEqual(len(parsed), CHUNK + 10)
+        with self.assertRaises(KeyError):
+            noise_from_spec('pink')
+
+
+class TestMerge(TestCase):
+    """Test cases for vse_sync_pp.synth.merge"""
+    def test_muxed(self):
+        """Test merged multiplexed content is sequenced by timestamp"""
+        ids = ('gnss/time-error', 'dpll/time-error', 'phc/gm-settings')
+        lines = list(merge(*(
+            {'id_': id_, 'count': 10, 'rate': rate, 'muxed': True}
+            for (id_, rate) in zip(ids, (1, 2, 4))
+        )))
+        parsers = {id_: PARSERS[id_]() for id_ in ids}
+        parsed = list(muxed(StringIO(''.join(lines)), parsers))
+        self.assertEqual(len(parsed), 30)
+        self.assertEqual(
+            {id_: sum(1 for (other, _) in parsed if other == id_) for id_ in ids},
+            dict.fromkeys(ids, 10),
+        )
+        timestamps = [data.timestamp for (_, data) in parsed]
+        self.assertEqual(timestamps, sorted(timestamps))
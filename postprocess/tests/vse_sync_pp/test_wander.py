@@ -0,0 +1,144 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for vse_sync_pp.wander"""
+
+from unittest import TestCase
+
+import allantools
+import numpy as np
+from scipy import signal as scipy_signal
+
+from vse_sync_pp.analyzers.analyzer import Config
+from vse_sync_pp.analyzers.ts2phc import (
+    TimeDeviationAnalyzer,
+    MaxTimeIntervalErrorAnalyzer,
+)
+from vse_sync_pp.parsers import PARSERS
+from vse_sync_pp.synth import generate
+from vse_sync_pp.wander import (
+    averaging_factors,
+    TimeDeviation,
+    MaxTimeIntervalError,
+    LowPassFilter,
+    Wander,
+)
+
+TAUS = np.array([1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000])
+METRICS = (
+    (TimeDeviation, allantools.tdev),
+    (MaxTimeIntervalError, allantools.mtie),
+)
+
+
+def phase(count, seed=0):
+    """Return an array of `count` phase samples: white noise and random walk"""
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(size=count)) * 0.05 + rng.normal(size=count) * 2
+
+
+def filtfilt(samples):
+    """Return `samples` filtered as by the batch computation"""
+    (numerator, denominator) = scipy_signal.butter(1, 0.1 / 0.5, btype='low', output='ba')
+    return scipy_signal.filtfilt(numerator, denominator, samples)
+
+
+def chunked(estimator, samples, size):
+    """Update `estimator` with `samples` in chunks of `size`; return `estimator`"""
+    for idx in range(0, len(samples), size):
+        estimator.update(samples[idx:idx + size])
+    return estimator
+
+
+class TestEstimators(TestCase):
+    """Test cases for vse_sync_pp.wander estimators"""
+    def test_averaging_factors(self):
+        """Test vse_sync_pp.wander.averaging_factors"""
+        self.assertEqual(list(averaging_factors((0.01, 0.5, 1, 1.2, 2, 10), 2)), [1, 2, 4, 20])
+
+    def test_exact(self):
+        """Test online estimates equal batch computation on the same samples"""
+        samples = filtfilt(phase(12000))
+        for (cls, batch) in METRICS:
+            (taus, values, _, _) = batch(samples, rate=1, data_type='phase', taus=TAUS)
+            for size in (1000, 777, 12000):
+                with self.subTest(cls=cls.__name__, size=size):
+                    (otaus, ovalues) = chunked(cls(TAUS, 1), samples, size).result()
+                    self.assertTrue(np.array_equal(otaus, taus))
+                    self.assertTrue(np.allclose(ovalues, values, rtol=1e-9, atol=0))
+
+    def test_few_samples(self):
+        """Test online estimates omit taus with too few samples"""
+        samples = filtfilt(phase(40))
+        for (cls, batch) in METRICS:
+            with self.subTest(cls=cls.__name__):
+                estimator = chunked(cls(TAUS, 1), samples, 3)
+                self.assertEqual(len(estimator), 40)
+                (otaus, ovalues) = estimator.result()
+                (taus, values, _, _) = batch(samples, rate=1, data_type='phase', taus=TAUS)
+                self.assertTrue(np.array_equal(otaus, taus))
+                self.assertTrue(np.allclose(ovalues, values, rtol=1e-9, atol=0))
+        self.assertEqual(len(TimeDeviation(TAUS, 1).result()[0]), 0)
+
+    def test_memory(self):
+        """Test online estimators keep samples bounded by the largest tau"""
+        tdev = chunked(TimeDeviation((1, 10), 1), phase(1000), 100)
+        self.assertEqual(len(tdev._prefix), 31)
+        mtie = chunked(MaxTimeIntervalError((1, 10), 1), phase(1000), 100)
+        self.assertEqual(len(mtie._tail), 10)
+
+    def test_causal(self):
+        """Test online estimates of unfiltered samples are within documented tolerance"""
+        samples = phase(20000)
+        filtered = filtfilt(samples)
+        for (cls, batch, rtol) in (
+            (TimeDeviation, allantools.tdev, 0.01),
+            (MaxTimeIntervalError, allantools.mtie, 0.05),
+        ):
+            with self.subTest(cls=cls.__name__):
+                (taus, values, _, _) = batch(filtered, rate=1, data_type='phase', taus=TAUS)
+                (otaus, ovalues) = chunked(Wander(cls, TAUS, 1), samples, 1000).result()
+                self.assertTrue(np.array_equal(otaus, taus))
+                self.assertTrue(np.allclose(ovalues, values, rtol=rtol, atol=0))
+
+
+class TestLowPassFilter(TestCase):
+    """Test cases for vse_sync_pp.wander.LowPassFilter"""
+    def test_chunked(self):
+        """Test vse_sync_pp.wander.LowPassFilter keeps state between chunks"""
+        samples = phase(1000)
+        whole = LowPassFilter(1)(samples)
+        lpf = LowPassFilter(1)
+        parts = np.concatenate([lpf(samples[idx:idx + 64]) for idx in range(0, 1000, 64)])
+        self.assertTrue(np.allclose(whole, parts))
+        # steady state at the first sample
+        self.assertTrue(np.allclose(LowPassFilter(1)(np.full(10, 5.0)), 5.0))
+
+
+class TestEstimate(TestCase):
+    """Test cases for estimating analyzer metrics online"""
+    def test_estimate(self):
+        """Test analyzers use an online estimate updated with each chunk of data"""
+        config = Config(None, 'G.8272/PRTC-A', {
+            'transient-period/s': 0,
+            'min-test-duration/s': 1,
+            'time-deviation-limit/%': 100,
+            'maximum-time-interval-error-limit/%': 100,
+        })
+        rows = list(PARSERS['ts2phc/time-error']().parse(generate('ts2phc/time-error', 3000)))
+        for cls in (TimeDeviationAnalyzer, MaxTimeIntervalErrorAnalyzer):
+            with self.subTest(cls=cls.__name__):
+                running = None
+                for count in (1000, 2000, 3000):
+                    analyzer = cls(config)
+                    analyzer.collect(*rows[count - 1000:count])
+                    running = analyzer.estimate(running)
+                    self.assertEqual(len(running.wander), count)
+                    self.assertEqual(analyzer.duration, count - 1)
+                    self.assertIs(analyzer.result, True)
+                (taus, values) = analyzer.toarrays()
+                batch = cls(config)
+                batch.collect(*rows)
+                (btaus, bvalues) = batch.toarrays()
+                self.assertTrue(np.array_equal(taus, btaus))
+                rtol = 0.01 if cls is TimeDeviationAnalyzer else 0.3
+                self.assertTrue(np.allclose(values, bvalues, rtol=rtol, atol=0))
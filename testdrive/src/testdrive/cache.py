@@ -0,0 +1,112 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Cache test results"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+
+def _digest(filename, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of the content of `filename`."""
+    sha = hashlib.sha256()
+    with open(filename, "rb") as fid:
+        for chunk in iter(lambda: fid.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _plot_paths(plot):
+    """Generator yielding image paths in `plot`, the images output by a plotter."""
+    for item in plot:
+        yield item["path"] if isinstance(item, dict) else item
+
+
+class ResultCache:
+    """A cache of test results in directory `dirname`.
+
+    A result is cached against a key built from a test implementation, its
+    args and its plotter. The key changes if the content of any file colocated
+    with the test implementation (e.g. its source or config) or of any file
+    named in its args (e.g. its input data) changes. The key does not change if
+    modules imported by the test implementation change.
+    """
+
+    def __init__(self, dirname):
+        self._dirname = dirname
+        # (path, size, mtime) -> digest of files already read in this run
+        self._digests = {}
+        os.makedirs(dirname, exist_ok=True)
+
+    def _fingerprint(self, filename):
+        """Return the SHA-256 hex digest of the content of `filename`.
+
+        Files are only read once, unless their size or mtime changes.
+        """
+        stat = os.stat(filename)
+        index = (os.path.realpath(filename), stat.st_size, stat.st_mtime_ns)
+        try:
+            return self._digests[index]
+        except KeyError:
+            return self._digests.setdefault(index, _digest(filename))
+
+    def key(self, test, test_args, plotter=None, prefix=None):
+        """Return the key for results from `test` with `test_args`.
+
+        If `plotter` is supplied then the result includes images output by
+        `plotter` using `prefix`.
+        """
+        testdir = os.path.dirname(test)
+        sources = {}
+        for name in sorted(os.listdir(testdir or ".")):
+            filename = os.path.join(testdir, name)
+            if os.path.isfile(filename):
+                sources[name] = self._fingerprint(filename)
+        inputs = {}
+        for arg in test_args:
+            if isinstance(arg, str) and os.path.isfile(arg):
+                inputs[arg] = self._fingerprint(arg)
+        obj = {
+            "test": test,
+            "argv": test_args,
+            "plotter": plotter,
+            "prefix": prefix,
+            "sources": sources,
+            "inputs": inputs,
+        }
+        return hashlib.sha256(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+
+    def _filename(self, key):
+        """Return the filename of the result cached for `key`."""
+        return os.path.join(self._dirname, f"{key}.json")
+
+    def lookup(self, key):
+        """Return the result dict cached for `key`, or None if not cached.
+
+        None is also returned if any image output by a plotter for the cached
+        result no longer exists.
+        """
+        try:
+            with open(self._filename(key), encoding="utf-8") as fid:
+                result = json.load(fid)
+        except FileNotFoundError:
+            return None
+        if not all(os.path.isfile(path) for path in _plot_paths(result.get("plot", ()))):
+            return None
+        return result
+
+    def store(self, key, result):
+        """Cache result dict `result` for `key`.
+
+        The cache file is replaced atomically, so that a concurrent lookup
+        never reads a partially written result.
+        """
+        (fd, tmpname) = tempfile.mkstemp(dir=self._dirname, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fid:
+                json.dump(result, fid)
+            os.replace(tmpname, self._filename(key))
+        except BaseException:
+            os.unlink(tmpname)
+            raise
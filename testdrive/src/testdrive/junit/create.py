@@ -180,6 +180,12 @@ def junit(
         duration - test duration in seconds
         pdf_display_name - human-readable test title produced by the test run;
             when present it is used as the display name in JUnit/PDF output
+        resources - dict of resources used by the test (see testdrive.run);
+            each pair is added as a property element
+        profile - dict of stages of the test, as output by the test
+            implementation, each a dict of values recorded for the stage;
+            each value is added as a property element named
+            "profile.<stage>.<key>"
 
     If `timestamp` is supplied then `duration` must also be supplied.
 
@@ -259,6 +265,9 @@ def junit(
         # GitHub tree URL for the test case directory (PDF: clickable test identifier)
         if baseurl_ids and case.get("id"):
             properties.append(("test_directory_url", case["id"].split("?", 1)[0]))
+        properties.extend(case.get("resources", {}).items())
+        for stage, values in case.get("profile", {}).items():
+            properties.extend((f"profile.{stage}.{key}", value) for key, value in values.items())
         e_case.append(_properties(*properties))
         e_suite.append(e_case)
     e_root.append(e_suite)
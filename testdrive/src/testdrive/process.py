@@ -0,0 +1,139 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Run subprocesses with limits and resource accounting"""
+
+import os
+import resource
+import selectors
+import subprocess
+import time
+from collections import namedtuple
+from functools import partial
+
+Limits = namedtuple("Limits", ("timeout", "memory", "cpu"), defaults=(None, None, None))
+Limits.__doc__ = """Limits on a subprocess.
+
+`timeout` is the wall time in seconds after which the subprocess is killed;
+`memory` is the maximum size in bytes of its address space (RLIMIT_AS);
+`cpu` is the maximum CPU time in seconds it may use (RLIMIT_CPU).
+A value of None means no limit.
+"""
+
+
+def set_rlimits(limits):
+    """Apply the resource limits in :class:`Limits` `limits` to this process."""
+    if limits.memory is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (limits.memory, limits.memory))
+    if limits.cpu is not None:
+        resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu, limits.cpu))
+
+
+def resources(wall, user, system, maxrss):
+    """Return a dict of resources used by a process.
+
+    `wall` is the elapsed time in seconds;
+    `user` and `system` the CPU time in seconds in user and system mode;
+    `maxrss` the peak resident set size in KiB.
+    """
+    return {
+        "wall_time": round(wall, 6),
+        "user_time": round(user, 6),
+        "system_time": round(system, 6),
+        "max_rss": maxrss,
+    }
+
+
+def timeout_reason(script, timeout):
+    """Return the reason output when `script` is killed after `timeout` seconds."""
+    return f"{script} timed out after {timeout} seconds\n"
+
+
+class Process:
+    """A subprocess executing `args`, subject to :class:`Limits` `limits`.
+
+    The subprocess inherits the environment of this process. Its stdout and
+    stderr are captured. A process can be collected like a
+    :class:`subprocess.Popen`: once collected, attribute `resources` is a dict
+    of resources used by the subprocess (see :func:`resources`).
+    """
+
+    def __init__(self, args, limits=None):
+        self._limits = limits or Limits()
+        preexec_fn = None
+        if self._limits.memory is not None or self._limits.cpu is not None:
+            preexec_fn = partial(set_rlimits, self._limits)
+        self._start = time.monotonic()
+        self._proc = subprocess.Popen(  # pylint: disable=consider-using-with
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=os.environ,
+            preexec_fn=preexec_fn,  # pylint: disable=subprocess-popen-preexec-fn
+        )
+        self.args = args
+        self.returncode = None
+        self.resources = None
+
+    def _read(self):
+        """Read stdout and stderr until closed, or until the timeout expires.
+
+        Return a tuple (stdout, stderr, timedout).
+        """
+        output = {self._proc.stdout: [], self._proc.stderr: []}
+        deadline = None
+        if self._limits.timeout is not None:
+            deadline = self._start + self._limits.timeout
+        timedout = False
+        with selectors.DefaultSelector() as selector:
+            for fid in output:
+                selector.register(fid, selectors.EVENT_READ)
+            while selector.get_map():
+                wait = None
+                if deadline is not None:
+                    wait = deadline - time.monotonic()
+                    if wait <= 0:
+                        timedout = True
+                        break
+                for (key, _) in selector.select(wait):
+                    data = os.read(key.fd, 1 << 16)
+                    if data:
+                        output[key.fileobj].append(data)
+                    else:
+                        selector.unregister(key.fileobj)
+        # do not wait for any descendants of a killed subprocess to close
+        for fid in output:
+            fid.close()
+        return (b"".join(output[self._proc.stdout]), b"".join(output[self._proc.stderr]), timedout)
+
+    def _wait(self):
+        """Wait for the subprocess to exit; record its exit code and resources."""
+        (_, status, rusage) = os.wait4(self._proc.pid, 0)
+        # the subprocess is reaped: stop Popen from waiting for it again
+        self._proc.returncode = self.returncode = os.waitstatus_to_exitcode(status)
+        self.resources = resources(
+            time.monotonic() - self._start,
+            rusage.ru_utime,
+            rusage.ru_stime,
+            rusage.ru_maxrss,
+        )
+
+    def communicate(self):
+        """Wait for the subprocess to exit and return a tuple (stdout, stderr).
+
+        If the timeout expires then the subprocess is killed and a reason is
+        appended to stderr. If the subprocess was already collected, then its
+        output is empty.
+        """
+        if self.returncode is not None:
+            return (b"", b"")
+        (stdout, stderr, timedout) = self._read()
+        if timedout:
+            self._proc.kill()
+            stderr += timeout_reason(self.args[0], self._limits.timeout).encode()
+        self._wait()
+        return (stdout, stderr)
+
+    def kill(self):
+        """Kill the subprocess, if not collected."""
+        if self.returncode is None:
+            self._proc.kill()
@@ -7,31 +7,57 @@ from argparse import ArgumentParser
 import sys
 import os
 import subprocess
+from contextlib import ExitStack
 from datetime import datetime, timezone
 
+from .cache import ResultCache
 from .common import open_input, print_line
+from .process import Limits, Process
 from .source import Source, sequence
 from .uri import UriBuilder
+from .worker import WorkerPool, accepts
 
 
-def drive(test, *test_args):
-    """Execute `test` and return a result dict.
+def spawn(*args, pool=None, limits=None):
+    """Start a subprocess executing `args` and return a :class:`Process`.
 
-    If `test` exits with error or outputs to stderr, then the result dict
-    will contain string 'error' at key 'result' and a string at key 'reason'.
+    The subprocess inherits the environment of this process. Its stdout and
+    stderr are captured, to be collected by :func:`complete`. The subprocess is
+    subject to :class:`Limits` `limits`, if supplied.
 
-    Otherwise the result dict contains whatever `test` outputs to stdout. This
-    output is always expected to be a JSON object with pairs for 'result',
-    'reason' and other pairs appropriate for `test`.
+    If `pool` is a :class:`WorkerPool` and a worker accepts the script
+    `args[0]`, then submit `args` to `pool` and return the job instead of a
+    subprocess.
+    """
+    limits = limits or Limits()
+    if pool is not None and accepts(args[0]):
+        return pool.submit(*args, limits=limits)
+    return Process(args, limits)
 
-    The result dict always contains `test_args` at key 'argv'.
+
+def complete(proc):
+    """Wait for subprocess `proc` to exit and return a :class:`subprocess.CompletedProcess`.
+
+    The completed process has an additional attribute `resources`, a dict of
+    the resources used by `proc` or None if these are not known.
+    """
+    (stdout, stderr) = proc.communicate()
+    subp = subprocess.CompletedProcess(proc.args, proc.returncode, stdout, stderr)
+    subp.resources = proc.resources
+    return subp
+
+
+def cancel(proc):
+    """Kill subprocess `proc`, if it is still running, and discard its output."""
+    proc.kill()
+    proc.communicate()
+
+
+def drive_result(test, test_args, subp):
+    """Return a result dict for `test` from completed subprocess `subp`.
+
+    See :func:`drive` for the content of the result dict.
     """
-    subp = subprocess.run(
-        (test,) + test_args,
-        capture_output=True,
-        check=False,
-        env=os.environ,
-    )
     if not subp.returncode and not subp.stderr:
         dct = json.loads(subp.stdout)
     else:
@@ -39,11 +65,39 @@ def drive(test, *test_args):
         if subp.stderr:
             reason += "\n\n"
             reason += subp.stderr.decode()
-            dct = {"result": "error", "reason": reason}
+        dct = {"result": "error", "reason": reason}
     dct["argv"] = test_args
     return dct
 
 
+def drive(test, *test_args):
+    """Execute `test` and return a result dict.
+
+    If `test` exits with error or outputs to stderr, then the result dict
+    will contain string 'error' at key 'result' and a string at key 'reason'.
+
+    Otherwise the result dict contains whatever `test` outputs to stdout. This
+    output is always expected to be a JSON object with pairs for 'result',
+    'reason' and other pairs appropriate for `test`.
+
+    The result dict always contains `test_args` at key 'argv'.
+    """
+    return drive_result(test, test_args, complete(spawn(test, *test_args)))
+
+
+def plot_result(plotter, subp):
+    """Return a sequence of images output by `plotter` from completed subprocess `subp`.
+
+    See :func:`plot` for the content of the sequence and errors raised.
+    """
+    if not subp.returncode and not subp.stderr:
+        return json.loads(subp.stdout)
+    reason = f"{plotter} exited with code {subp.returncode}:"
+    reason += "\n\n"
+    reason += subp.stderr.decode()
+    raise RuntimeError(reason)
+
+
 def plot(plotter, prefix, *test_args):
     """Execute `plotter` and return a sequence of images output.
 
@@ -56,18 +110,57 @@ def plot(plotter, prefix, *test_args):
     image output by `plotter` is expected to use `prefix` as the path and stem
     for the output filename.
     """
-    subp = subprocess.run(
-        (plotter, prefix) + test_args,
-        capture_output=True,
-        check=False,
-        env=os.environ,
-    )
-    if not subp.returncode and not subp.stderr:
-        return json.loads(subp.stdout)
-    reason = f"{plotter} exited with code {subp.returncode}:"
-    reason += "\n\n"
-    reason += subp.stderr.decode()
-    raise RuntimeError(reason)
+    return plot_result(plotter, complete(spawn(plotter, prefix, *test_args)))
+
+
+def run_test(
+    test,
+    test_args,
+    plotter=None,
+    prefix=None,
+    pool=None,
+    sequential=False,
+    limits=None,
+):  # pylint: disable=too-many-arguments
+    """Execute `test` and, optionally, `plotter` and return a result dict.
+
+    The result dict is as returned by :func:`drive`. If `test` does not output
+    a timestamp and duration, then the result dict contains the timestamp when
+    `test` was started and the time taken to execute it. If known, the result
+    dict contains the resources used by `test` at key 'resources': a dict with
+    the wall time, user and system CPU time (in seconds) and peak resident set
+    size (in KiB) at keys 'wall_time', 'user_time', 'system_time', 'max_rss'.
+
+    If `plotter` is supplied and `test` returns a boolean result, then the
+    result dict also contains the sequence of images output by `plotter` using
+    `prefix` at key 'plot' (see :func:`plot`). `plotter` is executed
+    concurrently with `test` unless `sequential` is truthy.
+
+    Python scripts are submitted to worker `pool`, if supplied (see
+    :func:`spawn`). Both `test` and `plotter` are subject to :class:`Limits`
+    `limits`, if supplied.
+    """
+    start = timenow()
+    testproc = spawn(test, *test_args, pool=pool, limits=limits)
+    plotproc = None
+    if plotter is not None and not sequential:
+        # plot concurrently, discarding the plot if there is no result
+        plotproc = spawn(plotter, prefix, *test_args, pool=pool, limits=limits)
+    testsubp = complete(testproc)
+    result = drive_result(test, test_args, testsubp)
+    end = timenow()
+    if "timestamp" not in result:
+        result["timestamp"] = timestamp(start)
+        result["duration"] = (end - start).total_seconds()
+    if testsubp.resources is not None:
+        result["resources"] = testsubp.resources
+    if result["result"] in (True, False) and plotter is not None:
+        if plotproc is None:
+            plotproc = spawn(plotter, prefix, *test_args, pool=pool, limits=limits)
+        result["plot"] = plot_result(plotter, complete(plotproc))
+    elif plotproc is not None:
+        cancel(plotproc)
+    return result
 
 
 def timenow():
@@ -119,6 +212,105 @@ def main():
             )
         ),
     )
+    aparser.add_argument(
+        "--sequential",
+        action="store_true",
+        help=" ".join(
+            (
+                "Call the plotter only after the test implementation has exited",
+                "and returned a result, rather than concurrently with it.",
+                "Ignored if plots are not generated.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--inprocess",
+        action="store_true",
+        help=" ".join(
+            (
+                "Run Python test implementations and plotters (scripts named *.py)",
+                "in long-lived worker processes, rather than each in a new process,",
+                "so that modules imported by one script are not imported again.",
+                "Other scripts are always run in a new process.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--fork",
+        action="store_true",
+        help=" ".join(
+            (
+                "With --inprocess, run each script in a new process forked from",
+                "a worker process, isolating scripts from each other.",
+                "Only modules imported by --preload are then shared.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help=" ".join(
+            (
+                "With --inprocess, import MODULE in each worker process",
+                "when it is started. May be repeated.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help=" ".join(
+            (
+                "Kill a test implementation or plotter still running after",
+                "this many seconds. A killed test implementation has an error result.",
+                "If not supplied then there is no timeout.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--rlimit-as",
+        type=int,
+        metavar="BYTES",
+        help=" ".join(
+            (
+                "Limit the address space of each test implementation and plotter",
+                "to this many bytes (RLIMIT_AS).",
+                "Not applied to scripts run with --inprocess but without --fork.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--rlimit-cpu",
+        type=int,
+        metavar="SECONDS",
+        help=" ".join(
+            (
+                "Limit the CPU time of each test implementation and plotter",
+                "to this many seconds (RLIMIT_CPU).",
+                "Not applied to scripts run with --inprocess but without --fork.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--cachedir",
+        help=" ".join(
+            (
+                "The directory in which to cache test results.",
+                "A test is not run if a result is cached for the same test",
+                "implementation, plotter, args, colocated files (e.g. config)",
+                "and content of files named in args (e.g. input data).",
+                "If not supplied then results are not cached.",
+            )
+        ),
+    )
+    aparser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run all tests, ignoring results already in `--cachedir`.",
+    )
     aparser.add_argument(
         "baseurl",
         help="The base URL which test ids are relative to.",
@@ -138,29 +330,44 @@ def main():
     args = aparser.parse_args()
     basedir = args.basedir or os.path.dirname(args.input)
     builder = UriBuilder(args.baseurl)
-    with open_input(args.input) as fid:
+    limits = Limits(args.timeout, args.rlimit_as, args.rlimit_cpu)
+    with ExitStack() as stack:
+        fid = stack.enter_context(open_input(args.input))
+        cache = ResultCache(args.cachedir) if args.cachedir else None
+        pool = None
+        if args.inprocess:
+            # one worker each for a test and its concurrent plotter
+            pool = stack.enter_context(WorkerPool(2, args.fork, args.preload))
         source = Source(sequence(json.loads(line) for line in fid))
         for test, *test_args in source.next():
             url_kwargs = {}
-            if isinstance(test_args[-1], dict):
+            if test_args and isinstance(test_args[-1], dict):
                 url_kwargs = test_args.pop()
             id_ = builder.build(os.path.dirname(test), **url_kwargs)
             testimpl = os.path.join(basedir, test)
-            start = timenow()
-            result = drive(testimpl, *test_args)
-            end = timenow()
-            result["id"] = id_
-            if "timestamp" not in result:
-                result["timestamp"] = timestamp(start)
-                result["duration"] = (end - start).total_seconds()
-            if result["result"] in (True, False) and args.imagedir:
+            plotter = prefix = None
+            if args.imagedir:
                 plotter = os.path.join(os.path.dirname(testimpl), args.plotter)
-                if os.path.isfile(plotter):
-                    prefix = os.path.join(
-                        args.imagedir,
-                        os.path.splitext(test)[0].strip("/").replace("/", "_"),
-                    )
-                    result["plot"] = plot(plotter, prefix, *test_args)
+                if not os.path.isfile(plotter):
+                    plotter = None
+            if plotter is not None:
+                prefix = os.path.join(
+                    args.imagedir,
+                    os.path.splitext(test)[0].strip("/").replace("/", "_"),
+                )
+            key = None
+            if cache is not None:
+                key = cache.key(testimpl, test_args, plotter, prefix)
+            result = None
+            if key is not None and not args.force:
+                result = cache.lookup(key)
+            if result is None:
+                result = run_test(
+                    testimpl, test_args, plotter, prefix, pool, args.sequential, limits,
+                )
+                if key is not None and result["result"] in (True, False):
+                    cache.store(key, result)
+            result["id"] = id_
             # Python exits with error code 1 on EPIPE
             if not print_line(json.dumps(result)):
                 sys.exit(1)
@@ -0,0 +1,471 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Run Python scripts in long-lived worker processes"""
+
+import importlib
+import io
+import json
+import os
+import resource
+import runpy
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import warnings
+from argparse import ArgumentParser
+from contextlib import redirect_stderr, redirect_stdout
+
+from .process import Limits, resources, set_rlimits, timeout_reason
+
+
+def accepts(script):
+    """Return True if `script` can be run by a worker, False otherwise.
+
+    A worker can only run Python scripts, identified by extension '.py'.
+    """
+    return script.endswith(".py")
+
+
+def _exit_code(code):
+    """Return the process exit code for :class:`SystemExit` `code`.
+
+    Print `code` to stderr if it is neither None nor an integer, as the
+    interpreter does on exit.
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _unload(dirname):
+    """Remove modules imported from directory `dirname` from `sys.modules`.
+
+    Scripts in different directories may import sibling modules of the same
+    name (e.g. 'testimpl'): these must not be shared between scripts.
+    """
+    for (name, module) in tuple(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename and os.path.dirname(os.path.realpath(filename)) == dirname:
+            del sys.modules[name]
+
+
+def run_script(argv):
+    """Run the Python script `argv[0]` in this process, with args `argv[1:]`.
+
+    The script is run as module '__main__', as if by the interpreter, with its
+    stdin empty and its stdout and stderr captured. Return a 3-tuple
+    (returncode, stdout, stderr) where `returncode` is the exit code the
+    interpreter would have exited with and `stdout`, `stderr` are strings.
+    """
+    script = argv[0]
+    # the interpreter resolves symbolic links when adding the script directory
+    dirname = os.path.dirname(os.path.realpath(script))
+    (saved_argv, saved_path, saved_stdin) = (sys.argv, sys.path[:], sys.stdin)
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    returncode = 0
+    sys.argv = list(argv)
+    sys.path.insert(0, dirname)
+    sys.stdin = io.StringIO()
+    try:
+        # entering catch_warnings() forgets warnings already shown, so that a
+        # script outputs the same warnings as it would in a new interpreter
+        with warnings.catch_warnings(), redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                runpy.run_path(script, run_name="__main__")
+            except SystemExit as exc:
+                returncode = _exit_code(exc.code)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # omit frames from this module and runpy, as the interpreter would
+                tback = exc.__traceback__
+                while tback is not None and tback.tb_frame.f_code.co_filename != script:
+                    tback = tback.tb_next
+                traceback.print_exception(type(exc), exc, tback)
+                returncode = 1
+    finally:
+        (sys.argv, sys.path[:], sys.stdin) = (saved_argv, saved_path, saved_stdin)
+        _unload(dirname)
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            pyplot.close("all")
+    return (returncode, stdout.getvalue(), stderr.getvalue())
+
+
+def run_captured(argv):
+    """Run the Python script `argv[0]` as :func:`run_script`, also capturing file descriptors.
+
+    Output written directly to file descriptors 1 and 2 (e.g. by extension
+    modules or subprocesses) is appended to the stdout and stderr returned, as
+    a new process would have output it. File descriptors 1 and 2 of this
+    process are replaced: call only in a child process.
+    """
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        (returncode, stdout, stderr) = run_script(argv)
+        outputs = []
+        for fid in (out, err):
+            fid.seek(0)
+            outputs.append(fid.read().decode(errors="replace"))
+    return (returncode, stdout + outputs[0], stderr + outputs[1])
+
+
+def _reply(returncode, stdout, stderr):
+    """Return a reply dict for a script run."""
+    return {"returncode": returncode, "stdout": stdout, "stderr": stderr}
+
+
+def run_inprocess(argv):
+    """Run the Python script `argv[0]` in this process.
+
+    Return a reply dict with the output of :func:`run_script` and, at key
+    'resources', the resources used (see :func:`testdrive.process.resources`).
+    The peak resident set size is that of this process, not just the script.
+    """
+    start = time.monotonic()
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    reply = _reply(*run_script(argv))
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    reply["resources"] = resources(
+        time.monotonic() - start,
+        after.ru_utime - before.ru_utime,
+        after.ru_stime - before.ru_stime,
+        after.ru_maxrss,
+    )
+    return reply
+
+
+def run_forked(argv, replies, limits=Limits()):
+    """Run the Python script `argv[0]` in a child process forked from this one.
+
+    Write a line to file object `replies` with the child's process id, as a
+    JSON-encoded object with a pair for 'pid', then wait for the child to exit.
+    Return a reply dict with the output of :func:`run_captured` in the child. If
+    the child exits without output (e.g. it is killed), then return a reply
+    dict with its exit code and a reason in 'stderr'. The reply dict contains
+    the resources used by the child at key 'resources'.
+
+    The resource limits in :class:`Limits` `limits` are applied to the child.
+    """
+    (rfd, wfd) = os.pipe()
+    start = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        # child: never return to the caller
+        try:
+            os.close(rfd)
+            set_rlimits(limits)
+            with os.fdopen(wfd, "w", encoding="utf-8") as fid:
+                json.dump(_reply(*run_captured(argv)), fid)
+        finally:
+            os._exit(0)  # pylint: disable=protected-access
+    os.close(wfd)
+    print(json.dumps({"pid": pid}), file=replies, flush=True)
+    with os.fdopen(rfd, encoding="utf-8") as fid:
+        output = fid.read()
+    (_, status, rusage) = os.wait4(pid, 0)
+    if output:
+        reply = json.loads(output)
+    else:
+        returncode = os.waitstatus_to_exitcode(status)
+        reply = _reply(returncode, "", f"{argv[0]} exited with code {returncode}\n")
+    reply["resources"] = resources(
+        time.monotonic() - start,
+        rusage.ru_utime,
+        rusage.ru_stime,
+        rusage.ru_maxrss,
+    )
+    return reply
+
+
+def serve(requests, replies, fork=False):
+    """Run scripts for `requests`, writing results to `replies`.
+
+    Each line read from file object `requests` is a JSON-encoded object with a
+    pair for 'argv', the script to run followed by its args, and optionally a
+    pair for 'limits', an object with pairs for fields of :class:`Limits`. For
+    each request line a line is written to file object `replies`: a
+    JSON-encoded object with pairs for 'returncode', 'stdout' and 'stderr' (see
+    :func:`run_script`) and 'resources'.
+
+    If `fork` is truthy, then each script is run in a child process forked
+    from this one (see :func:`run_forked`), subject to the resource limits
+    requested. Otherwise scripts are run in this process (see
+    :func:`run_inprocess`) and resource limits are not applied. Timeouts are
+    applied by the client, by killing the child process or the worker.
+    """
+    for line in requests:
+        request = json.loads(line)
+        argv = request["argv"]
+        if fork:
+            reply = run_forked(argv, replies, Limits(**request.get("limits", {})))
+        else:
+            reply = run_inprocess(argv)
+        print(json.dumps(reply), file=replies, flush=True)
+
+
+def _environ():
+    """Return the environment for a worker process.
+
+    This is the environment of this process, with the directory containing
+    this package prepended to PYTHONPATH so that the worker can import it.
+    """
+    env = dict(os.environ)
+    pkgdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (pkgdir, env.get("PYTHONPATH")) if path
+    )
+    return env
+
+
+class Job:
+    """A script submitted to a :class:`Worker`, subject to `timeout`.
+
+    A job can be collected like a :class:`testdrive.process.Process`.
+    """
+
+    def __init__(self, worker, args, pid=None, release=None, timeout=None):  # pylint: disable=too-many-arguments
+        self._worker = worker
+        self._pid = pid
+        self._release = release
+        self._deadline = None
+        if timeout is not None:
+            self._deadline = time.monotonic() + timeout
+        self._timeout = timeout
+        self.args = args
+        self.returncode = None
+        self.resources = None
+
+    def _done(self, returncode):
+        """Record this job finished with `returncode`; release its worker."""
+        self.returncode = returncode
+        if self._release is not None:
+            self._release(self._worker)
+
+    def communicate(self):
+        """Wait for this job to finish and return a tuple (stdout, stderr).
+
+        If the timeout expires then this job is killed and its stderr is a
+        reason. If this job was killed then its output is empty.
+        """
+        if self.returncode is not None:
+            return (b"", b"")
+        reply = self._worker.reply(self._deadline)
+        if reply is None:
+            self.kill()
+            return (b"", timeout_reason(self.args[0], self._timeout).encode())
+        self.resources = reply.get("resources")
+        self._done(reply["returncode"])
+        return (reply["stdout"].encode(), reply["stderr"].encode())
+
+    def kill(self):
+        """Kill this job, if not finished.
+
+        If this job is running in a forked child process, then only the child
+        is killed: otherwise the worker running this job is also killed.
+        """
+        if self.returncode is None:
+            if self._pid is None:
+                self._worker.kill()
+            else:
+                try:
+                    os.kill(self._pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.resources = self._worker.reply().get("resources")
+            self._done(-signal.SIGKILL)
+
+
+class Worker:
+    """A long-lived Python process running scripts one at a time.
+
+    The worker process is started on first use and restarted if it exits.
+    Modules imported by a script remain imported in the worker process (except
+    those colocated with the script), so later scripts do not import them again.
+
+    If `fork` is truthy, then the worker process runs each script in a child
+    process forked from it: scripts are isolated from each other, but only
+    modules in `preload` (imported by the worker process when it starts) are
+    shared. Resource limits are only applied to scripts run in a child process.
+    """
+
+    def __init__(self, fork=False, preload=()):
+        self._fork = fork
+        self._preload = tuple(preload)
+        self._proc = None
+        # bytes read from the worker process not yet returned in a line
+        self._buffer = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self):
+        """Start the worker process, if not running."""
+        if self._proc is None or self._proc.poll() is not None:
+            args = [sys.executable, "-m", __name__]
+            if self._fork:
+                args.append("--fork")
+            for name in self._preload:
+                args += ["--preload", name]
+            # unbuffered, so that a reply can be waited for with a deadline
+            self._proc = subprocess.Popen(
+                args,
+                bufsize=0,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                env=_environ(),
+            )
+            self._buffer = b""
+
+    def _readline(self, deadline=None):
+        """Return a line read from the worker process, or None at `deadline`.
+
+        `deadline` is a value of :func:`time.monotonic`, or None to wait
+        indefinitely. An empty line is returned if the worker process exits.
+        """
+        fileno = self._proc.stdout.fileno()
+        while b"\n" not in self._buffer:
+            if deadline is not None:
+                wait = deadline - time.monotonic()
+                if wait <= 0 or not select.select((fileno,), (), (), wait)[0]:
+                    return None
+            data = os.read(fileno, 1 << 16)
+            if not data:
+                (line, self._buffer) = (self._buffer, b"")
+                return line
+            self._buffer += data
+        (line, self._buffer) = self._buffer.split(b"\n", 1)
+        return line + b"\n"
+
+    def submit(self, *args, release=None, limits=Limits()):
+        """Submit the script `args[0]` with args `args[1:]`; return a :class:`Job`.
+
+        If `release` is supplied, then call `release` with this worker when
+        the job has finished. The job is subject to :class:`Limits` `limits`.
+        """
+        self.start()
+        request = json.dumps({"argv": args, "limits": limits._asdict()}) + "\n"
+        self._proc.stdin.write(request.encode())
+        self._proc.stdin.flush()
+        pid = None
+        if self._fork:
+            line = self._readline()
+            if line:
+                pid = json.loads(line)["pid"]
+        return Job(self, args, pid, release, limits.timeout)
+
+    def reply(self, deadline=None):
+        """Return the reply dict for the job submitted last.
+
+        If the worker process exits without replying, then return a reply dict
+        with its exit code and a reason in 'stderr'. If `deadline` (a value of
+        :func:`time.monotonic`) passes without a reply, then return None.
+        """
+        line = self._readline(deadline)
+        if line is None:
+            return None
+        if line:
+            return json.loads(line)
+        returncode = self._proc.wait()
+        return _reply(returncode or 1, "", f"worker exited with code {returncode}\n")
+
+    def kill(self):
+        """Kill the worker process, if running."""
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc.stdin.close()
+            self._proc.stdout.close()
+            self._proc = None
+
+    def close(self):
+        """Stop the worker process, if running."""
+        if self._proc is not None:
+            self._proc.stdin.close()
+            self._proc.wait()
+            self._proc.stdout.close()
+            self._proc = None
+
+
+class WorkerPool:
+    """A pool of `size` :class:`Worker` instances, started when created.
+
+    Scripts are submitted to an idle worker. If there is no idle worker then
+    another is added to the pool. Args `fork` and `preload` are as for
+    :class:`Worker`.
+    """
+
+    def __init__(self, size, fork=False, preload=()):
+        self._fork = fork
+        self._preload = tuple(preload)
+        self._workers = [Worker(fork, preload) for _ in range(size)]
+        self._idle = list(self._workers)
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, *args, limits=Limits()):
+        """Submit the script `args[0]` with args `args[1:]`; return a :class:`Job`.
+
+        The job is subject to :class:`Limits` `limits` (see :class:`Worker`).
+        """
+        if self._idle:
+            worker = self._idle.pop(0)
+        else:
+            worker = Worker(self._fork, self._preload)
+            self._workers.append(worker)
+        return worker.submit(*args, release=self._idle.append, limits=limits)
+
+    def close(self):
+        """Stop all worker processes."""
+        for worker in self._workers:
+            worker.close()
+
+
+def main():
+    """Serve requests on stdin, writing replies to stdout.
+
+    Scripts are run with stdin and stdout detached from the request and reply
+    streams, so that output by scripts cannot corrupt replies.
+    """
+    aparser = ArgumentParser(description=main.__doc__)
+    aparser.add_argument(
+        "--fork",
+        action="store_true",
+        help="Run each script in a child process forked from this process.",
+    )
+    aparser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="Import MODULE before serving requests. May be repeated.",
+    )
+    args = aparser.parse_args()
+    for name in args.preload:
+        importlib.import_module(name)
+    requests = os.fdopen(os.dup(0), encoding="utf-8")
+    replies = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    with open(os.devnull, encoding="utf-8") as devnull:
+        os.dup2(devnull.fileno(), 0)
+    os.dup2(2, 1)
+    serve(requests, replies, args.fork)
+
+
+if __name__ == "__main__":
+    main()
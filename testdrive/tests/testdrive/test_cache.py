@@ -0,0 +1,68 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for testdrive.cache"""
+
+import os.path
+from tempfile import TemporaryDirectory
+
+from unittest import TestCase
+
+from testdrive.cache import ResultCache
+
+
+def _write(filename, text):
+    """Write `text` to `filename`."""
+    with open(filename, "w", encoding="utf-8") as fid:
+        fid.write(text)
+
+
+class TestResultCache(TestCase):
+    """Tests for testdrive.cache.ResultCache"""
+
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        tmpdir = self._tmpdir.name
+        os.mkdir(os.path.join(tmpdir, "test"))
+        self.test = os.path.join(tmpdir, "test", "testimpl.py")
+        self.config = os.path.join(tmpdir, "test", "config.yaml")
+        self.input = os.path.join(tmpdir, "input.log")
+        _write(self.test, "print('{}')\n")
+        _write(self.config, "foo: 1\n")
+        _write(self.input, "bar\n")
+        self.cache = ResultCache(os.path.join(tmpdir, "cache"))
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_key(self):
+        """Test testdrive.cache.ResultCache.key changes with test content"""
+        key = self.cache.key(self.test, [self.input, "baz"])
+        self.assertEqual(key, self.cache.key(self.test, [self.input, "baz"]))
+        self.assertNotEqual(key, self.cache.key(self.test, [self.input, "quux"]))
+        self.assertNotEqual(key, self.cache.key(self.test, [self.input, "baz"], "plot.py", "foo"))
+        _write(self.input, "corge\n")
+        self.assertNotEqual(key, self.cache.key(self.test, [self.input, "baz"]))
+        key = self.cache.key(self.test, [self.input, "baz"])
+        _write(self.config, "foo: 2\n")
+        self.assertNotEqual(key, self.cache.key(self.test, [self.input, "baz"]))
+
+    def test_lookup(self):
+        """Test testdrive.cache.ResultCache.lookup returns stored results"""
+        key = self.cache.key(self.test, [self.input])
+        self.assertIsNone(self.cache.lookup(key))
+        result = {"result": True, "reason": None, "argv": [self.input]}
+        self.cache.store(key, result)
+        self.assertEqual(self.cache.lookup(key), result)
+        # a new cache in the same directory finds the same result
+        cache = ResultCache(os.path.dirname(self.cache._filename(key)))  # pylint: disable=protected-access
+        self.assertEqual(cache.lookup(cache.key(self.test, [self.input])), result)
+
+    def test_lookup_plot(self):
+        """Test testdrive.cache.ResultCache.lookup checks plot images exist"""
+        key = self.cache.key(self.test, [self.input])
+        image = os.path.join(os.path.dirname(self.input), "image.png")
+        result = {"result": False, "reason": "foo", "plot": [{"path": image}]}
+        self.cache.store(key, result)
+        self.assertIsNone(self.cache.lookup(key))
+        _write(image, "")
+        self.assertEqual(self.cache.lookup(key), result)
@@ -6,7 +6,15 @@ import os.path
 
 from unittest import TestCase
 
-from testdrive.run import drive
+from testdrive.run import (
+    drive,
+    plot,
+    spawn,
+    complete,
+    cancel,
+    run_test,
+)
+from testdrive.process import Limits
 
 EXAMPLES = os.path.join(
     os.path.dirname(__file__),
@@ -44,3 +52,75 @@ class TestDrive(TestCase):
                 "reason": f"{test} exited with code 7\n\nfoo\nbaz\n",
             },
         )
+
+
+class TestPlot(TestCase):
+    """Tests for testdrive.run.plot"""
+
+    def test_success(self):
+        """Test testdrive.run.plot with plotter success"""
+        plotter = os.path.join(EXAMPLES, "sequence/B/plot.sh")
+        self.assertEqual(
+            plot(plotter, "foo/bar"),
+            [{"path": "foo/bar.png", "title": "foo bar baz"}],
+        )
+
+    def test_error(self):
+        """Test testdrive.run.plot with plotter error"""
+        plotter = os.path.join(EXAMPLES, "terror.sh")
+        with self.assertRaises(RuntimeError) as ctx:
+            plot(plotter, "foo/bar")
+        self.assertEqual(
+            str(ctx.exception),
+            f"{plotter} exited with code 7:\n\nfoo\nbaz\n",
+        )
+
+
+class TestSpawn(TestCase):
+    """Tests for testdrive.run.spawn"""
+
+    def test_concurrent(self):
+        """Test testdrive.run.spawn runs subprocesses concurrently"""
+        test = os.path.join(EXAMPLES, "sequence/C/test.sh")
+        plotter = os.path.join(EXAMPLES, "sequence/B/plot.sh")
+        testproc = spawn(test)
+        plotproc = spawn(plotter, "baz")
+        self.assertEqual(complete(plotproc).stdout, b'[{"path": "baz.png", "title": "foo bar baz"}]')
+        self.assertEqual(complete(testproc).returncode, 0)
+
+    def test_cancel(self):
+        """Test testdrive.run.cancel kills a running subprocess"""
+        proc = spawn("sleep", "60")
+        cancel(proc)
+        self.assertIsNotNone(proc.returncode)
+
+
+class TestRunTest(TestCase):
+    """Tests for testdrive.run.run_test"""
+
+    def test_resources(self):
+        """Test testdrive.run.run_test records resources used"""
+        test = os.path.join(EXAMPLES, "sequence/B/testimpl.py")
+        result = run_test(test, [])
+        self.assertIs(result["result"], True)
+        self.assertEqual(
+            set(result["resources"]),
+            {"wall_time", "user_time", "system_time", "max_rss"},
+        )
+        self.assertGreater(result["resources"]["max_rss"], 0)
+
+    def test_timeout(self):
+        """Test testdrive.run.run_test kills a test after timeout"""
+        result = run_test("sleep", ["60"], limits=Limits(timeout=0.5))
+        self.assertEqual(result["result"], "error")
+        self.assertEqual(
+            result["reason"],
+            "sleep exited with code -9\n\nsleep timed out after 0.5 seconds\n",
+        )
+        self.assertLess(result["resources"]["wall_time"], 60)
+
+    def test_rlimit(self):
+        """Test testdrive.run.run_test applies resource limits"""
+        test = os.path.join(EXAMPLES, "sequence/B/testimpl.py")
+        result = run_test(test, [], limits=Limits(memory=1 << 20))
+        self.assertEqual(result["result"], "error")
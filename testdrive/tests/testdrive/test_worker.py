@@ -0,0 +1,167 @@
+### SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Test cases for testdrive.worker"""
+
+import os.path
+from tempfile import TemporaryDirectory
+
+from unittest import TestCase
+
+from testdrive.process import Limits
+from testdrive.run import drive_result, complete, cancel
+from testdrive.worker import accepts, run_script, Worker, WorkerPool
+
+EXAMPLES = os.path.join(
+    os.path.dirname(__file__),
+    "../../examples/",
+)
+
+
+def _script(dirname, name, text):
+    """Write a script `name` containing `text` in `dirname`; return its path."""
+    path = os.path.join(dirname, name)
+    with open(path, "w", encoding="utf-8") as fid:
+        fid.write(text)
+    return path
+
+
+class TestAccepts(TestCase):
+    """Tests for testdrive.worker.accepts"""
+
+    def test_accepts(self):
+        """Test testdrive.worker.accepts Python scripts only"""
+        self.assertTrue(accepts("foo/testimpl.py"))
+        self.assertFalse(accepts("foo/test.sh"))
+
+
+class TestRunScript(TestCase):
+    """Tests for testdrive.worker.run_script"""
+
+    def test_success(self):
+        """Test testdrive.worker.run_script with script success"""
+        test = os.path.join(EXAMPLES, "sequence/B/testimpl.py")
+        (returncode, stdout, stderr) = run_script([test])
+        self.assertEqual(returncode, 0)
+        self.assertEqual(
+            stdout,
+            '{"result": true, "reason": null, "data": {"baz": 99}}\n',
+        )
+        self.assertEqual(stderr, "")
+
+    def test_exit(self):
+        """Test testdrive.worker.run_script with script exit"""
+        with TemporaryDirectory() as tmpdir:
+            test = _script(
+                tmpdir, "exit.py",
+                "import sys\nprint(sys.argv[1:])\nsys.exit(int(sys.argv[1]))\n",
+            )
+            self.assertEqual(run_script([test, "7"]), (7, "['7']\n", ""))
+            self.assertEqual(run_script([test, "0"]), (0, "['0']\n", ""))
+
+    def test_error(self):
+        """Test testdrive.worker.run_script with script raising exception"""
+        with TemporaryDirectory() as tmpdir:
+            test = _script(tmpdir, "raise.py", "raise ValueError('foo')\n")
+            (returncode, stdout, stderr) = run_script([test])
+            self.assertEqual(returncode, 1)
+            self.assertEqual(stdout, "")
+            self.assertEqual(
+                stderr,
+                "Traceback (most recent call last):\n"
+                f'  File "{test}", line 1, in <module>\n'
+                "    raise ValueError('foo')\n"
+                "ValueError: foo\n",
+            )
+
+    def test_colocated(self):
+        """Test testdrive.worker.run_script does not share colocated modules"""
+        for value in ("foo", "bar"):
+            with TemporaryDirectory() as tmpdir:
+                _script(tmpdir, "sibling.py", f"VALUE = {value!r}\n")
+                test = _script(tmpdir, "test.py", "import sibling\nprint(sibling.VALUE)\n")
+                self.assertEqual(run_script([test]), (0, f"{value}\n", ""))
+
+
+class TestWorker(TestCase):
+    """Tests for testdrive.worker.Worker"""
+
+    def test_jobs(self):
+        """Test testdrive.worker.Worker runs jobs"""
+        with Worker() as worker:
+            for (name, result) in (("A", False), ("B", True)):
+                test = os.path.join(EXAMPLES, f"sequence/{name}/testimpl.py")
+                dct = drive_result(test, (), complete(worker.submit(test)))
+                self.assertEqual(dct["result"], result)
+
+    def test_cancel(self):
+        """Test testdrive.worker.Worker restarts after job killed"""
+        with Worker() as worker:
+            with TemporaryDirectory() as tmpdir:
+                test = _script(tmpdir, "sleep.py", "import time\ntime.sleep(60)\n")
+                job = worker.submit(test)
+                cancel(job)
+                self.assertLess(job.returncode, 0)
+            test = os.path.join(EXAMPLES, "sequence/B/testimpl.py")
+            self.assertEqual(complete(worker.submit(test)).returncode, 0)
+
+    def test_fork(self):
+        """Test testdrive.worker.Worker runs jobs in forked processes"""
+        with Worker(fork=True, preload=("json",)) as worker:
+            with TemporaryDirectory() as tmpdir:
+                test = _script(
+                    tmpdir, "crash.py",
+                    "import os, signal\nos.kill(os.getpid(), signal.SIGSEGV)\n",
+                )
+                subp = complete(worker.submit(test))
+                self.assertEqual(subp.returncode, -11)
+                self.assertEqual(subp.stderr.decode(), f"{test} exited with code -11\n")
+                test = _script(tmpdir, "sleep.py", "import time\ntime.sleep(60)\n")
+                job = worker.submit(test)
+                cancel(job)
+                self.assertLess(job.returncode, 0)
+            test = os.path.join(EXAMPLES, "sequence/B/testimpl.py")
+            self.assertEqual(complete(worker.submit(test)).returncode, 0)
+
+    def test_fork_output(self):
+        """Test testdrive.worker.Worker captures output to file descriptors of forked processes"""
+        with Worker(fork=True) as worker:
+            with TemporaryDirectory() as tmpdir:
+                test = _script(
+                    tmpdir, "output.py",
+                    "import os, sys\nprint('foo')\nprint('bar', file=sys.stderr)\n"
+                    "os.write(1, b'baz\\n')\nos.write(2, b'qux\\n')\n",
+                )
+                for _ in range(2):
+                    subp = complete(worker.submit(test))
+                    self.assertEqual(subp.returncode, 0)
+                    self.assertEqual(subp.stdout.decode(), "foo\nbaz\n")
+                    self.assertEqual(subp.stderr.decode(), "bar\nqux\n")
+
+    def test_timeout(self):
+        """Test testdrive.worker.Worker kills jobs after timeout"""
+        for fork in (False, True):
+            with Worker(fork=fork) as worker:
+                with TemporaryDirectory() as tmpdir:
+                    test = _script(tmpdir, "sleep.py", "import time\ntime.sleep(60)\n")
+                    subp = complete(worker.submit(test, limits=Limits(timeout=0.5)))
+                    self.assertLess(subp.returncode, 0)
+                    self.assertEqual(subp.stderr.decode(), f"{test} timed out after 0.5 seconds\n")
+                test = os.path.join(EXAMPLES, "sequence/B/testimpl.py")
+                subp = complete(worker.submit(test, limits=Limits(timeout=60)))
+                self.assertEqual(subp.returncode, 0)
+                self.assertGreater(subp.resources["max_rss"], 0)
+
+
+class TestWorkerPool(TestCase):
+    """Tests for testdrive.worker.WorkerPool"""
+
+    def test_concurrent(self):
+        """Test testdrive.worker.WorkerPool runs jobs concurrently"""
+        with WorkerPool(1, fork=True) as pool:
+            tests = [os.path.join(EXAMPLES, f"sequence/{name}/testimpl.py") for name in ("A", "B")]
+            jobs = [pool.submit(test) for test in tests]
+            results = [drive_result(test, (), complete(job))["result"] for (test, job) in zip(tests, jobs)]
+            self.assertEqual(results, [False, True])
+            # both workers are idle again
+            jobs = [pool.submit(test) for test in tests]
+            self.assertEqual([complete(job).returncode for job in jobs], [0, 0])
@@ -10,18 +10,17 @@ sync/G.8272/phc/state-transitions
 import sys
 from argparse import ArgumentParser
 
-from testimpl import refimpl
+from testimpl import analyze
 from vse_sync_pp.common import print_loj
 
+from vse_sync_pp.analyzers.pmc import (
+    STATES,
+    STATE_NAMES,
+    ALLOWED_TRANSITIONS,
+)
 from vse_sync_pp.heatmap import Heatmap
 
-STATE_NAMES = ["FREERUN",
-               "LOCKED",
-               "HOLDOVER_IN_SPEC",
-               "HOLDOVER_OUT_SPEC1",
-               "HOLDOVER_OUT_SPEC2",
-               "HOLDOVER_OUT_SPEC3",
-               ]
+import numpy as np
 
 
 def main():
@@ -36,30 +35,19 @@ def main():
     aparser.add_argument('input', help='input data file')
     args = aparser.parse_args()
 
+    names = [STATE_NAMES[state] for state in STATES]
     # row/column
-    unallowed_cells = [(0, 2), (0, 3), (0, 4), (0, 5),
-                       (1, 0), (1, 3), (1, 4), (1, 5),
-                       (2, 0),
-                       (3, 0), (3, 2),
-                       (4, 0), (4, 2),
-                       (5, 0), (5, 2)]
-
-    heatmap = Heatmap(STATE_NAMES, STATE_NAMES, 'PHC State Transitions',
+    unallowed_cells = np.argwhere(~ALLOWED_TRANSITIONS)
+
+    heatmap = Heatmap(names, names, 'PHC State Transitions',
                       unallowed_cells, 'State Transition Count',
                       'To', 'From')
 
-    # heatmap input - analyzer output
-    data = refimpl(args.input)
-
-    heatmap_data = []
-    clock_class_count = data['analysis']['clock_class_count']
-
-    for state in STATE_NAMES:
-        state_transitions = [transitions for transitions in clock_class_count[state]['transitions'].values()]
-        heatmap_data.append(state_transitions)
+    # heatmap input - analyzer transition matrix
+    analyzer = analyze(args.input)
 
     output = f'{args.prefix}.png'
-    heatmap.plot(heatmap_data, output)
+    heatmap.plot(analyzer.transitions, output)
     item = {
         'path': output,
         'title': "PHC State Transitions",
@@ -13,15 +13,12 @@ from os.path import join as joinpath
 from os.path import dirname
 import sys
 
-from vse_sync_pp.common import (
-    open_input,
-    print_loj,
+from vse_sync_pp.common import print_loj
+from vse_sync_pp import (
+    profiling,
+    service,
 )
 
-from vse_sync_pp.parsers.pmc import ClockClassParser
-from vse_sync_pp.analyzers.pmc import ClockStateAnalyzer
-from vse_sync_pp.analyzers.analyzer import Config
-
 import yaml
 
 CONFIG = joinpath(dirname(__file__), 'config.yaml')
@@ -33,6 +30,14 @@ def _get_display_name(config_path):
         return yaml.safe_load(fid).get('display_name', '')
 
 
+def analyze(filename, encoding='utf-8'):
+    """Return the analysis of the data in `filename`
+
+    Input `filename` accepted MUST be in canonical format.
+    """
+    return service.analyze(filename, 'phc/gm-settings', config=CONFIG, canonical=True, encoding=encoding)
+
+
 def refimpl(filename, encoding='utf-8'):
     """A reference implementation for test under:
 
@@ -41,11 +46,7 @@ def refimpl(filename, encoding='utf-8'):
     Input `filename` accepted MUST be in canonical format.
     Return a dict with test result, reason, analysis of logs in `filename`.
     """
-    parser = ClockClassParser()
-    analyzer = ClockStateAnalyzer(Config.from_yaml(CONFIG))
-    with open_input(filename, encoding=encoding) as fid:
-        for parsed in parser.canonical(fid):
-            analyzer.collect(parsed)
+    analyzer = analyze(filename, encoding)
     return {
         'result': analyzer.result,
         'reason': analyzer.reason,
@@ -63,7 +64,7 @@ def main():
     args = aparser.parse_args()
     output = refimpl(args.input)
     # Python exits with error code 1 on EPIPE
-    if not print_loj(output):
+    if not print_loj(profiling.attach(output)):
         sys.exit(1)
 
 
@@ -14,15 +14,12 @@ from argparse import ArgumentParser
 from os.path import join as joinpath
 from os.path import dirname
 
-from vse_sync_pp.common import (
-    open_input,
-    print_loj,
+from vse_sync_pp.common import print_loj
+from vse_sync_pp import (
+    profiling,
+    service,
 )
 
-from vse_sync_pp.parsers.dpll import TimeErrorParser
-from vse_sync_pp.analyzers.ppsdpll import TimeErrorAnalyzer
-from vse_sync_pp.analyzers.analyzer import Config
-
 import yaml
 
 CONFIG = joinpath(dirname(__file__), 'config.yaml')
@@ -42,11 +39,9 @@ def refimpl(filename, encoding='utf-8'):
     Input `filename` accepted MUST be in canonical format.
     Return a dict with test result, reason, timestamp, duration, and analysis of logs in `filename`.
     """
-    parser = TimeErrorParser()
-    analyzer = TimeErrorAnalyzer(Config.from_yaml(CONFIG))
-    with open_input(filename, encoding=encoding) as fid:
-        for parsed in parser.canonical(fid):
-            analyzer.collect(parsed)
+    analyzer = service.analyze(
+        filename, 'ppsdpll/time-error', config=CONFIG, canonical=True, encoding=encoding,
+    )
     return {
         'result': analyzer.result,
         'reason': analyzer.reason,
@@ -64,7 +59,7 @@ def main():
     args = aparser.parse_args()
     output = refimpl(args.input)
     # Python exits with error code 1 on EPIPE
-    if not print_loj(output):
+    if not print_loj(profiling.attach(output)):
         sys.exit(1)
 
 
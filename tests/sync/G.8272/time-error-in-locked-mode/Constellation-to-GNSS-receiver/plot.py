@@ -17,8 +17,9 @@ from vse_sync_pp.common import (
     print_loj,
 )
 
+from vse_sync_pp.columns import tabulate
 from vse_sync_pp.parsers.gnss import TimeErrorParser
-from vse_sync_pp.plot import Plotter, Axis, TIMESERIES
+from vse_sync_pp.plot import Plotter, Axis, TIMESERIES, BUCKETS
 
 
 def main():
@@ -33,10 +34,9 @@ def main():
     aparser.add_argument('input')
     args = aparser.parse_args()
     parser = TimeErrorParser()
-    plotter = Plotter(TIMESERIES, Axis("Unfiltered Time Error (ns)", parser.y_name))
     with open_input(args.input) as fid:
-        for parsed in parser.canonical(fid, relative=True):
-            plotter.append(parsed)
+        table = tabulate(parser.canonical(fid, relative=True))
+    plotter = Plotter.from_table(TIMESERIES, Axis("Unfiltered Time Error (ns)", parser.y_name), table, BUCKETS)
     output = f'{args.prefix}.png'
     plotter.plot(output)
     item = {
@@ -14,27 +14,22 @@ from argparse import ArgumentParser
 from os.path import join as joinpath
 from os.path import dirname
 
-from vse_sync_pp.common import (
-    open_input,
-    print_loj,
-)
-from collections import namedtuple
+from vse_sync_pp.common import print_loj
 
 from vse_sync_pp.plot import Plotter, Axis
 
-from vse_sync_pp.parsers.ts2phc import TimeErrorParser
-from vse_sync_pp.analyzers.ts2phc import MaxTimeIntervalErrorAnalyzer
-from vse_sync_pp.analyzers.analyzer import Config
+from vse_sync_pp import service
 
 CONFIG = joinpath(dirname(__file__), 'config.yaml')
 
 
 def plot_data(analyzer, output):
     """Plot data"""
-    plotter = Plotter(Axis("tau observation window (s)", "tau", "log"), Axis("filtered MTIE (ns)", "tdev"))
-    Parsed = namedtuple('Parsed', ('tau', 'tdev'))
-    for tau, sample in analyzer.toplot():
-        plotter.append(Parsed(tau, sample))
+    plotter = Plotter.from_arrays(
+        Axis("tau observation window (s)", "tau", "log"),
+        Axis("filtered MTIE (ns)", "tdev"),
+        *analyzer.toarrays(),
+    )
     plotter.plot_scatter(output)
 
 
@@ -52,10 +47,7 @@ def main():
     args = aparser.parse_args()
 
     # get data for plot from analyzer
-    parser = TimeErrorParser(args.interface)
-    analyzer = MaxTimeIntervalErrorAnalyzer(Config.from_yaml(CONFIG))
-    with open_input(args.input) as fid:
-        analyzer.collect(*parser.parse(fid))
+    analyzer = service.analyze(args.input, 'ts2phc/mtie', config=CONFIG, interface=args.interface)
 
     # plot data
     output = f'{args.prefix}.png'
@@ -14,15 +14,12 @@ from argparse import ArgumentParser
 from os.path import join as joinpath
 from os.path import dirname
 
-from vse_sync_pp.common import (
-    open_input,
-    print_loj,
+from vse_sync_pp.common import print_loj
+from vse_sync_pp import (
+    profiling,
+    service,
 )
 
-from vse_sync_pp.parsers.ptp4l import TimeErrorParser
-from vse_sync_pp.analyzers.ptp4l import TimeDeviationAnalyzer
-from vse_sync_pp.analyzers.analyzer import Config
-
 import yaml
 
 CONFIG = joinpath(dirname(__file__), 'config.yaml')
@@ -41,10 +38,9 @@ def refimpl(filename, config, interface=None, encoding='utf-8'):
 
     Return a dict with test result, reason, timestamp, duration, and analysis of logs in filename.
     """
-    parser = TimeErrorParser(interface)
-    analyzer = TimeDeviationAnalyzer(Config.from_yaml(config))
-    with open_input(filename, encoding=encoding) as fid:
-        analyzer.collect(*parser.parse(fid))
+    analyzer = service.analyze(
+        filename, 'ptp4l/time-deviation', config=config, interface=interface, encoding=encoding,
+    )
     return {
         'result': analyzer.result,
         'reason': analyzer.reason,
@@ -65,7 +61,7 @@ def main():
 
     output = refimpl(args.input, config=CONFIG)
     # Python exits with error code 1 on EPIPE
-    if not print_loj(output):
+    if not print_loj(profiling.attach(output)):
         sys.exit(1)
 
 